@@ -1,10 +1,18 @@
-import copy
+import collections
+import concurrent.futures
+import itertools
 import json
 import logging
+import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 import lib.core as constances
@@ -12,9 +20,12 @@ import pandas as pd
 from lib.app.exceptions import AppException
 from lib.core import PIXEL_ANNOTATION_POSTFIX
 from lib.core import VECTOR_ANNOTATION_POSTFIX
+from lib.infrastructure.utils import iter_files
 
 logger = logging.getLogger("sa")
 
+CHUNK_ROWS = 100000
+
 
 @dataclass
 class ImageRowData:
@@ -118,7 +129,120 @@ class DocumentRawData:
     attributeName: str = None
 
 
+# Parquet types of the numeric and boolean columns, the other columns are strings
+ARROW_COLUMN_TYPES = {
+    **dict.fromkeys(
+        (
+            "instanceId",
+            "tagId",
+            "parameterId",
+            "timestampId",
+            "attributeId",
+            "groupId",
+        ),
+        "int64",
+    ),
+    **dict.fromkeys(
+        (
+            "itemHeight",
+            "itemWidth",
+            "itemDuration",
+            "instanceStart",
+            "instanceEnd",
+            "parameterStart",
+            "parameterEnd",
+            "probability",
+        ),
+        "float64",
+    ),
+    **dict.fromkeys(("itemPinned", "locked", "visible", "commentResolved"), "bool_"),
+}
+
+
+class _Absent:
+    """Marks the rows that don't set a column, kept when pickled to the workers."""
+
+    def __reduce__(self):
+        return "_ABSENT"
+
+
+_ABSENT = _Absent()
+
+
+class ColumnsBuilder:
+    """
+    Appends the aggregated rows directly into per column lists. The given columns
+    are always built, the other columns are added in the order the rows first set
+    them, like the columns of a DataFrame built from the row dicts. The rows that
+    don't set a column are padded with None when the DataFrame is built.
+    """
+
+    def __init__(self, columns: Iterable[str]):
+        self._columns: Dict[str, list] = {column: [] for column in columns}
+        self._required = set(self._columns)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, row: dict):
+        size = self._size
+        for column, value in row.items():
+            values = self._columns.get(column)
+            if values is None:
+                values = self._columns[column] = []
+            if len(values) < size:
+                values.extend([_ABSENT] * (size - len(values)))
+            values.append(value)
+        self._size += 1
+
+    def extend(self, other: "ColumnsBuilder"):
+        size = self._size
+        for column, values in other._columns.items():
+            own_values = self._columns.setdefault(column, [])
+            if not values:
+                continue
+            own_values.extend([_ABSENT] * (size - len(own_values)))
+            own_values.extend(values)
+        self._size += other._size
+
+    def to_df(self, start: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+        """Builds the DataFrame of the rows from start to end and their columns."""
+        end = self._size if end is None else min(end, self._size)
+        index = pd.RangeIndex(start, end)
+        data = {}
+        for column, values in self._columns.items():
+            values.extend([_ABSENT] * (self._size - len(values)))
+            values = values[start:end]
+            if column not in self._required and all(
+                value is _ABSENT for value in values
+            ):
+                continue
+            data[column] = pd.Series(
+                [None if value is _ABSENT else value for value in values],
+                index=index,
+                dtype=object,
+            )
+        return pd.DataFrame(data, index=index)
+
+
+def _to_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Converts every value with pd.to_datetime like the earlier row by row parsing,
+    each distinct value is parsed once and the missing values stay None.
+    """
+    timestamps = {value: pd.to_datetime(value) for value in set(values) - {None}}
+    return pd.Series(
+        [None if value is None else timestamps[value] for value in values],
+        index=values.index,
+        dtype=object,
+    )
+
+
 class DataAggregator:
+    # the chunks are aggregated in the current process unless more workers are set
+    MAX_WORKERS = int(os.environ.get("SA_AGGREGATION_WORKERS", 1))
+    CHUNK_SIZE = 1000
     MAPPERS = {
         "event": lambda annotation: None,
         "bbox": lambda annotation: annotation["points"],
@@ -154,6 +278,7 @@ class DataAggregator:
         self.folder_names = folder_names
         self._annotation_suffix = None
         self.classes_path = self.project_root / "classes" / "classes.json"
+        self._classes = None
 
     def _set_annotation_suffix(self, path):
 
@@ -171,21 +296,28 @@ class DataAggregator:
         annotations_paths = []
         if self.folder_names is None:
             self._set_annotation_suffix(self.project_root)
-            for path in self.project_root.glob("*"):
-                if path.is_file() and self._annotation_suffix in path.name:
-                    annotations_paths.append(path)
-                elif path.is_dir() and path.name != "classes":
-                    annotations_paths.extend(
-                        list(path.rglob(f"*{self._annotation_suffix}"))
-                    )
+            # the folder annotations are added in place to keep the glob order
+            with os.scandir(self.project_root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if entry.name != "classes":
+                            annotations_paths.extend(
+                                Path(i)
+                                for i in iter_files(
+                                    entry.path, self._annotation_suffix, recursive=True
+                                )
+                            )
+                    elif entry.is_file() and self._annotation_suffix in entry.name:
+                        annotations_paths.append(Path(entry.path))
         else:
             for folder_name in self.folder_names:
                 self._set_annotation_suffix(self.project_root / folder_name)
                 annotations_paths.extend(
-                    list(
-                        (self.project_root / folder_name).rglob(
-                            f"*{self._annotation_suffix}"
-                        )
+                    Path(i)
+                    for i in iter_files(
+                        self.project_root / folder_name,
+                        self._annotation_suffix,
+                        recursive=True,
                     )
                 )
         if not annotations_paths:
@@ -219,307 +351,487 @@ class DataAggregator:
                 f"The function is not supported for {self.project_type.name} projects."
             )
 
-    def __add_attributes_to_raws(self, raws, attributes, element_raw):
+    def _get_folder_name(self, annotation_path: Path) -> Optional[str]:
+        if annotation_path.parent != self.project_root:
+            return annotation_path.parent.name
+
+    @staticmethod
+    def _load_annotation(annotation_path: Union[str, Path]) -> dict:
+        with open(annotation_path) as file:
+            return json.load(file)
+
+    @staticmethod
+    def __add_attributes_to_rows(builder, attributes, row):
         for attribute_id, attribute in enumerate(attributes):
-            attribute_raw = copy.copy(element_raw)
-            attribute_raw.attributeId = attribute_id
-            attribute_raw.attributeGroupName = attribute.get("groupName")
-            attribute_raw.attributeName = attribute.get("name")
-            raws.append(attribute_raw)
+            builder.append(
+                {
+                    **row,
+                    "attributeId": attribute_id,
+                    "attributeGroupName": attribute.get("groupName"),
+                    "attributeName": attribute.get("name"),
+                }
+            )
         if not attributes:
-            raws.append(element_raw)
-        return raws
+            builder.append(row)
+
+    def _add_video_rows(self, builder: ColumnsBuilder, annotation_path: Path):
+        annotation_data = self._load_annotation(annotation_path)
+        metadata = annotation_data["metadata"]
+        item_row = {
+            "itemName": metadata["name"],
+            "folderName": self._get_folder_name(annotation_path),
+            "itemHeight": metadata.get("height"),
+            "itemWidth": metadata.get("width"),
+            "itemStatus": metadata.get("status"),
+            "itemURL": metadata.get("url"),
+            "itemDuration": metadata.get("duration"),
+            "error": metadata.get("error"),
+            "itemAnnotator": metadata.get("annotatorEmail"),
+            "itemQA": metadata.get("qaEmail"),
+        }
+        for idx, tag in enumerate(annotation_data.get("tags", [])):
+            builder.append({**item_row, "tagId": idx, "tag": tag})
+        instances = annotation_data.get("instances", [])
+        for idx, instance in enumerate(instances):
+            meta = instance["meta"]
+            instance_type = meta.get("type", "event")
+            if instance_type == "comment":
+                instance_type = "comment_inst"
+            created_by = meta.get("createdBy", {})
+            updated_by = meta.get("updatedBy", {})
+            instance_row = {
+                **item_row,
+                "instanceId": idx,
+                "instanceStart": meta.get("start"),
+                "instanceEnd": meta.get("end"),
+                "type": instance_type,
+                "className": meta.get("className"),
+                "createdAt": meta.get("createdAt"),
+                "createdBy": created_by.get("email"),
+                "creatorRole": created_by.get("role"),
+                "updatedAt": meta.get("updatedAt"),
+                "updatedBy": updated_by.get("email"),
+                "updatorRole": updated_by.get("role"),
+                "pointLabels": meta.get("pointLabels"),
+            }
+            parameters = instance.get("parameters", [])
+            if instance_type == "tag":
+                self.__add_attributes_to_rows(
+                    builder, meta.get("attributes", []), instance_row
+                )
+            mapper = self.MAPPERS[instance_type]
+            for parameter_id, parameter in enumerate(parameters):
+                parameter_row = {
+                    **instance_row,
+                    "parameterId": parameter_id,
+                    "parameterStart": parameter.get("start"),
+                    "parameterEnd": parameter.get("end"),
+                }
+                timestamps = parameter.get("timestamps", [])
+                for timestamp_id, timestamp in enumerate(timestamps):
+                    self.__add_attributes_to_rows(
+                        builder,
+                        timestamp.get("attributes", []),
+                        {
+                            **parameter_row,
+                            "timestampId": timestamp_id,
+                            "meta": mapper(timestamp),
+                        },
+                    )
+                if not timestamps:
+                    builder.append(parameter_row)
+            if not parameters and instance_type != "tag":
+                builder.append(instance_row)
+        if not instances:
+            builder.append(item_row)
 
-    def aggregate_video_annotations_as_df(self, annotation_paths: List[str]):
-        raws = []
+    @staticmethod
+    def _build_chunk(
+        add_rows: Callable, columns: List[str], annotation_paths: List[str]
+    ) -> ColumnsBuilder:
+        builder = ColumnsBuilder(columns)
         for annotation_path in annotation_paths:
-            annotation_path = Path(annotation_path)
-            annotation_data = json.load(open(annotation_path))
-            raw_data = VideoRawData()
-            # metadata
-            raw_data.itemName = annotation_data["metadata"]["name"]
-            raw_data.folderName = (
-                annotation_path.parent.name
-                if annotation_path.parent != self.project_root
-                else None
-            )
-            raw_data.itemHeight = annotation_data["metadata"].get("height")
-            raw_data.itemWidth = annotation_data["metadata"].get("width")
-            raw_data.itemStatus = annotation_data["metadata"].get("status")
-            raw_data.itemURL = annotation_data["metadata"].get("url")
-            raw_data.itemDuration = annotation_data["metadata"].get("duration")
-
-            raw_data.error = annotation_data["metadata"].get("error")
-            raw_data.itemAnnotator = annotation_data["metadata"].get("annotatorEmail")
-            raw_data.itemQA = annotation_data["metadata"].get("qaEmail")
-            # append tags
-            for idx, tag in enumerate(annotation_data.get("tags", [])):
-                tag_row = copy.copy(raw_data)
-                tag_row.tagId = idx
-                tag_row.tag = tag
-                raws.append(tag_row)
-            # append instances
-            instances = annotation_data.get("instances", [])
-            for idx, instance in enumerate(instances):
-                instance_type = instance["meta"].get("type", "event")
-                if instance_type == "comment":
-                    instance_type = "comment_inst"
-                instance_raw = copy.copy(raw_data)
-                instance_raw.instanceId = int(idx)
-                instance_raw.instanceStart = instance["meta"].get("start")
-                instance_raw.instanceEnd = instance["meta"].get("end")
-                instance_raw.type = instance_type
-                instance_raw.className = instance["meta"].get("className")
-                instance_raw.createdAt = instance["meta"].get("createdAt")
-                instance_raw.createdBy = (
-                    instance["meta"].get("createdBy", {}).get("email")
-                )
-                instance_raw.creatorRole = (
-                    instance["meta"].get("createdBy", {}).get("role")
-                )
-                instance_raw.updatedAt = instance["meta"].get("updatedAt")
-                instance_raw.updatedBy = (
-                    instance["meta"].get("updatedBy", {}).get("email")
-                )
-                instance_raw.updatorRole = (
-                    instance["meta"].get("updatedBy", {}).get("role")
+            add_rows(builder, Path(annotation_path))
+        return builder
+
+    def _iter_chunk_builders(
+        self, add_rows: Callable, columns: List[str], annotation_paths: List[str]
+    ) -> Iterator[ColumnsBuilder]:
+        """
+        Parses and flattens the annotation files in chunks. When there is more than
+        one chunk and MAX_WORKERS, set by the SA_AGGREGATION_WORKERS environment
+        variable, is more than one, the chunks are processed in a process pool. On
+        platforms that spawn the worker processes (Windows, macOS) the calling
+        script has to be guarded with ``if __name__ == "__main__":``. The column
+        blocks are yielded in the order of the paths with at most MAX_WORKERS * 2
+        chunks processed ahead.
+        """
+        columns = list(columns)
+        chunks = [
+            annotation_paths[i : i + self.CHUNK_SIZE]  # noqa: E203
+            for i in range(0, len(annotation_paths), self.CHUNK_SIZE)
+        ]
+        if len(chunks) <= 1 or self.MAX_WORKERS <= 1:
+            for chunk in chunks:
+                yield self._build_chunk(add_rows, columns, chunk)
+            return
+        futures = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(chunks))
+        ) as executor:
+            try:
+                for chunk in chunks:
+                    futures.append(
+                        executor.submit(self._build_chunk, add_rows, columns, chunk)
+                    )
+                    if len(futures) >= self.MAX_WORKERS * 2:
+                        yield futures.popleft().result()
+                while futures:
+                    yield futures.popleft().result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _build(
+        self, add_rows: Callable, columns: List[str], annotation_paths: List[str]
+    ) -> ColumnsBuilder:
+        builder = ColumnsBuilder(columns)
+        for chunk_builder in self._iter_chunk_builders(
+            add_rows, columns, annotation_paths
+        ):
+            builder.extend(chunk_builder)
+        return builder
+
+    def _to_df(
+        self, builder: ColumnsBuilder, start: int = 0, end: Optional[int] = None
+    ) -> pd.DataFrame:
+        df = builder.to_df(start, end)
+        if self.project_type in (
+            constances.ProjectType.VECTOR,
+            constances.ProjectType.PIXEL,
+        ):
+            for column in ("createdAt", "updatedAt"):
+                df[column] = _to_timestamps(df[column])
+            df = df.astype({"probability": float})
+        return df
+
+    def _get_rows_adder(self) -> Tuple[Callable, List[str]]:
+        if self.project_type in (
+            constances.ProjectType.VECTOR,
+            constances.ProjectType.PIXEL,
+        ):
+            # the classes are loaded once and sent to the workers with the aggregator
+            self._load_classes()
+            return self._add_image_rows, list(ImageRowData.__annotations__)
+        elif self.project_type is constances.ProjectType.VIDEO:
+            return self._add_video_rows, list(VideoRawData.__annotations__)
+        elif self.project_type is constances.ProjectType.DOCUMENT:
+            # the document columns are only added by the rows that set them
+            return self._add_document_rows, []
+        raise AppException(
+            f"The function is not supported for {self.project_type.name} projects."
+        )
+
+    def _get_all_columns(self) -> List[str]:
+        """Returns every column the rows of the project type can set."""
+        if self.project_type in (
+            constances.ProjectType.VECTOR,
+            constances.ProjectType.PIXEL,
+        ):
+            return [*ImageRowData.__annotations__, "tagId", "rag"]
+        elif self.project_type is constances.ProjectType.VIDEO:
+            return list(VideoRawData.__annotations__)
+        elif self.project_type is constances.ProjectType.DOCUMENT:
+            return list(DocumentRawData.__annotations__)
+        raise AppException(
+            f"The function is not supported for {self.project_type.name} projects."
+        )
+
+    def iter_aggregated_chunks(
+        self, chunk_rows: int = CHUNK_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yields the aggregated annotations as DataFrames of at most chunk_rows rows,
+        only the annotation files of the current chunks are kept in memory. The
+        columns of a chunk are selected like the columns of
+        aggregate_annotations_as_df, so a column that only some rows set, like
+        tagId, is in the chunks that have such rows.
+        """
+        self.check_classes_path()
+        add_rows, columns = self._get_rows_adder()
+        annotation_paths = self.get_annotation_paths()
+        builder = ColumnsBuilder(columns)
+        offset = 0
+        chunk_builders = self._iter_chunk_builders(add_rows, columns, annotation_paths)
+        for chunk_builder in itertools.chain(chunk_builders, [None]):
+            if chunk_builder is not None:
+                builder.extend(chunk_builder)
+                if len(builder) < chunk_rows:
+                    continue
+            elif not len(builder):
+                break
+            for start in range(0, len(builder), chunk_rows):
+                df = self._to_df(builder, start, start + chunk_rows)
+                df.index += offset
+                yield df
+            offset += len(builder)
+            builder = ColumnsBuilder(columns)
+
+    @staticmethod
+    def _to_arrow_table(df: pd.DataFrame, columns: List[str]):
+        import pyarrow as pa
+
+        arrays = {}
+        for column in columns:
+            if column in df:
+                values = df[column]
+            else:
+                values = pd.Series([None] * len(df), index=df.index, dtype=object)
+            if column in ("createdAt", "updatedAt"):
+                arrays[column] = pa.array(pd.to_datetime(values, utc=True))
+            elif column in ARROW_COLUMN_TYPES:
+                arrays[column] = pa.array(
+                    values.tolist(),
+                    type=getattr(pa, ARROW_COLUMN_TYPES[column])(),
+                    from_pandas=True,
                 )
-                instance_raw.pointLabels = instance["meta"].get("pointLabels")
-                parameters = instance.get("parameters", [])
-                if instance_raw.type == "tag":
-                    attributes = instance["meta"].get("attributes", [])
-                    raws = self.__add_attributes_to_raws(raws, attributes, instance_raw)
-                for parameter_id, parameter in enumerate(parameters):
-                    parameter_raw = copy.copy(instance_raw)
-                    parameter_raw.parameterId = parameter_id
-                    parameter_raw.parameterStart = parameter.get("start")
-                    parameter_raw.parameterEnd = parameter.get("end")
-                    timestamps = parameter.get("timestamps", [])
-                    for timestamp_id, timestamp in enumerate(timestamps):
-                        timestamp_raw = copy.copy(parameter_raw)
-                        timestamp_raw.timestampId = timestamp_id
-                        timestamp_raw.meta = self.MAPPERS[instance_type](timestamp)
-                        attributes = timestamp.get("attributes", [])
-                        raws = self.__add_attributes_to_raws(
-                            raws, attributes, timestamp_raw
+            else:
+                arrays[column] = pa.array(
+                    [
+                        (
+                            None
+                            if value is None
+                            else (
+                                json.dumps(value)
+                                if isinstance(value, (dict, list))
+                                else str(value)
+                            )
                         )
-                    if not timestamps:
-                        raws.append(parameter_raw)
-                if not parameters and instance_type != "tag":
-                    raws.append(instance_raw)
-            if not instances:
-                raws.append(raw_data)
-        df = pd.DataFrame([raw.__dict__ for raw in raws], dtype=object)
-        return df.where(pd.notnull(df), None)
+                        for value in values
+                    ],
+                    pa.string(),
+                )
+        return pa.table(arrays)
+
+    def write_parquet(
+        self, path: Union[str, Path], chunk_rows: int = CHUNK_ROWS
+    ) -> Path:
+        """
+        Writes the aggregated annotations chunk by chunk to a Parquet dataset
+        partitioned by folderName, nested values are stored as JSON strings.
+        Every file has all the columns of the project type, so the files are read
+        as one dataset, and the items of the project root are in the root folder.
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "To write annotations to Parquet please install pyarrow package."
+            )
+        path = Path(path)
+        if path.exists() and any(path.iterdir()):
+            raise AppException(f"The directory {path} is not empty.")
+        columns = self._get_all_columns()
+        for index, df in enumerate(self.iter_aggregated_chunks(chunk_rows)):
+            # a partition of null folder names can't be read back
+            df["folderName"] = df["folderName"].where(df["folderName"].notna(), "root")
+            pq.write_to_dataset(
+                self._to_arrow_table(df, columns),
+                root_path=str(path),
+                partition_cols=["folderName"],
+                basename_template=f"part-{index}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        return path
 
-    def aggregate_document_annotations_as_df(self, annotation_paths: List[str]):
-        raws = []
-        for annotation_path in annotation_paths:
-            annotation_path = Path(annotation_path)
-            annotation_data = json.load(open(annotation_path))
-            raw_data = DocumentRawData()
-            # metadata
-            raw_data.itemName = annotation_data["metadata"]["name"]
-            raw_data.folderName = (
-                annotation_path.parent.name
-                if annotation_path.parent != self.project_root
-                else None
+    def aggregate_annotations(
+        self,
+        output: str = "df",
+        path: Union[str, Path] = None,
+        chunk_rows: int = CHUNK_ROWS,
+    ):
+        if output == "df":
+            return self.aggregate_annotations_as_df()
+        elif output == "parquet":
+            if not path:
+                raise AppException("The path is required for the parquet output.")
+            return self.write_parquet(path, chunk_rows)
+        raise AppException(f"The {output} output is not supported.")
+
+    def aggregate_video_annotations_as_df(self, annotation_paths: List[str]):
+        return self._to_df(
+            self._build(
+                self._add_video_rows, VideoRawData.__annotations__, annotation_paths
             )
-            raw_data.itemStatus = annotation_data["metadata"].get("status")
-            raw_data.itemURL = annotation_data["metadata"].get("url")
-            raw_data.itemAnnotator = annotation_data["metadata"].get("annotatorEmail")
-            raw_data.itemQA = annotation_data["metadata"].get("qaEmail")
-            # append tags
-            for idx, tag in enumerate(annotation_data.get("tags", [])):
-                tag_row = copy.copy(raw_data)
-                tag_row.tagId = idx
-                tag_row.tag = tag
-                raws.append(tag_row)
-            # append instances
-            instances = annotation_data.get("instances", [])
-            for idx, instance in enumerate(instances):
-                instance_raw = copy.copy(raw_data)
-                instance_raw.instanceId = int(idx)
-                instance_raw.instanceStart = instance.get("start")
-                instance_raw.instanceEnd = instance.get("end")
-                instance_raw.type = instance.get("type")
-                instance_raw.className = instance.get("className")
-                instance_raw.createdAt = instance.get("createdAt")
-                instance_raw.createdBy = instance.get("createdBy", {}).get("email")
-                instance_raw.creatorRole = instance.get("createdBy", {}).get("role")
-                instance_raw.updatedAt = instance.get("updatedAt")
-                instance_raw.updatedBy = instance.get("updatedBy", {}).get("email")
-                instance_raw.updatorRole = instance.get("updatedBy", {}).get("role")
-                attributes = instance.get("attributes", [])
-                # append attributes
-                for attribute_id, attribute in enumerate(attributes):
-                    attribute_raw = copy.copy(instance_raw)
-                    attribute_raw.attributeId = attribute_id
-                    attribute_raw.attributeGroupName = attribute.get("groupName")
-                    attribute_raw.attributeName = attribute.get("name")
-                    raws.append(attribute_raw)
-                if not attributes:
-                    raws.append(instance_raw)
-            if not instances:
-                raws.append(raw_data)
-        df = pd.DataFrame([raw.__dict__ for raw in raws], dtype=object)
-        return df.where(pd.notnull(df), None)
+        )
 
-    def aggregate_image_annotations_as_df(self, annotations_paths: List[str]):
+    def _add_document_rows(self, builder: ColumnsBuilder, annotation_path: Path):
+        annotation_data = self._load_annotation(annotation_path)
+        metadata = annotation_data["metadata"]
+        item_row = {
+            "itemName": metadata["name"],
+            "folderName": self._get_folder_name(annotation_path),
+            "itemStatus": metadata.get("status"),
+            "itemURL": metadata.get("url"),
+            "itemAnnotator": metadata.get("annotatorEmail"),
+            "itemQA": metadata.get("qaEmail"),
+        }
+        for idx, tag in enumerate(annotation_data.get("tags", [])):
+            builder.append({**item_row, "tagId": idx, "tag": tag})
+        instances = annotation_data.get("instances", [])
+        for idx, instance in enumerate(instances):
+            created_by = instance.get("createdBy", {})
+            updated_by = instance.get("updatedBy", {})
+            instance_row = {
+                **item_row,
+                "instanceId": idx,
+                "instanceStart": instance.get("start"),
+                "instanceEnd": instance.get("end"),
+                "type": instance.get("type"),
+                "className": instance.get("className"),
+                "createdAt": instance.get("createdAt"),
+                "createdBy": created_by.get("email"),
+                "creatorRole": created_by.get("role"),
+                "updatedAt": instance.get("updatedAt"),
+                "updatedBy": updated_by.get("email"),
+                "updatorRole": updated_by.get("role"),
+            }
+            self.__add_attributes_to_rows(
+                builder, instance.get("attributes", []), instance_row
+            )
+        if not instances:
+            builder.append(item_row)
 
-        classes_json = json.load(open(self.classes_path))
-        class_name_to_color = {}
-        class_group_name_to_values = {}
-        rows = []
-        freestyle_attributes = set()
-        for annotation_class in classes_json:
-            name = annotation_class["name"]
-            color = annotation_class["color"]
-            class_name_to_color[name] = color
-            class_group_name_to_values[name] = {}
-            for attribute_group in annotation_class["attribute_groups"]:
-                group_type = attribute_group.get("group_type")
-                group_id = attribute_group.get("id")
-                if group_type and group_type in ["text", "numeric"]:
-                    freestyle_attributes.add(group_id)
-                class_group_name_to_values[name][attribute_group["name"]] = []
-                for attribute in attribute_group["attributes"]:
-                    class_group_name_to_values[name][attribute_group["name"]].append(
-                        attribute["name"]
+    def aggregate_document_annotations_as_df(self, annotation_paths: List[str]):
+        return self._to_df(self._build(self._add_document_rows, [], annotation_paths))
+
+    def _load_classes(self):
+        """
+        Returns the class colors, the attribute names of each class attribute group
+        and the ids of the text and numeric attribute groups.
+        """
+        if self._classes is None:
+            class_name_to_color = {}
+            class_group_name_to_values = {}
+            freestyle_attributes = set()
+            for annotation_class in self._load_annotation(self.classes_path):
+                name = annotation_class["name"]
+                class_name_to_color[name] = annotation_class["color"]
+                class_group_name_to_values[name] = {}
+                for attribute_group in annotation_class["attribute_groups"]:
+                    group_type = attribute_group.get("group_type")
+                    if group_type and group_type in ["text", "numeric"]:
+                        freestyle_attributes.add(attribute_group.get("id"))
+                    class_group_name_to_values[name][attribute_group["name"]] = {
+                        attribute["name"] for attribute in attribute_group["attributes"]
+                    }
+            self._classes = (
+                class_name_to_color,
+                class_group_name_to_values,
+                freestyle_attributes,
+            )
+        return self._classes
+
+    def _add_image_rows(self, builder: ColumnsBuilder, annotation_path: Path):
+        (
+            class_name_to_color,
+            class_group_name_to_values,
+            freestyle_attributes,
+        ) = self._load_classes()
+        annotation_json = self._load_annotation(annotation_path)
+        metadata = annotation_json["metadata"]
+        item_row = {
+            "itemName": metadata.get("name"),
+            "itemHeight": metadata.get("height"),
+            "itemWidth": metadata.get("width"),
+            "itemStatus": metadata.get("status"),
+            "itemPinned": metadata.get("pinned"),
+            "itemAnnotator": metadata.get("annotatorEmail"),
+            "itemQA": metadata.get("qaEmail"),
+        }
+        for annotation in annotation_json["comments"]:
+            builder.append(
+                {
+                    **item_row,
+                    **self.__get_user_metadata(annotation),
+                    "commentResolved": annotation["resolved"],
+                }
+            )
+        for idx, tag in enumerate(annotation_json["tags"]):
+            builder.append({**item_row, "tagId": idx, "tag": tag, "rag": tag})
+        folder_name = self._get_folder_name(annotation_path)
+        for idx, annotation in enumerate(annotation_json["instances"]):
+            annotation_type = annotation.get("type", "mask")
+            annotation_class_name = annotation.get("className")
+            if (
+                annotation_class_name is None
+                or annotation_class_name not in class_name_to_color
+            ):
+                logger.warning(
+                    "Annotation class %s not found in classes json. Skipping.",
+                    annotation_class_name,
+                )
+                continue
+            instance_row = {
+                **item_row,
+                "classColor": class_name_to_color[annotation_class_name],
+                "groupId": annotation.get("groupId"),
+                "locked": annotation.get("locked"),
+                "visible": annotation.get("visible"),
+                "trackingId": annotation.get("trackingId"),
+                "type": annotation.get("type"),
+                "meta": self.MAPPERS[annotation_type](annotation),
+                "error": annotation.get("error"),
+                "probability": annotation.get("probability"),
+                "pointLabels": annotation.get("pointLabels"),
+                "instanceId": idx,
+                "folderName": folder_name,
+                **self.__get_user_metadata(annotation),
+            }
+            attributes = annotation.get("attributes")
+            if not attributes:
+                builder.append(instance_row)
+                continue
+            group_name_to_values = class_group_name_to_values[annotation_class_name]
+            for attribute in attributes:
+                attribute_group = attribute.get("groupName")
+                attribute_name = attribute.get("name")
+                if attribute_group not in group_name_to_values:
+                    logger.warning(
+                        "Annotation class group %s not in classes json. Skipping.",
+                        attribute_group,
                     )
-
-        for annotation_path in annotations_paths:
-            row_data = ImageRowData()
-            annotation_json = None
-            with open(annotation_path) as fp:
-                annotation_json = json.load(fp)
-            parts = Path(annotation_path).name.split(self._annotation_suffix)
-            row_data = self.__fill_image_metadata(row_data, annotation_json["metadata"])
-            annotation_instance_id = 0
-
-            # include comments
-            for annotation in annotation_json["comments"]:
-                comment_row = copy.copy(row_data)
-                comment_row.comment_resolved = annotation["resolved"]
-                comment_row.comment = DataAggregator.MAPPERS["comment"](annotation)
-                comment_row = self.__fill_user_metadata(row_data, annotation)
-                rows.append(comment_row)
-            # include tags
-            for idx, tag in enumerate(annotation_json["tags"]):
-                tag_row = copy.copy(row_data)
-                tag_row.tagId = idx
-                tag_row.rag = tag
-                rows.append(tag_row)
-
-            # Instances
-            for idx, annotation in enumerate(annotation_json["instances"]):
-                instance_row = copy.copy(row_data)
-                annotation_type = annotation.get("type", "mask")
-                annotation_class_name = annotation.get("className")
+                    continue
                 if (
-                    annotation_class_name is None
-                    or annotation_class_name not in class_name_to_color
+                    attribute_name not in group_name_to_values[attribute_group]
+                    and attribute.get("groupId") not in freestyle_attributes
                 ):
                     logger.warning(
-                        "Annotation class %s not found in classes json. Skipping.",
-                        annotation_class_name,
+                        f"Annotation class group value {attribute_name} not in classes json. Skipping."
                     )
                     continue
-                instance_row.classColor = class_name_to_color[annotation_class_name]
-                instance_row.groupId = annotation.get("groupId")
-                instance_row.locked = annotation.get("locked")
-                instance_row.visible = annotation.get("visible")
-                instance_row.trackingId = annotation.get("trackingId")
-                instance_row.type = annotation.get("type")
-                instance_row.meta = DataAggregator.MAPPERS[annotation_type](annotation)
-                instance_row.error = annotation.get("error")
-                instance_row.probability = annotation.get("probability")
-                instance_row.pointLabels = annotation.get("pointLabels")
-                instance_row.instanceId = idx
-                attributes = annotation.get("attributes")
-                instance_row = self.__fill_user_metadata(instance_row, annotation)
-                folder_name = None
-                if Path(annotation_path).parent != Path(self.project_root):
-                    folder_name = Path(annotation_path).parent.name
-                instance_row.folderName = folder_name
-                num_added = 0
-                if not attributes:
-                    rows.append(instance_row)
-                    num_added = 1
-                else:
-                    for attribute in attributes:
-                        attribute_row = copy.copy(instance_row)
-                        attribute_group = attribute.get("groupName")
-                        group_id = attribute.get("groupId")
-                        attribute_name = attribute.get("name")
-                        if (
-                            attribute_group
-                            not in class_group_name_to_values[annotation_class_name]
-                        ):
-                            logger.warning(
-                                "Annotation class group %s not in classes json. Skipping.",
-                                attribute_group,
-                            )
-                            continue
-                        if (
-                            attribute_name
-                            not in class_group_name_to_values[annotation_class_name][
-                                attribute_group
-                            ]
-                            and group_id not in freestyle_attributes
-                        ):
-                            logger.warning(
-                                f"Annotation class group value {attribute_name} not in classes json. Skipping."
-                            )
-                            continue
-
-                        else:
-                            attribute_row.attributeGroupName = attribute_group
-                            attribute_row.attributeName = attribute_name
-
-                        rows.append(attribute_row)
-                        num_added += 1
-
-                if num_added > 0:
-                    annotation_instance_id += 1
-
-        df = pd.DataFrame([row.__dict__ for row in rows], dtype=object)
-        df = df.astype({"probability": float})
-        return df
+                builder.append(
+                    {
+                        **instance_row,
+                        "attributeGroupName": attribute_group,
+                        "attributeName": attribute_name,
+                    }
+                )
 
-    @staticmethod
-    def __fill_image_metadata(raw_data, metadata):
-        raw_data.itemName = metadata.get("name")
-        raw_data.itemHeight = metadata.get("height")
-        raw_data.itemWidth = metadata.get("width")
-        raw_data.itemStatus = metadata.get("status")
-        raw_data.itemPinned = metadata.get("pinned")
-        raw_data.itemAnnotator = metadata.get("annotatorEmail")
-        raw_data.itemQA = metadata.get("qaEmail")
-        return raw_data
+    def aggregate_image_annotations_as_df(self, annotations_paths: List[str]):
+        add_rows, columns = self._get_rows_adder()
+        return self._to_df(self._build(add_rows, columns, annotations_paths))
 
     @staticmethod
-    def __fill_user_metadata(row_data, annotation):
-        annotation_created_at = pd.to_datetime(annotation.get("createdAt"))
-        annotation_created_by = annotation.get("createdBy")
-        annotation_creator_email = None
-        annotation_creator_role = None
-        if annotation_created_by:
-            annotation_creator_email = annotation_created_by.get("email")
-            annotation_creator_role = annotation_created_by.get("role")
-        annotation_creation_type = annotation.get("creationType")
-        annotation_updated_at = pd.to_datetime(annotation.get("updatedAt"))
-        annotation_updated_by = annotation.get("updatedBy")
-        annotation_updator_email = None
-        annotation_updator_role = None
-        if annotation_updated_by:
-            annotation_updator_email = annotation_updated_by.get("email")
-            annotation_updator_role = annotation_updated_by.get("role")
-        row_data.createdAt = annotation_created_at
-        row_data.creatorRole = annotation_creator_role
-        row_data.creatorEmail = annotation_creator_email
-        row_data.creationType = annotation_creation_type
-        row_data.updatedAt = annotation_updated_at
-        row_data.updatorRole = annotation_updator_role
-        row_data.updatorEmail = annotation_updator_email
-        return row_data
+    def __get_user_metadata(annotation):
+        created_by = annotation.get("createdBy") or {}
+        updated_by = annotation.get("updatedBy") or {}
+        return {
+            "createdAt": annotation.get("createdAt"),
+            "creatorRole": created_by.get("role"),
+            "creatorEmail": created_by.get("email"),
+            "creationType": annotation.get("creationType"),
+            "updatedAt": annotation.get("updatedAt"),
+            "updatorRole": updated_by.get("role"),
+            "updatorEmail": updated_by.get("email"),
+        }
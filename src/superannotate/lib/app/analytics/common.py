@@ -1,14 +1,20 @@
+import collections
+import concurrent.futures
 import json
 import logging
+import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from lib.app.exceptions import AppException
 
-
 logger = logging.getLogger("sa")
 
+# the consensus is scored in the current process unless more workers are set
+CONSENSUS_WORKERS = int(os.environ.get("SA_CONSENSUS_WORKERS", 1))
+
 
 def aggregate_image_annotations_as_df(
     project_root,
@@ -89,7 +95,8 @@ def aggregate_image_annotations_as_df(
             + str(classes_path)
             + " not found. Please provide correct project export root"
         )
-    classes_json = json.load(open(classes_path))
+    with open(classes_path) as file:
+        classes_json = json.load(file)
     class_name_to_color = {}
     class_group_name_to_values = {}
     freestyle_attributes = set()
@@ -179,7 +186,8 @@ def aggregate_image_annotations_as_df(
         type_postfix = ".json"
 
     for annotation_path in annotations_paths:
-        annotation_json = json.load(open(annotation_path))
+        with open(annotation_path) as file:
+            annotation_json = json.load(file)
         parts = annotation_path.name.split(type_postfix)
         if len(parts) != 2:
             continue
@@ -387,11 +395,11 @@ def instance_consensus(inst_1, inst_2):
     :param inst_2: Second instance for consensus score.
     :type inst_2: shapely object or a tag
     """
-    if inst_1.type == inst_2.type == "Polygon":
+    if inst_1.geom_type == inst_2.geom_type == "Polygon":
         intersect = inst_1.intersection(inst_2)
         union = inst_1.union(inst_2)
         score = intersect.area / union.area
-    elif inst_1.type == inst_2.type == "Point":
+    elif inst_1.geom_type == inst_2.geom_type == "Point":
         score = -1 * inst_1.distance(inst_2)
     else:
         raise NotImplementedError
@@ -409,29 +417,176 @@ def calculate_tag_consensus(image_df):
         "attributeGroupName",
         "attributeName",
     ]
-
-    image_data = {}
-    for column_name in column_names:
-        image_data[column_name] = []
-
-    image_df = image_df.reset_index()
-    image_data["score"] = []
-    for i, irow in image_df.iterrows():
-        for c in column_names:
-            image_data[c].append(irow[c])
-        image_data["score"].append(0)
-        for j, jrow in image_df.iterrows():
-            if i == j:
-                continue
-            if (
-                (irow["className"] == jrow["className"])
-                and irow["attributeGroupName"] == jrow["attributeGroupName"]
-                and irow["attributeName"] == jrow["attributeName"]
-            ):
-                image_data["score"][i] += 1
+    image_data = {
+        column_name: image_df[column_name].tolist() for column_name in column_names
+    }
+    # the score of a tag is the number of other tags with the same class and
+    # attribute, missing values are factorized to -1 so that they are equal
+    keys = pd.DataFrame(
+        {
+            column_name: pd.factorize(image_df[column_name])[0]
+            for column_name in ("className", "attributeGroupName", "attributeName")
+        }
+    )
+    image_data["score"] = (
+        keys.groupby(list(keys.columns), sort=False)["className"].transform("size") - 1
+    ).tolist()
     return image_data
 
 
+def _import_shapely():
+    try:
+        import shapely
+    except ImportError:
+        shapely = None
+    if shapely is None or int(shapely.__version__.split(".")[0]) < 2:
+        raise ImportError(
+            "To use superannotate.consensus function please install shapely>=2.0 package."
+        )
+    return shapely
+
+
+class _ConsensusInstances:
+    """
+    Valid instances of a folder with their geometries, bounds and areas as arrays.
+    """
+
+    def __init__(self, rows: list, annot_type: str):
+        shapely = _import_shapely()
+        self.annot_type = annot_type
+        if annot_type == "bbox":
+            coords = np.array(
+                [
+                    [row["meta"][key] for key in ("x1", "y1", "x2", "y2")]
+                    for row in rows
+                ],
+                dtype=float,
+            ).reshape(-1, 4)
+            bounds = np.hstack(
+                [
+                    np.minimum(coords[:, :2], coords[:, 2:]),
+                    np.maximum(coords[:, :2], coords[:, 2:]),
+                ]
+            )
+            geometries = shapely.box(*bounds.T)
+        elif annot_type == "polygon":
+            geometries = np.array(
+                [
+                    (
+                        shapely.polygons(
+                            np.array(row["meta"][: len(row["meta"]) // 2 * 2]).reshape(
+                                -1, 2
+                            )
+                        )
+                        if len(row["meta"]) >= 6
+                        else shapely.Polygon()
+                    )
+                    for row in rows
+                ],
+                dtype=object,
+            )
+        else:
+            geometries = shapely.points(
+                np.array(
+                    [[row["meta"]["x"], row["meta"]["y"]] for row in rows], dtype=float
+                ).reshape(-1, 2)
+            )
+        valid = shapely.is_valid(geometries)
+        if annot_type == "polygon":
+            valid &= ~shapely.is_empty(geometries)
+        for _ in range(int((~valid).sum())):
+            logger.info(
+                "Invalid %s instance occured, skipping to the next one.", annot_type
+            )
+        self.rows = [row for row, is_valid in zip(rows, valid) if is_valid]
+        self.geometries = geometries[valid]
+        self.class_names = np.array(
+            [row["className"] for row in self.rows], dtype=object
+        )
+        self.areas = shapely.area(self.geometries)
+        self.bounds = shapely.bounds(self.geometries).reshape(-1, 4)
+        self.coordinates = self.bounds[:, :2]
+        self.visited = np.zeros(len(self.rows), dtype=bool)
+        self._tree = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = _import_shapely().STRtree(self.geometries)
+        return self._tree
+
+    def get_scores(self, other: "_ConsensusInstances") -> dict:
+        """
+        Returns {index: (other indexes, IoU scores)} of the same class instance pairs
+        with overlapping bounds, the other indexes are in increasing order.
+        """
+        if not len(self) or not len(other):
+            return {}
+        indexes, other_indexes = other.tree.query(self.geometries)
+        same_class = self.class_names[indexes] == other.class_names[other_indexes]
+        indexes, other_indexes = indexes[same_class], other_indexes[same_class]
+        if not len(indexes):
+            return {}
+        if self.annot_type == "bbox":
+            bounds, other_bounds = self.bounds[indexes], other.bounds[other_indexes]
+            sizes = np.clip(
+                np.minimum(bounds[:, 2:], other_bounds[:, 2:])
+                - np.maximum(bounds[:, :2], other_bounds[:, :2]),
+                0,
+                None,
+            )
+            intersections = sizes[:, 0] * sizes[:, 1]
+        else:
+            intersections = _import_shapely().area(
+                _import_shapely().intersection(
+                    self.geometries[indexes], other.geometries[other_indexes]
+                )
+            )
+        unions = self.areas[indexes] + other.areas[other_indexes] - intersections
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(unions > 0, intersections / unions, 0)
+        order = np.lexsort((other_indexes, indexes))
+        indexes, other_indexes, scores = (
+            indexes[order],
+            other_indexes[order],
+            scores[order],
+        )
+        splits = np.flatnonzero(np.diff(indexes)) + 1
+        return {
+            group_indexes[0]: (group_other_indexes, group_scores)
+            for group_indexes, group_other_indexes, group_scores in zip(
+                np.split(indexes, splits),
+                np.split(other_indexes, splits),
+                np.split(scores, splits),
+            )
+        }
+
+    def match(self, index: int, other: "_ConsensusInstances", scores: dict) -> int:
+        """
+        Returns the index of the not visited instance of the other folder with the
+        best score for the instance, or -1.
+        """
+        if self.annot_type == "point":
+            candidates = np.flatnonzero(
+                ~other.visited & (other.class_names == self.class_names[index])
+            )
+            if not len(candidates):
+                return -1
+            distances = np.hypot(
+                *(other.coordinates[candidates] - self.coordinates[index]).T
+            )
+            return candidates[np.argmin(distances)]
+        if index not in scores:
+            return -1
+        candidates, candidate_scores = scores[index]
+        candidate_scores = np.where(other.visited[candidates], 0, candidate_scores)
+        best = np.argmax(candidate_scores)
+        return candidates[best] if candidate_scores[best] > 0 else -1
+
+
 def consensus(df, item_name, annot_type):
     """Helper function that computes consensus score for instances of a single image:
 
@@ -444,16 +599,32 @@ def consensus(df, item_name, annot_type):
     :param annot_type: Type of annotation instances to consider. Available candidates are: ["bbox", "polygon", "point"]
     :type dataset_format: str
     """
+    return image_consensus(
+        df[df["itemName"] == item_name],
+        item_name,
+        annot_type,
+        len(set(df["folderName"])),
+    )
 
-    try:
-        from shapely.geometry import Point, Polygon, box
-    except ImportError:
-        raise ImportError(
-            "To use superannotate.consensus function please install shapely package."
-        )
 
-    image_df = df[df["itemName"] == item_name]
-    all_projects = list(set(df["folderName"]))
+def image_consensus(image_df, item_name, annot_type, projects_count):
+    """Computes consensus score for the instances of a single image from its rows.
+
+    :param image_df: Annotation data of the image
+    :type image_df: pandas.DataFrame
+
+    :param item_name: The image name
+    :type item_name: str
+
+    :param annot_type: Type of annotation instances to consider. Available candidates are: ["bbox", "polygon", "point", "tag"]
+    :type annot_type: str
+
+    :param projects_count: The number of compared folders
+    :type projects_count: int
+    """
+    if annot_type == "tag":
+        return calculate_tag_consensus(image_df)
+    _import_shapely()
     column_names = [
         "creatorEmail",
         "itemName",
@@ -464,105 +635,145 @@ def consensus(df, item_name, annot_type):
         "folderName",
         "score",
     ]
-    instance_id = 0
-    image_data = {}
-    for column_name in column_names:
-        image_data[column_name] = []
+    image_data = {column_name: [] for column_name in column_names}
+
+    rows = collections.defaultdict(list)
+    for row in image_df[
+        ["folderName", "meta", "className", "creatorEmail", "attributes"]
+    ].to_dict("records"):
+        rows[row["folderName"]].append(row)
+    projects_instances = {
+        project: _ConsensusInstances(project_rows, annot_type)
+        for project, project_rows in rows.items()
+    }
+    # scores of the overlapping pairs of each pair of folders, points are matched
+    # by the distance instead
+    projects_scores = {}
+    if annot_type != "point":
+        for curr_proj, curr_instances in projects_instances.items():
+            for other_proj, other_instances in projects_instances.items():
+                if curr_proj != other_proj:
+                    projects_scores[curr_proj, other_proj] = curr_instances.get_scores(
+                        other_instances
+                    )
+
+    def get_score(curr_match, other_match) -> float:
+        (curr_proj, curr_id), (other_proj, other_id) = curr_match, other_match
+        if annot_type == "point":
+            return 0
+        scores = projects_scores[curr_proj, other_proj].get(curr_id)
+        if scores is None:
+            return 0
+        position = np.searchsorted(scores[0], other_id)
+        if position < len(scores[0]) and scores[0][position] == other_id:
+            return scores[1][position]
+        return 0
 
-    if annot_type == "tag":
-        return calculate_tag_consensus(image_df)
-    projects_shaply_objs = {}
-    # generate shapely objects of instances
-    for _, row in image_df.iterrows():
-        if row["folderName"] not in projects_shaply_objs:
-            projects_shaply_objs[row["folderName"]] = []
-        inst_data = row["meta"]
-        if annot_type == "bbox":
-            inst_coords = inst_data
-            x1, x2 = inst_coords["x1"], inst_coords["x2"]
-            y1, y2 = inst_coords["y1"], inst_coords["y2"]
-            inst = box(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
-        elif annot_type == "polygon":
-            inst_coords = inst_data
-            shapely_format = []
-            for i in range(0, len(inst_coords) - 1, 2):
-                shapely_format.append((inst_coords[i], inst_coords[i + 1]))
-            inst = Polygon(shapely_format)
-        elif annot_type == "point":
-            inst = Point(inst_data["x"], inst_data["y"])
-        if annot_type != "tag" and inst.is_valid:
-            projects_shaply_objs[row["folderName"]].append(
-                (inst, row["className"], row["creatorEmail"], row["attributes"])
-            )
-        else:
-            logger.info(
-                "Invalid %s instance occured, skipping to the next one.", annot_type
-            )
-    visited_instances = {}
-    for proj, instances in projects_shaply_objs.items():
-        visited_instances[proj] = [False] * len(instances)
-
-    # match instances
-    for curr_proj, curr_proj_instances in projects_shaply_objs.items():
-        for curr_id, curr_inst_data in enumerate(curr_proj_instances):
-            curr_inst, curr_class, _, _ = curr_inst_data
-            if visited_instances[curr_proj][curr_id] == True:
+    instance_id = 0
+    for curr_proj, curr_instances in projects_instances.items():
+        for curr_id in range(len(curr_instances)):
+            if curr_instances.visited[curr_id]:
                 continue
-            max_instances = []
-            for other_proj, other_proj_instances in projects_shaply_objs.items():
+            matches = []
+            for other_proj, other_instances in projects_instances.items():
                 if curr_proj == other_proj:
-                    max_instances.append((curr_proj, *curr_inst_data))
-                    visited_instances[curr_proj][curr_id] = True
+                    matches.append((curr_proj, curr_id))
+                    curr_instances.visited[curr_id] = True
                 else:
-                    if annot_type in ["polygon", "bbox", "tag"]:
-                        max_score = 0
-                    else:
-                        max_score = float("-inf")
-                    max_inst_data = None
-                    max_inst_id = -1
-                    for other_id, other_inst_data in enumerate(other_proj_instances):
-                        other_inst, other_class, _, _ = other_inst_data
-                        if visited_instances[other_proj][other_id] == True:
-                            continue
-                        score = instance_consensus(curr_inst, other_inst)
-                        if score > max_score and other_class == curr_class:
-                            max_score = score
-                            max_inst_data = other_inst_data
-                            max_inst_id = other_id
-                    if max_inst_data is not None:
-                        max_instances.append((other_proj, *max_inst_data))
-                        visited_instances[other_proj][max_inst_id] = True
-            if len(max_instances) == 1:
-                image_data["creatorEmail"].append(max_instances[0][3])
-                image_data["attributes"].append(max_instances[0][4])
-                image_data["area"].append(max_instances[0][1].area)
+                    other_id = curr_instances.match(
+                        curr_id,
+                        other_instances,
+                        projects_scores.get((curr_proj, other_proj)),
+                    )
+                    if other_id != -1:
+                        matches.append((other_proj, other_id))
+                        other_instances.visited[other_id] = True
+            for curr_match in matches:
+                proj, proj_id = curr_match
+                if len(matches) == 1:
+                    score = 0
+                else:
+                    # not overlapping matches and points count as a full agreement
+                    proj_cons = sum(
+                        1.0 if score <= 0 else score
+                        for score in (
+                            get_score(curr_match, other_match)
+                            for other_match in matches
+                            if other_match[0] != proj
+                        )
+                    )
+                    score = proj_cons / (projects_count - 1)
+                row = projects_instances[proj].rows[proj_id]
+                image_data["creatorEmail"].append(row["creatorEmail"])
+                image_data["attributes"].append(row["attributes"])
+                image_data["area"].append(projects_instances[proj].areas[proj_id])
                 image_data["itemName"].append(item_name)
                 image_data["instanceId"].append(instance_id)
-                image_data["className"].append(max_instances[0][2])
-                image_data["folderName"].append(max_instances[0][0])
-                image_data["score"].append(0)
-            else:
-                for curr_match_data in max_instances:
-                    proj_cons = 0
-                    for other_match_data in max_instances:
-                        if curr_match_data[0] != other_match_data[0]:
-                            score = instance_consensus(
-                                curr_match_data[1], other_match_data[1]
-                            )
-                            proj_cons += 1.0 if score <= 0 else score
-                    image_data["creatorEmail"].append(curr_match_data[3])
-                    image_data["attributes"].append(curr_match_data[4])
-                    image_data["area"].append(curr_match_data[1].area)
-                    image_data["itemName"].append(item_name)
-                    image_data["instanceId"].append(instance_id)
-                    image_data["className"].append(curr_match_data[2])
-                    image_data["folderName"].append(curr_match_data[0])
-                    image_data["score"].append(proj_cons / (len(all_projects) - 1))
+                image_data["className"].append(row["className"])
+                image_data["folderName"].append(proj)
+                image_data["score"].append(score)
             instance_id += 1
 
     return image_data
 
 
+def _images_consensus(images, annot_type, projects_count):
+    return pd.concat(
+        [
+            pd.DataFrame(
+                image_consensus(image_df, item_name, annot_type, projects_count)
+            )
+            for item_name, image_df in images
+        ],
+        ignore_index=True,
+    )
+
+
+def dataset_consensus(df, annot_type, max_workers=None, images_per_task=50):
+    """Computes consensus scores of all images, the rows are grouped by image once and
+    the images are scored in the current process, or in a process pool when more
+    than one worker is given by max_workers or the SA_CONSENSUS_WORKERS environment
+    variable. On platforms that spawn the worker processes (Windows, macOS) the
+    calling script has to be guarded with ``if __name__ == "__main__":``.
+
+    :param df: Annotation data of all images
+    :type df: pandas.DataFrame
+
+    :param annot_type: Type of annotation instances to consider. Available candidates are: ["bbox", "polygon", "point", "tag"]
+    :type annot_type: str
+
+    :param max_workers: The number of processes, by default SA_CONSENSUS_WORKERS or 1, which scores the images in the current process
+    :type max_workers: int
+
+    :param images_per_task: The number of images scored by a process at once
+    :type images_per_task: int
+    """
+    projects_count = len(set(df["folderName"]))
+    images = list(df.groupby("itemName", sort=False))
+    tasks = [
+        images[i : i + images_per_task]  # noqa: E203
+        for i in range(0, len(images), images_per_task)
+    ]
+    max_workers = min(max_workers or CONSENSUS_WORKERS, len(tasks))
+    if max_workers <= 1:
+        frames = [_images_consensus(task, annot_type, projects_count) for task in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            frames = list(
+                executor.map(
+                    _images_consensus,
+                    tasks,
+                    [annot_type] * len(tasks),
+                    [projects_count] * len(tasks),
+                )
+            )
+    if not frames:
+        return pd.DataFrame(image_consensus(df, None, annot_type, projects_count))
+    return pd.concat(frames, ignore_index=True)
+
+
 def consensus_plot(consensus_df, *_, **__):
     plot_data = consensus_df.copy()
 
@@ -0,0 +1,361 @@
+import json
+import logging
+from collections import defaultdict
+from collections import namedtuple
+from pathlib import Path
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from lib.app.exceptions import AppException
+
+logger = logging.getLogger("sa")
+
+BBOX_KEYS = ("x1", "y1", "x2", "y2")
+RBBOX_KEYS = ("x1", "y1", "x2", "y2", "x3", "y3", "x4", "y4")
+POINT_KEYS = ("x", "y")
+ANNOTATION_TYPE_KEYS = {"bbox": BBOX_KEYS, "rbbox": RBBOX_KEYS, "point": POINT_KEYS}
+# probability of the instances that don't have one
+DEFAULT_PROBABILITY = 100
+
+Instances = namedtuple("Instances", ["coordinates", "class_names", "probabilities"])
+
+
+def get_instances(annotation: dict, annotation_type: str) -> Instances:
+    """
+    Returns the coordinates, class names and probabilities of the instances of the
+    annotation type as arrays.
+    """
+    keys = ANNOTATION_TYPE_KEYS[annotation_type]
+    coordinates, class_names, probabilities = [], [], []
+    for instance in annotation.get("instances", []):
+        if instance.get("type") != annotation_type:
+            continue
+        values = instance if annotation_type == "point" else instance.get("points")
+        if not values or any(values.get(key) is None for key in keys):
+            continue
+        coordinates.append([values[key] for key in keys])
+        class_names.append(instance.get("className"))
+        probability = instance.get("probability")
+        probabilities.append(
+            DEFAULT_PROBABILITY if probability is None else probability
+        )
+    return Instances(
+        np.array(coordinates, dtype=float).reshape(-1, len(keys)),
+        np.array(class_names, dtype=object),
+        np.array(probabilities, dtype=float),
+    )
+
+
+def _get_bounds(coordinates: np.ndarray) -> np.ndarray:
+    xs, ys = coordinates[:, 0::2], coordinates[:, 1::2]
+    return np.stack([xs.min(1), ys.min(1), xs.max(1), ys.max(1)], axis=1)
+
+
+def _get_intersections(bounds_1: np.ndarray, bounds_2: np.ndarray) -> np.ndarray:
+    sizes = np.clip(
+        np.minimum(bounds_1[:, None, 2:], bounds_2[None, :, 2:])
+        - np.maximum(bounds_1[:, None, :2], bounds_2[None, :, :2]),
+        0,
+        None,
+    )
+    return sizes[..., 0] * sizes[..., 1]
+
+
+def _get_iou(intersections, areas_1, areas_2) -> np.ndarray:
+    unions = areas_1[:, None] + areas_2[None, :] - intersections
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(unions > 0, intersections / unions, 0.0)
+
+
+def bbox_iou_matrix(boxes_1: np.ndarray, boxes_2: np.ndarray) -> np.ndarray:
+    """
+    Returns the IoU of every pair of the (x1, y1, x2, y2) boxes.
+    """
+    bounds_1, bounds_2 = _get_bounds(boxes_1), _get_bounds(boxes_2)
+    areas_1 = np.prod(bounds_1[:, 2:] - bounds_1[:, :2], axis=1)
+    areas_2 = np.prod(bounds_2[:, 2:] - bounds_2[:, :2], axis=1)
+    return _get_iou(_get_intersections(bounds_1, bounds_2), areas_1, areas_2)
+
+
+def _get_polygon_areas(coordinates: np.ndarray) -> np.ndarray:
+    xs, ys = coordinates[:, 0::2], coordinates[:, 1::2]
+    return (
+        np.abs(
+            np.sum(xs * np.roll(ys, -1, axis=1) - np.roll(xs, -1, axis=1) * ys, axis=1)
+        )
+        / 2
+    )
+
+
+def rbbox_iou_matrix(rbboxes_1: np.ndarray, rbboxes_2: np.ndarray) -> np.ndarray:
+    """
+    Returns the IoU of every pair of the (x1, y1, ..., x4, y4) rotated boxes. The
+    intersections are computed with shapely only for the pairs with overlapping
+    bounds.
+    """
+    try:
+        import shapely
+    except ImportError:
+        raise ImportError(
+            "To compare rotated boxes please install shapely>=2.0 package."
+        )
+    iou = np.zeros((len(rbboxes_1), len(rbboxes_2)))
+    candidates = np.nonzero(
+        _get_intersections(_get_bounds(rbboxes_1), _get_bounds(rbboxes_2)) > 0
+    )
+    if not len(candidates[0]):
+        return iou
+    polygons_1 = shapely.polygons(rbboxes_1.reshape(-1, 4, 2))
+    polygons_2 = shapely.polygons(rbboxes_2.reshape(-1, 4, 2))
+    intersections = np.zeros_like(iou)
+    intersections[candidates] = shapely.area(
+        shapely.intersection(polygons_1[candidates[0]], polygons_2[candidates[1]])
+    )
+    return _get_iou(
+        intersections, _get_polygon_areas(rbboxes_1), _get_polygon_areas(rbboxes_2)
+    )
+
+
+def point_distance_matrix(points_1: np.ndarray, points_2: np.ndarray) -> np.ndarray:
+    """
+    Returns the distance of every pair of the (x, y) points.
+    """
+    return np.hypot(
+        points_1[:, None, 0] - points_2[None, :, 0],
+        points_1[:, None, 1] - points_2[None, :, 1],
+    )
+
+
+def greedy_match(
+    similarity: np.ndarray, valid: np.ndarray, order: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Matches each row in the order to the most similar valid column that is not
+    matched yet. Returns the matched row and column indexes.
+    """
+    rows, columns = [], []
+    matched = np.zeros(similarity.shape[1], dtype=bool)
+    for row in range(similarity.shape[0]) if order is None else order:
+        candidates = valid[row] & ~matched
+        if not candidates.any():
+            continue
+        column = np.argmax(np.where(candidates, similarity[row], -np.inf))
+        matched[column] = True
+        rows.append(row)
+        columns.append(column)
+    return np.array(rows, dtype=int), np.array(columns, dtype=int)
+
+
+def hungarian_match(
+    similarity: np.ndarray, valid: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Matches the rows and columns with the maximal total similarity of the valid
+    pairs. Returns the matched row and column indexes.
+    """
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        raise ImportError("To use the hungarian matching please install scipy package.")
+    if not valid.any():
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    # an invalid pair costs more than any set of valid pairs
+    penalty = np.abs(similarity[valid]).max() * (min(similarity.shape) + 1) + 1
+    cost = np.where(valid, -similarity, penalty)
+    rows, columns = linear_sum_assignment(cost)
+    matched = valid[rows, columns]
+    return rows[matched], columns[matched]
+
+
+def match_instances(
+    ground_truth: Instances,
+    predictions: Instances,
+    annotation_type: str = "bbox",
+    iou_threshold: float = 0.5,
+    distance_threshold: float = 10.0,
+    matching: str = "greedy",
+) -> np.ndarray:
+    """
+    Matches the predictions to the ground truth instances of the same class.
+    Boxes are matched when their IoU is at least iou_threshold and points when
+    their distance is at most distance_threshold, predictions with higher
+    probability are matched first. Returns the true positive flags of the
+    predictions.
+    """
+    true_positives = np.zeros(len(predictions.class_names), dtype=bool)
+    for class_name in set(predictions.class_names):
+        prediction_indexes = np.flatnonzero(predictions.class_names == class_name)
+        ground_truth_indexes = np.flatnonzero(ground_truth.class_names == class_name)
+        if not len(ground_truth_indexes):
+            continue
+        prediction_coordinates = predictions.coordinates[prediction_indexes]
+        ground_truth_coordinates = ground_truth.coordinates[ground_truth_indexes]
+        if annotation_type == "point":
+            distances = point_distance_matrix(
+                prediction_coordinates, ground_truth_coordinates
+            )
+            similarity, valid = -distances, distances <= distance_threshold
+        else:
+            iou_matrix = (
+                bbox_iou_matrix if annotation_type == "bbox" else rbbox_iou_matrix
+            )
+            similarity = iou_matrix(prediction_coordinates, ground_truth_coordinates)
+            valid = similarity >= iou_threshold
+        if matching == "greedy":
+            order = np.argsort(
+                -predictions.probabilities[prediction_indexes], kind="stable"
+            )
+            rows, _ = greedy_match(similarity, valid, order)
+        elif matching == "hungarian":
+            rows, _ = hungarian_match(similarity, valid)
+        else:
+            raise AppException(f"The {matching} matching is not supported.")
+        true_positives[prediction_indexes[rows]] = True
+    return true_positives
+
+
+def average_precision(
+    true_positives: np.ndarray, probabilities: np.ndarray, ground_truth_count: int
+) -> float:
+    """
+    Returns the area under the interpolated precision/recall curve of the
+    predictions ordered by probability.
+    """
+    if not ground_truth_count:
+        return np.nan
+    order = np.argsort(-probabilities, kind="stable")
+    true_positives = np.cumsum(true_positives[order])
+    recall = true_positives / ground_truth_count
+    precision = true_positives / np.arange(1, len(true_positives) + 1)
+    recall = np.concatenate([[0.0], recall, [1.0]])
+    precision = np.concatenate([[0.0], precision, [0.0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    changes = np.flatnonzero(recall[1:] != recall[:-1])
+    return float(
+        np.sum((recall[changes + 1] - recall[changes]) * precision[changes + 1])
+    )
+
+
+def compare_annotations(
+    ground_truth_path: Union[str, Path],
+    predictions_path: Union[str, Path],
+    annotation_type: str = "bbox",
+    iou_threshold: float = 0.5,
+    distance_threshold: float = 10.0,
+    matching: str = "greedy",
+) -> pd.DataFrame:
+    """Compares the annotations of two downloaded annotation folders, e.g. model
+    predictions against annotator outputs. The annotation files are paired by name.
+
+    :param ground_truth_path: folder of the reference annotation JSONs
+    :type ground_truth_path: Pathlike (str or Path)
+
+    :param predictions_path: folder of the compared annotation JSONs
+    :type predictions_path: Pathlike (str or Path)
+
+    :param annotation_type: one of "bbox", "rbbox" and "point"
+    :type annotation_type: str
+
+    :param iou_threshold: the minimal IoU of matched boxes
+    :type iou_threshold: float
+
+    :param distance_threshold: the maximal distance of matched points
+    :type distance_threshold: float
+
+    :param matching: "greedy" matches the predictions in the order of probability,
+     "hungarian" maximizes the total similarity and requires scipy
+    :type matching: str
+
+    :return: per class groundTruthCount, predictionCount, truePositives, precision,
+     recall and averagePrecision, the mean of averagePrecision is the mAP
+    :rtype: pandas DataFrame
+    """
+    if annotation_type not in ANNOTATION_TYPE_KEYS:
+        raise AppException(
+            f"The {annotation_type} annotation type is not supported for comparison."
+        )
+    ground_truth_path, predictions_path = Path(ground_truth_path), Path(
+        predictions_path
+    )
+    names = sorted(
+        {path.name for path in ground_truth_path.glob("*.json")}
+        | {path.name for path in predictions_path.glob("*.json")}
+    )
+    if not names:
+        logger.warning(f"Could not find annotations in {ground_truth_path}.")
+    ground_truth_counts = defaultdict(int)
+    class_true_positives = defaultdict(list)
+    class_probabilities = defaultdict(list)
+    for name in names:
+        ground_truth, predictions = (
+            get_instances(_load_annotation(path / name), annotation_type)
+            for path in (ground_truth_path, predictions_path)
+        )
+        true_positives = match_instances(
+            ground_truth,
+            predictions,
+            annotation_type,
+            iou_threshold,
+            distance_threshold,
+            matching,
+        )
+        for class_name in ground_truth.class_names:
+            ground_truth_counts[class_name] += 1
+        for class_name, true_positive, probability in zip(
+            predictions.class_names, true_positives, predictions.probabilities
+        ):
+            class_true_positives[class_name].append(true_positive)
+            class_probabilities[class_name].append(probability)
+    rows = []
+    for class_name in sorted(
+        set(ground_truth_counts) | set(class_true_positives), key=str
+    ):
+        ground_truth_count = ground_truth_counts[class_name]
+        true_positives = np.array(class_true_positives[class_name], dtype=bool)
+        prediction_count = len(true_positives)
+        true_positives_count = int(true_positives.sum())
+        rows.append(
+            {
+                "className": class_name,
+                "groundTruthCount": ground_truth_count,
+                "predictionCount": prediction_count,
+                "truePositives": true_positives_count,
+                "precision": (
+                    true_positives_count / prediction_count
+                    if prediction_count
+                    else np.nan
+                ),
+                "recall": (
+                    true_positives_count / ground_truth_count
+                    if ground_truth_count
+                    else np.nan
+                ),
+                "averagePrecision": average_precision(
+                    true_positives,
+                    np.array(class_probabilities[class_name], dtype=float),
+                    ground_truth_count,
+                ),
+            }
+        )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "className",
+            "groundTruthCount",
+            "predictionCount",
+            "truePositives",
+            "precision",
+            "recall",
+            "averagePrecision",
+        ],
+    )
+
+
+def _load_annotation(path: Path) -> dict:
+    if not path.is_file():
+        return {}
+    with open(path) as file:
+        return json.load(file)
@@ -1,5 +1,14 @@
+import collections
+import collections.abc
+import concurrent.futures
+import itertools
 import json
 import logging
+import os
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
 
 import numpy as np
 from tqdm import tqdm
@@ -53,6 +62,12 @@ def id2rgb(id_map):
     return color
 
 
+def rgb2id(rgb_map):
+    """Encodes the colors of the RGB map into uint32 ids, the inverse of id2rgb."""
+    rgb_map = rgb_map.astype(np.uint32)
+    return rgb_map[..., 0] | (rgb_map[..., 1] << 8) | (rgb_map[..., 2] << 16)
+
+
 def write_to_json(output_path, json_data):
     with open(output_path, "w") as fw:
         json.dump(json_data, fw, indent=2)
@@ -61,13 +76,61 @@ def write_to_json(output_path, json_data):
 MAX_IMAGE_SIZE = 100 * 1024 * 1024  # 100 MB limit
 
 
-def tqdm_converter(total_num, images_converted, images_not_converted, finish_event):
-    with tqdm(total=total_num) as pbar:
-        while True:
-            finished = finish_event.wait(5)
-            if not finished:
-                sum_all = len(images_converted) + len(images_not_converted)
-                pbar.update(sum_all - pbar.n)
-            else:
-                pbar.update(total_num - pbar.n)
-                break
+# the conversions run in the current process unless more workers are set
+CONVERSION_WORKERS = int(os.environ.get("SA_CONVERSION_WORKERS", 1))
+CONVERSION_CHUNK_SIZE = 16
+
+
+def _convert_chunk(function: Callable, chunk: List) -> List:
+    return [function(item) for item in chunk]
+
+
+def convert_in_pool(
+    function: Callable,
+    items: Iterable,
+    total: int = None,
+    max_workers: int = None,
+    chunk_size: int = CONVERSION_CHUNK_SIZE,
+) -> Iterator:
+    """
+    Applies the module level function to every item and yields the results in the
+    order of the items, while showing the conversion progress. With one worker,
+    the default, the items are converted in the current process. With more
+    workers, set by max_workers or the SA_CONVERSION_WORKERS environment variable,
+    a process pool is used, the items are consumed lazily and sent to the workers
+    in chunks of chunk_size with at most max_workers * 2 chunks processed ahead.
+    On platforms that spawn the worker processes (Windows, macOS) the calling
+    script has to be guarded with ``if __name__ == "__main__":``.
+    """
+    if total is None and isinstance(items, collections.abc.Sized):
+        total = len(items)
+    max_workers = max_workers or CONVERSION_WORKERS
+    if total is not None:
+        max_workers = min(max_workers, total or 1)
+    items = iter(items)
+    with tqdm(total=total) as progress:
+        if max_workers <= 1:
+            for item in items:
+                yield function(item)
+                progress.update()
+            return
+        futures = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            try:
+                for chunk in iter(
+                    lambda: list(itertools.islice(items, chunk_size)), []
+                ):
+                    futures.append(executor.submit(_convert_chunk, function, chunk))
+                    if len(futures) >= max_workers * 2:
+                        chunk_results = futures.popleft().result()
+                        yield from chunk_results
+                        progress.update(len(chunk_results))
+                while futures:
+                    chunk_results = futures.popleft().result()
+                    yield from chunk_results
+                    progress.update(len(chunk_results))
+            finally:
+                for future in futures:
+                    future.cancel()
@@ -1,17 +1,30 @@
+import concurrent.futures
 import os
+import queue
+import threading
 import uuid
 from pathlib import Path
+from typing import Iterator
 from typing import List
 from typing import Tuple
 from typing import Union
 
-import boto3
 import pandas as pd
+from lib.core.s3 import S3_CLIENTS
+from lib.infrastructure.utils import iter_files
 from superannotate.lib.app.exceptions import AppException
 from superannotate.lib.core import ATTACHED_VIDEO_ANNOTATION_POSTFIX
 from superannotate.lib.core import PIXEL_ANNOTATION_POSTFIX
 from superannotate.lib.core import VECTOR_ANNOTATION_POSTFIX
 
+S3_LIST_WORKERS = 16
+LOCAL_WALK_WORKERS = 8
+ANNOTATION_POSTFIXES = (
+    VECTOR_ANNOTATION_POSTFIX,
+    PIXEL_ANNOTATION_POSTFIX,
+    ATTACHED_VIDEO_ANNOTATION_POSTFIX,
+)
+
 
 def get_annotation_paths(folder_path, s3_bucket=None, recursive=False):
     annotation_paths = []
@@ -25,55 +38,90 @@ def get_annotation_paths(folder_path, s3_bucket=None, recursive=False):
 def get_local_annotation_paths(
     folder_path: Union[str, Path], annotation_paths: set, recursive: bool
 ) -> List[str]:
-    all_items = [*Path(folder_path).glob("*")]
-    all_folders = [i for i in all_items if i.is_dir()]
-    all_not_folders = [i for i in all_items if not i.is_dir()]
     annotation_paths.update(
-        [
-            str(i)
-            for i in all_not_folders
-            if i.name.endswith(
-                (
-                    VECTOR_ANNOTATION_POSTFIX,
-                    PIXEL_ANNOTATION_POSTFIX,
-                    ATTACHED_VIDEO_ANNOTATION_POSTFIX,
-                )
-            )
-        ]
+        iter_files(
+            folder_path,
+            ANNOTATION_POSTFIXES,
+            recursive=recursive,
+            max_workers=LOCAL_WALK_WORKERS,
+        )
     )
-    if recursive:
-        for folder in all_folders:
-            get_local_annotation_paths(
-                folder_path=folder,
-                annotation_paths=annotation_paths,
-                recursive=recursive,
-            )
     return list(annotation_paths)
 
 
-def get_s3_annotation_paths(folder_path, s3_bucket, annotation_paths, recursive):
-    s3_client = boto3.client("s3")
-    result = s3_client.list_objects(Bucket=s3_bucket, Prefix=folder_path, Delimiter="/")
-    result = result.get("CommonPrefixes")
-    if recursive and result:
-        for folder in result:
-            get_s3_annotation_paths(
-                folder.get("Prefix"), s3_bucket, annotation_paths, recursive
-            )
-
+def _list_s3_prefix(
+    s3_client, s3_bucket: str, prefix: str
+) -> Iterator[Tuple[list, list]]:
+    """
+    Yields the annotation keys and the sub prefixes of every listed page.
+    """
     paginator = s3_client.get_paginator("list_objects_v2")
-    for data in paginator.paginate(Bucket=s3_bucket, Prefix=folder_path):
-        for annotation in data.get("Contents", []):
-            key = annotation["Key"]
-            if (
-                key.endswith(VECTOR_ANNOTATION_POSTFIX)
-                or key.endswith(PIXEL_ANNOTATION_POSTFIX)
-                or key.endswith(ATTACHED_VIDEO_ANNOTATION_POSTFIX)
-            ):
-                if not recursive and "/" in key[len(folder_path) + 1 :]:
-                    continue
-                annotation_paths.append(key)
-    return list(set(annotation_paths))
+    for data in paginator.paginate(Bucket=s3_bucket, Prefix=prefix, Delimiter="/"):
+        keys = [
+            annotation["Key"]
+            for annotation in data.get("Contents", [])
+            if annotation["Key"].endswith(ANNOTATION_POSTFIXES)
+        ]
+        yield keys, [folder["Prefix"] for folder in data.get("CommonPrefixes", [])]
+
+
+def iter_s3_annotation_paths(
+    folder_path: str, s3_bucket: str, recursive: bool
+) -> Iterator[str]:
+    """
+    Lists every key under the prefix once, sub prefixes are listed concurrently
+    and the keys are yielded page by page.
+    """
+    prefix = str(folder_path) if folder_path else ""
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    s3_client = S3_CLIENTS.get_client()
+    if not recursive:
+        for keys, _ in _list_s3_prefix(s3_client, s3_bucket, prefix):
+            yield from keys
+        return
+    pages = queue.Queue()
+    stop_event = threading.Event()
+
+    def list_prefix(sub_prefix: str):
+        try:
+            for page in _list_s3_prefix(s3_client, s3_bucket, sub_prefix):
+                if stop_event.is_set():
+                    break
+                pages.put(page)
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(None)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=S3_LIST_WORKERS)
+    futures = [executor.submit(list_prefix, prefix)]
+    try:
+        running = 1
+        while running:
+            page = pages.get()
+            if page is None:
+                running -= 1
+                continue
+            if isinstance(page, Exception):
+                raise page
+            keys, prefixes = page
+            yield from keys
+            for sub_prefix in prefixes:
+                futures.append(executor.submit(list_prefix, sub_prefix))
+                running += 1
+    finally:
+        # on errors the queued listings are cancelled and the running ones stop
+        # after their current page, without waiting for them
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def get_s3_annotation_paths(folder_path, s3_bucket, annotation_paths, recursive):
+    annotation_paths.extend(iter_s3_annotation_paths(folder_path, s3_bucket, recursive))
+    return annotation_paths
 
 
 def get_name_url_duplicated_from_csv(csv_path):
@@ -15,18 +15,13 @@ def decode(coco_dict):
 
 def _masktoRLE(bitmask):
     shape = bitmask.shape
-    bitmask = bitmask.T.flatten()
-    N = len(bitmask)
-    diff_index = np.where(np.array(bitmask[: N - 1]) - np.array(bitmask[1:]))[0]
-    diff = np.array(diff_index[1:]) - np.array(diff_index[:-1])
-
-    counts = np.zeros(len(diff) + 3, dtype=np.int32)
-    counts[1] = diff_index[0] + 1
-    counts[2:-1] = diff
-    counts[-1] = len(bitmask) - diff_index[-1] - 1
-
-    if bitmask[0] == 0:
-        counts = counts[1:]
+    bitmask = np.asarray(bitmask).ravel(order="F")
+    # run boundaries of the column-major mask, the first run counts zeros
+    changes = np.flatnonzero(bitmask[1:] != bitmask[:-1]) + 1
+    boundaries = np.concatenate(([0], changes, [bitmask.size]))
+    counts = np.diff(boundaries).astype(np.int32)
+    if bitmask.size and bitmask[0]:
+        counts = np.concatenate(([0], counts)).astype(np.int32)
 
     return {"counts": counts, "size": list(shape)}
 
@@ -38,64 +33,46 @@ def _maskfrRLE(rle):
     return bitmask.reshape((rle["size"][1], rle["size"][0])).T
 
 
-def _toString(rle_counts):
-    rle_string = ""
-    for i, count in enumerate(rle_counts):
-        if i > 2:
-            count -= rle_counts[i - 2]
-
-        more = True
-        while more:
-            if count > 0:
-                count_binary = bin(count)
-                if len(count_binary[2:]) % 5 != 0:
-                    count_binary = (
-                        "0b" + "0" * (5 - len(count_binary[2:]) % 5) + count_binary[2:]
-                    )
-            else:
-                count_binary = bin(((1 << 35) - 1) & count)
-
-            count = count >> 5
-            last_bits = count_binary[-5:]
-
-            value = int(last_bits, 2)
-            if last_bits[0] == "1":
-                more = count != -1
-            else:
-                more = count != 0
+# 5 bit groups of a 32 bit count with the sign are at most 7 characters long
+_MAX_CHARS_PER_COUNT = 7
 
-            if more:
-                char = (value | 0x20) + 48
-            else:
-                char = value + 48
 
-            rle_string += chr(char)
-
-    return rle_string
+def _toString(rle_counts):
+    counts = np.asarray(rle_counts, dtype=np.int64)
+    values = counts.copy()
+    values[3:] -= counts[1:-2]
+
+    chars = np.zeros((len(values), _MAX_CHARS_PER_COUNT), dtype=np.uint8)
+    lengths = np.zeros(len(values), dtype=np.int64)
+    active = np.ones(len(values), dtype=bool)
+    for k in range(_MAX_CHARS_PER_COUNT):
+        if not active.any():
+            break
+        group = values & 0x1F
+        values >>= 5
+        more = np.where(group & 0x10, values != -1, values != 0)
+        chars[:, k] = group + 48 + (more << 5)
+        lengths += active
+        active &= more
+    chars = chars[np.arange(_MAX_CHARS_PER_COUNT) < lengths[:, None]]
+    return chars.tobytes().decode("ascii")
 
 
 def _frString(rle_string):
-    counts = []
-    i = 0
-    while i < len(rle_string):
-        more = True
-        k = 0
-        count = 0
-        while more:
-            value = ord(rle_string[i]) - 48
-            count |= (value & 0x1F) << 5 * k
-            more = value & 0x20
-            i += 1
-            k += 1
-            if not more and (value & 0x10):
-                count |= -1 << 5 * k
-
-        if len(counts) > 2:
-            count += counts[len(counts) - 2]
-
-        counts.append(count)
-
-    return counts
+    values = np.frombuffer(rle_string.encode("ascii"), dtype=np.uint8) - 48
+    if not values.size:
+        return []
+    ends = np.flatnonzero((values & 0x20) == 0)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    shifts = 5 * (np.arange(len(values)) - np.repeat(starts, lengths))
+    counts = np.add.reduceat((values & 0x1F).astype(np.int64) << shifts, starts)
+    negative = (values[ends] & 0x10).astype(bool)
+    counts[negative] -= np.int64(1) << (5 * lengths[negative])
+    # counts after the third one are stored as deltas to the count two places back
+    counts[1::2] = np.cumsum(counts[1::2])
+    counts[2::2] = np.cumsum(counts[2::2])
+    return counts.tolist()
 
 
 def _area(bitmask):
@@ -10,9 +10,11 @@ import cv2
 import numpy as np
 from PIL import Image
 
+from ....common import convert_in_pool
 from ....common import id2rgb
 from ....common import write_to_json
 from ..baseStrategy import baseStrategy
+from .coco_reader import CocoReader
 
 logger = logging.getLogger("sa")
 
@@ -56,8 +58,8 @@ class CocoBaseStrategy(baseStrategy):
         }
         return category
 
-    def _make_id_generator(self):
-        cur_id = 0
+    def _make_id_generator(self, start=0):
+        cur_id = start
         while True:
             cur_id += 1
             yield cur_id
@@ -272,12 +274,9 @@ class CocoBaseStrategy(baseStrategy):
 
         return image_info
 
-    def _create_sa_classes(self, json_path):
-        json_data = json.load(open(json_path))
-        classes_list = json_data["categories"]
-
+    def _create_sa_classes(self, categories):
         classes = []
-        for data in classes_list:
+        for data in categories:
             color = np.random.choice(range(256), size=3)
             hexcolor = "#%02x%02x%02x" % tuple(color)
             classes_dict = {
@@ -291,23 +290,24 @@ class CocoBaseStrategy(baseStrategy):
 
     def to_sa_format(self):
         json_data = self.export_root / (self.dataset_name + ".json")
-        sa_classes = self._create_sa_classes(json_data)
-        (self.output_dir / "classes").mkdir(parents=True, exist_ok=True)
-        write_to_json(self.output_dir / "classes" / "classes.json", sa_classes)
-        self.conversion_algorithm(json_data, self.output_dir)
-
-    def make_anno_json_generator(self):
-        json_data = None
+        with CocoReader(json_data) as coco:
+            sa_classes = self._create_sa_classes(coco.categories)
+            (self.output_dir / "classes").mkdir(parents=True, exist_ok=True)
+            write_to_json(self.output_dir / "classes" / "classes.json", sa_classes)
+            self.conversion_algorithm(coco, self.output_dir)
 
+    def get_anno_json_paths(self):
         if self.project_type == "Pixel":
-            jsons = list(Path(self.export_root).glob("*pixel.json"))
+            return list(Path(self.export_root).glob("*pixel.json"))
         elif self.project_type == "Vector":
-            jsons = list(Path(self.export_root).glob("*objects.json"))
+            return list(Path(self.export_root).glob("*objects.json"))
 
-        self.set_num_total_images(len(jsons))
-        for fpath in jsons:
-            with open(fpath) as fp:
-                json_data = json.load(fp)
-                json_data = self._parse_json_into_common_format(json_data, fpath)
+    def load_anno_json(self, fpath):
+        with open(fpath) as fp:
+            json_data = json.load(fp)
+        return self._parse_json_into_common_format(json_data, fpath)
 
-            yield json_data
+    def make_anno_json_generator(self):
+        jsons = self.get_anno_json_paths()
+        self.set_num_total_images(len(jsons))
+        return convert_in_pool(self.load_anno_json, jsons)
@@ -0,0 +1,240 @@
+"""
+Streaming reader of COCO JSON files
+"""
+import itertools
+import json
+import os
+import re
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Iterator
+from typing import Set
+from typing import Tuple
+
+READ_CHUNK_SIZE = 1024 * 1024
+INSERT_BATCH_SIZE = 10000
+# the index of smaller files is kept in memory, larger ones spill to a temporary file
+IN_MEMORY_INDEX_LIMIT = 128 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# characters that may continue a number, like 1. or 1e cut at the end of a chunk
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """
+    Incremental decoder of the JSON values of a text file, which keeps only the
+    not yet decoded part of the file in memory.
+    """
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._buffer = ""
+        self._position = 0
+
+    def _read(self) -> bool:
+        chunk = self._fp.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._position :] + chunk  # noqa: E203
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips the whitespace and returns the next character, empty at the end."""
+        while True:
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer) or not self._read():
+                return self._buffer[self._position : self._position + 1]  # noqa: E203
+
+    def skip(self, char: str) -> bool:
+        if self.peek() != char:
+            return False
+        self._position += 1
+        return True
+
+    def expect(self, char: str):
+        if not self.skip(char):
+            raise json.JSONDecodeError(
+                f"Expecting '{char}'", self._buffer, self._position
+            )
+
+    def decode(self) -> Tuple[object, str]:
+        """Returns the next JSON value and its text."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._read():
+                    continue
+                raise
+            # a number at the end of the buffer may continue in the next chunk
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and _NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer)
+                and self._read()
+            ):
+                continue
+            break
+        text = self._buffer[self._position : end]  # noqa: E203
+        self._position = end
+        return value, text
+
+
+def iter_json_object(fp) -> Iterator[Tuple[str, object, str]]:
+    """
+    Parses the top level JSON object of the file incrementally and yields the key,
+    the value and the JSON text of the value for every item of the array values,
+    and for every other value.
+    """
+    stream = _JsonStream(fp)
+    stream.expect("{")
+    if stream.skip("}"):
+        return
+    while True:
+        key, _ = stream.decode()
+        stream.expect(":")
+        if stream.skip("["):
+            if not stream.skip("]"):
+                while True:
+                    yield (key, *stream.decode())
+                    if not stream.skip(","):
+                        break
+                stream.expect("]")
+        else:
+            yield (key, *stream.decode())
+        if not stream.skip(","):
+            break
+    stream.expect("}")
+
+
+def _image_name(image: dict) -> str:
+    if "file_name" in image:
+        return Path(image["file_name"]).name
+    return image["coco_url"].split("/")[-1]
+
+
+class CocoReader:
+    """
+    Indexes the images, the categories and the annotations of a COCO JSON file in
+    one streaming pass. The categories are kept in memory, while the images and
+    the annotations are kept in a SQLite database, so the memory usage does not
+    depend on the size of the dataset. Images with the same name overwrite each
+    other and the last one is kept.
+    """
+
+    def __init__(self, coco_path):
+        self.categories = []
+        self._temp_dir = None
+        if os.path.getsize(coco_path) <= IN_MEMORY_INDEX_LIMIT:
+            self._connection = sqlite3.connect(":memory:")
+        else:
+            self._temp_dir = tempfile.TemporaryDirectory()
+            self._connection = sqlite3.connect(
+                os.path.join(self._temp_dir.name, "coco.db")
+            )
+            self._connection.execute("PRAGMA journal_mode=OFF")
+            self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute(
+            "CREATE TABLE images "
+            "(seq INTEGER PRIMARY KEY, id TEXT, name TEXT, data TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE annotations "
+            "(seq INTEGER PRIMARY KEY, image_id TEXT, id, data TEXT)"
+        )
+        try:
+            self._index(coco_path)
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+        if self._temp_dir:
+            self._temp_dir.cleanup()
+
+    def _index(self, coco_path):
+        images, annotations = [], []
+        with open(coco_path) as fp:
+            for key, value, text in iter_json_object(fp):
+                if key == "images":
+                    images.append((str(value["id"]), _image_name(value), text))
+                elif key == "annotations":
+                    annotations.append((str(value["image_id"]), value.get("id"), text))
+                elif key == "categories":
+                    self.categories.append(value)
+                if len(images) >= INSERT_BATCH_SIZE:
+                    self._insert("images", images)
+                if len(annotations) >= INSERT_BATCH_SIZE:
+                    self._insert("annotations", annotations)
+        self._insert("images", images)
+        self._insert("annotations", annotations)
+        self._connection.execute("CREATE INDEX images_id ON images (id)")
+        self._connection.execute(
+            "CREATE INDEX annotations_image_id ON annotations (image_id, seq)"
+        )
+        self._connection.commit()
+
+    def _insert(self, table: str, rows: list):
+        self._connection.executemany(
+            f"INSERT INTO {table} VALUES (NULL, ?, ?, ?)", rows
+        )
+        rows.clear()
+
+    _LAST_IMAGES = "SELECT MAX(seq) FROM images GROUP BY name"
+
+    def _count(self, query: str) -> int:
+        return self._connection.execute(f"SELECT COUNT(*) FROM ({query})").fetchone()[0]
+
+    def get_images_count(self) -> int:
+        return self._count(self._LAST_IMAGES)
+
+    def get_annotations_count(self) -> int:
+        return self._count("SELECT seq FROM annotations")
+
+    def get_repeated_annotation_ids(self) -> Set:
+        return {
+            row[0]
+            for row in self._connection.execute(
+                "SELECT id FROM annotations WHERE id IS NOT NULL "
+                "GROUP BY id HAVING COUNT(*) > 1"
+            )
+        }
+
+    def iter_images(self) -> Iterator[Tuple[str, dict, list]]:
+        """Yields the name, the image and the annotations of every image."""
+        rows = self._connection.execute(
+            "SELECT images.seq, images.name, images.data, annotations.data "
+            "FROM images LEFT JOIN annotations ON annotations.image_id = images.id "
+            f"WHERE images.seq IN ({self._LAST_IMAGES}) "
+            "ORDER BY images.seq, annotations.seq"
+        )
+        for _, image_rows in itertools.groupby(rows, key=lambda row: row[0]):
+            image_rows = list(image_rows)
+            yield (
+                image_rows[0][1],
+                json.loads(image_rows[0][2]),
+                [json.loads(row[3]) for row in image_rows if row[3] is not None],
+            )
+
+    def iter_annotations(self) -> Iterator[Tuple[dict, dict]]:
+        """Yields every annotation with its image, None if the image is missing."""
+        rows = self._connection.execute(
+            "SELECT annotations.data, images.data FROM annotations LEFT JOIN images "
+            "ON images.seq = "
+            "(SELECT MAX(seq) FROM images WHERE id = annotations.image_id) "
+            "ORDER BY annotations.seq"
+        )
+        for annotation, image in rows:
+            yield json.loads(annotation), json.loads(image) if image else None
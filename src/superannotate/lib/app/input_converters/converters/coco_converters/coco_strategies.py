@@ -1,15 +1,15 @@
 """
 """
 import logging
-import threading
+from functools import partial
 from pathlib import Path
 
 from PIL import Image
 
+from ....common import convert_in_pool
 from ....common import id2rgb
-from ....common import tqdm_converter
-from ....common import write_to_json
 from .coco_converter import CocoBaseStrategy
+from .coco_writer import CocoWriter
 
 logger = logging.getLogger("sa")
 
@@ -28,52 +28,80 @@ class CocoPanopticConverterStrategy(CocoBaseStrategy):
         )
         return res
 
-    def sa_to_output_format(self):
-        out_json = self._create_skeleton()
-        out_json["categories"] = self._create_categories(
-            self.export_root / "classes_mapper.json"
-        )
-
-        images = []
-        annotations = []
-        id_generator = self._make_id_generator()
-        annot_id_generator = self._make_id_generator()
-
-        jsons = self.make_anno_json_generator()
-        images_converted = []
-        images_not_converted = []
-        total_num = self.get_num_total_images()
-        finish_event = threading.Event()
-        tqdm_thread = threading.Thread(
-            target=tqdm_converter,
-            args=(total_num, images_converted, images_not_converted, finish_event),
-            daemon=True,
+    def _iter_items(self, jsons):
+        """
+        Loads the annotation jsons in order, the segment ids of each image
+        continue the ids of the previous images.
+        """
+        segments_count = 0
+        for idx, fpath in enumerate(jsons, 1):
+            json_ = self.load_anno_json(fpath)
+            first_segment_id = segments_count
+            segments_count += sum(
+                "parts" in instance for instance in json_["instances"]
+            )
+            yield idx, json_, first_segment_id
+
+    def _convert_single(self, item):
+        id_, json_, first_segment_id = item
+        res = self._sa_to_coco_single(
+            id_, json_, self._make_id_generator(first_segment_id)
         )
-        logger.info("Converting to COCO JSON format")
-        tqdm_thread.start()
-        for json_ in jsons:
-            idx = next(annot_id_generator)
-            res = self._sa_to_coco_single(idx, json_, id_generator)
 
-            panoptic_mask = json_["metadata"]["panoptic_mask"]
+        panoptic_mask = json_["metadata"]["panoptic_mask"]
 
-            Image.fromarray(id2rgb(res[2])).save(panoptic_mask)
+        Image.fromarray(id2rgb(res[2])).save(panoptic_mask)
 
-            annotation = {
-                "image_id": res[0]["id"],
-                "file_name": Path(panoptic_mask).name,
-                "segments_info": res[1],
-            }
-            annotations.append(annotation)
+        annotation = {
+            "image_id": res[0]["id"],
+            "file_name": Path(panoptic_mask).name,
+            "segments_info": res[1],
+        }
+        return res[0], annotation
 
-            images.append(res[0])
-            images_converted.append(json_)
+    def sa_to_output_format(self):
+        jsons = self.get_anno_json_paths()
+        self.set_num_total_images(len(jsons))
 
-        out_json["annotations"] = annotations
-        out_json["images"] = images
-        write_to_json(self.output_dir / f"{self.dataset_name}.json", out_json)
-        finish_event.set()
-        tqdm_thread.join()
+        logger.info("Converting to COCO JSON format")
+        with CocoWriter(
+            self.output_dir / f"{self.dataset_name}.json", self._create_skeleton()
+        ) as writer:
+            for image, annotation in convert_in_pool(
+                self._convert_single, self._iter_items(jsons), total=len(jsons)
+            ):
+                writer.add_image(image)
+                writer.add_annotation(annotation)
+            writer.skeleton["categories"] = self._create_categories(
+                self.export_root / "classes_mapper.json"
+            )
+
+
+def _make_annotation(task, category_id, image_id, bbox, segmentation, area, anno_id):
+    if task == "object_detection":
+        segmentation = [
+            [
+                bbox[0],
+                bbox[1],
+                bbox[0],
+                bbox[1] + bbox[3],
+                bbox[0] + bbox[2],
+                bbox[1] + bbox[3],
+                bbox[0] + bbox[2],
+                bbox[1],
+            ]
+        ]
+    annotation = {
+        "id": anno_id,  # making sure ids are unique
+        "image_id": image_id,
+        "segmentation": segmentation,
+        "iscrowd": 0,
+        "bbox": bbox,
+        "area": area,
+        "category_id": category_id,
+    }
+
+    return annotation
 
 
 class CocoObjectDetectionStrategy(CocoBaseStrategy):
@@ -85,81 +113,47 @@ class CocoObjectDetectionStrategy(CocoBaseStrategy):
         image_commons = self._prepare_single_image_commons(
             id_, annotation_json["metadata"]
         )
-
-        def make_annotation(category_id, image_id, bbox, segmentation, area, anno_id):
-            if self.task == "object_detection":
-                segmentation = [
-                    [
-                        bbox[0],
-                        bbox[1],
-                        bbox[0],
-                        bbox[1] + bbox[3],
-                        bbox[0] + bbox[2],
-                        bbox[1] + bbox[3],
-                        bbox[0] + bbox[2],
-                        bbox[1],
-                    ]
-                ]
-            annotation = {
-                "id": anno_id,  # making sure ids are unique
-                "image_id": image_id,
-                "segmentation": segmentation,
-                "iscrowd": 0,
-                "bbox": bbox,
-                "area": area,
-                "category_id": category_id,
-            }
-
-            return annotation
-
         res = self.conversion_algorithm(
-            make_annotation, image_commons, annotation_json["instances"], id_generator
+            partial(_make_annotation, self.task),
+            image_commons,
+            annotation_json["instances"],
+            id_generator,
         )
         return res
 
-    def sa_to_output_format(self):
-        out_json = self._create_skeleton()
-        out_json["categories"] = self._create_categories(
-            self.export_root / "classes_mapper.json"
-        )
-
-        images = []
-        annotations = []
+    def _convert_single(self, item):
+        """
+        Converts the image with annotation ids starting from 1, returns the number
+        of the used ids to shift the ids after the ids of the previous images.
+        """
+        id_, fpath = item
         id_generator = self._make_id_generator()
-        annot_id_generator = self._make_id_generator()
-        jsons = self.make_anno_json_generator()
-
-        images_converted = []
-        images_not_converted = []
-        finish_event = threading.Event()
-        total_num = self.get_num_total_images()
-        tqdm_thread = threading.Thread(
-            target=tqdm_converter,
-            args=(total_num, images_converted, images_not_converted, finish_event),
-            daemon=True,
+        image_info, annotations = self._sa_to_coco_single(
+            id_, self.load_anno_json(fpath), id_generator
         )
+        return image_info, annotations, next(id_generator) - 1
+
+    def sa_to_output_format(self):
+        jsons = self.get_anno_json_paths()
+        self.set_num_total_images(len(jsons))
         logger.info("Converting to COCO JSON format")
-        tqdm_thread.start()
-        for json_ in jsons:
-            idx = next(annot_id_generator)
-            try:
-                images_converted.append(json_)
-                res = self._sa_to_coco_single(idx, json_, id_generator)
-            except Exception as e:
-                images_not_converted.append(json_)
-                raise
-
-            images.append(res[0])
-            if len(res[1]) < 1:
-                self.increase_converted_count()
-            for ann in res[1]:
-                annotations.append(ann)
-        out_json["annotations"] = annotations
-        out_json["images"] = images
-
-        write_to_json(self.output_dir / f"{self.dataset_name}.json", out_json)
-        finish_event.set()
-        tqdm_thread.join()
+        used_ids_count = 0
+        with CocoWriter(
+            self.output_dir / f"{self.dataset_name}.json", self._create_skeleton()
+        ) as writer:
+            for image_info, image_annotations, image_ids_count in convert_in_pool(
+                self._convert_single, enumerate(jsons, 1)
+            ):
+                writer.add_image(image_info)
+                if len(image_annotations) < 1:
+                    self.increase_converted_count()
+                for ann in image_annotations:
+                    ann["id"] += used_ids_count
+                    writer.add_annotation(ann)
+                used_ids_count += image_ids_count
+            writer.skeleton["categories"] = self._create_categories(
+                self.export_root / "classes_mapper.json"
+            )
 
 
 class CocoKeypointDetectionStrategy(CocoBaseStrategy):
@@ -167,25 +161,21 @@ class CocoKeypointDetectionStrategy(CocoBaseStrategy):
         super().__init__(args)
 
     def sa_to_output_format(self):
-        out_json = self._create_skeleton()
         jsons = self.make_anno_json_generator()
 
-        total_num = self.get_num_total_images()
         id_generator = self._make_id_generator()
         id_generator_anno = self._make_id_generator()
         id_generator_img = self._make_id_generator()
 
-        res = self.conversion_algorithm(
-            jsons,
-            id_generator,
-            id_generator_anno,
-            id_generator_img,
-            self._make_image_info,
-            total_num,
-        )
-
-        out_json["categories"] = res[0]
-        out_json["annotations"] = res[1]
-        out_json["images"] = res[2]
-        write_to_json(self.output_dir / f"{self.dataset_name}.json", out_json)
-        self.set_num_converted(len(out_json["images"]))
+        with CocoWriter(
+            self.output_dir / f"{self.dataset_name}.json", self._create_skeleton()
+        ) as writer:
+            writer.skeleton["categories"] = self.conversion_algorithm(
+                jsons,
+                writer,
+                id_generator,
+                id_generator_anno,
+                id_generator_img,
+                self._make_image_info,
+            )
+        self.set_num_converted(self.get_num_total_images())
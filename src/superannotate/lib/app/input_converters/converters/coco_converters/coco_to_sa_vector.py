@@ -1,15 +1,13 @@
 """
 COCO to SA conversion methods
 """
-import json
 import logging
-import threading
-from pathlib import Path
+from functools import partial
 
 import cv2
 import numpy as np
 
-from ....common import tqdm_converter
+from ....common import convert_in_pool
 from ....common import write_to_json
 from ..sa_json_helper import _create_sa_json
 from ..sa_json_helper import _create_vector_instance
@@ -37,136 +35,142 @@ def annot_to_polygon(annot):
     return segments
 
 
-def save_sa_jsons(coco_json, img_id_to_annot, output_dir):
-    images_converted = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(coco_json["images"]), images_converted, [], finish_event),
-        daemon=True,
-    )
-    logger.info("Writting to disk")
-    tqdm_thread.start()
-    for img in coco_json["images"]:
-        if "file_name" in img:
-            image_path = Path(img["file_name"]).name
-        else:
-            image_path = img["coco_url"].split("/")[-1]
-
-        if str(img["id"]) not in img_id_to_annot:
-            sa_instances = []
-        else:
-            sa_instances = img_id_to_annot[str(img["id"])]
-        file_name = f"{image_path}.json"
-
-        sa_metadata = {
-            "name": image_path,
-            "width": img["width"],
-            "height": img["height"],
-        }
-        json_template = _create_sa_json(sa_instances, sa_metadata)
-        write_to_json(output_dir / file_name, json_template)
-    finish_event.set()
-    tqdm_thread.join()
+def _save_sa_json(create_instances, output_dir, image):
+    image_path, img, annotations = image
+    sa_instances = []
+    for annot in annotations:
+        sa_instances.extend(create_instances(annot))
+
+    sa_metadata = {
+        "name": image_path,
+        "width": img["width"],
+        "height": img["height"],
+    }
+    json_template = _create_sa_json(sa_instances, sa_metadata)
+    write_to_json(output_dir / f"{image_path}.json", json_template)
+
+
+def save_sa_jsons(coco, create_instances, output_dir):
+    logger.info("Converting to SuperAnnotate JSON format")
+    for _ in convert_in_pool(
+        partial(_save_sa_json, create_instances, output_dir),
+        coco.iter_images(),
+        total=coco.get_images_count(),
+    ):
+        pass
+
+
+def _instance_segmentation_instances(cat_id_to_cat, grouped_ids, annot):
+    if isinstance(annot["segmentation"], dict):
+        annot["segmentation"] = annot_to_polygon(annot["segmentation"])
 
+    cat = cat_id_to_cat[annot["category_id"]]
+    sa_instances = []
+    for polygon in annot["segmentation"]:
+        sa_obj = _create_vector_instance("polygon", polygon, {}, [], cat["name"])
+        if "id" in annot and annot["id"] in grouped_ids and annot["id"] != 0:
+            sa_obj["groupId"] = annot["id"]
+        sa_instances.append(sa_obj)
+    return sa_instances
 
-def coco_instance_segmentation_to_sa_vector(coco_path, output_dir):
-    coco_json = json.load(open(coco_path))
+
+def coco_instance_segmentation_to_sa_vector(coco, output_dir):
     cat_id_to_cat = {}
-    for cat in coco_json["categories"]:
+    for cat in coco.categories:
         cat_id_to_cat[cat["id"]] = cat
 
-    instance_groups = {}
-    for annot in coco_json["annotations"]:
-        if "id" in annot:
-            if annot["id"] in instance_groups:
-                instance_groups[annot["id"]] += 1
-            else:
-                instance_groups[annot["id"]] = 1
-
-    image_id_to_annotations = {}
-    annotations_processed = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(coco_json["annotations"]), annotations_processed, [], finish_event),
-        daemon=True,
+    grouped_ids = coco.get_repeated_annotation_ids()
+    save_sa_jsons(
+        coco,
+        partial(_instance_segmentation_instances, cat_id_to_cat, grouped_ids),
+        output_dir,
     )
-    logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-    for annot in coco_json["annotations"]:
-        if isinstance(annot["segmentation"], dict):
-            annot["segmentation"] = annot_to_polygon(annot["segmentation"])
-
-        cat = cat_id_to_cat[annot["category_id"]]
-        groupid = 0
-        for polygon in annot["segmentation"]:
-            if (
-                "id" in annot
-                and annot["id"] in instance_groups
-                and instance_groups[annot["id"]] > 1
-            ):
-                groupid = annot["id"]
-
-            sa_obj = _create_vector_instance("polygon", polygon, {}, [], cat["name"])
-            if groupid != 0:
-                sa_obj["groupId"] = groupid
-
-            if str(annot["image_id"]) not in image_id_to_annotations:
-                image_id_to_annotations[str(annot["image_id"])] = [sa_obj]
-            else:
-                image_id_to_annotations[str(annot["image_id"])].append(sa_obj)
-        annotations_processed.append(annot)
-    finish_event.set()
-    tqdm_thread.join()
-    save_sa_jsons(coco_json, image_id_to_annotations, output_dir)
-
-
-def coco_object_detection_to_sa_vector(coco_path, output_dir):
-    coco_json = json.load(open(coco_path))
+
+
+def _object_detection_instances(cat_id_to_cat, annot):
+    cat = cat_id_to_cat[annot["category_id"]]
+    points = (
+        annot["bbox"][0],
+        annot["bbox"][1],
+        annot["bbox"][0] + annot["bbox"][2],
+        annot["bbox"][1] + annot["bbox"][3],
+    )
+    return [_create_vector_instance("bbox", points, {}, [], cat["name"])]
+
+
+def coco_object_detection_to_sa_vector(coco, output_dir):
     cat_id_to_cat = {}
-    for cat in coco_json["categories"]:
+    for cat in coco.categories:
         cat_id_to_cat[cat["id"]] = cat
 
-    image_id_to_annotations = {}
-    annotations_processed = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(coco_json["annotations"]), annotations_processed, [], finish_event),
-        daemon=True,
-    )
-    logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-    for annot in coco_json["annotations"]:
-        if isinstance(annot["segmentation"], dict):
-            annot["segmentation"] = annot_to_polygon(annot["segmentation"])
-        cat = cat_id_to_cat[annot["category_id"]]
-
-        points = (
-            annot["bbox"][0],
-            annot["bbox"][1],
-            annot["bbox"][0] + annot["bbox"][2],
-            annot["bbox"][1] + annot["bbox"][3],
-        )
-
-        sa_obj = _create_vector_instance("bbox", points, {}, [], cat["name"])
-
-        if str(annot["image_id"]) not in image_id_to_annotations:
-            image_id_to_annotations[str(annot["image_id"])] = [sa_obj]
-        else:
-            image_id_to_annotations[str(annot["image_id"])].append(sa_obj)
-        annotations_processed.append(annot)
-    finish_event.set()
-    tqdm_thread.join()
-    save_sa_jsons(coco_json, image_id_to_annotations, output_dir)
-
-
-def coco_keypoint_detection_to_sa_vector(coco_path, output_dir):
-    coco_json = json.load(open(coco_path))
+    save_sa_jsons(coco, partial(_object_detection_instances, cat_id_to_cat), output_dir)
+
+
+def _keypoint_detection_instances(cat_id_to_cat, annot):
+    if annot["num_keypoints"] > 0:
+        sa_points = [
+            item
+            for index, item in enumerate(annot["keypoints"])
+            if (index + 1) % 3 != 0
+        ]
+
+        sa_points = [
+            (sa_points[i], sa_points[i + 1]) for i in range(0, len(sa_points), 2)
+        ]
+        if annot["category_id"] in cat_id_to_cat.keys():
+            keypoint_names = cat_id_to_cat[annot["category_id"]]["keypoints"]
+
+            bad_points = []
+            id_mapping = {}
+            index = 1
+            points = []
+            for point_index, point in enumerate(sa_points):
+                if sa_points[point_index] == (0, 0):
+                    bad_points.append(point_index + 1)
+                    continue
+                id_mapping[point_index + 1] = index
+                points.append({"id": index, "x": point[0], "y": point[1]})
+                index += 1
+
+            connections = []
+            for connection in cat_id_to_cat[annot["category_id"]]["skeleton"]:
+
+                from_point = connection[0]
+                to_point = connection[1]
+
+                if from_point in bad_points or to_point in bad_points:
+                    continue
+
+                connections.append(
+                    {
+                        "id": index + 1,
+                        "from": id_mapping[from_point],
+                        "to": id_mapping[to_point],
+                    }
+                )
 
+            pointLabels = {}
+            for kp_index, kp_name in enumerate(keypoint_names):
+                if kp_index + 1 in bad_points:
+                    continue
+                pointLabels[id_mapping[kp_index + 1] - 1] = kp_name
+
+            sa_obj = _create_vector_instance(
+                "template",
+                points,
+                pointLabels,
+                [],
+                cat_id_to_cat[annot["category_id"]]["supercategory"],
+                connections,
+                template_name=cat_id_to_cat[annot["category_id"]]["name"],
+            )
+            return [sa_obj]
+    return []
+
+
+def coco_keypoint_detection_to_sa_vector(coco, output_dir):
     cat_id_to_cat = {}
-    for cat in coco_json["categories"]:
+    for cat in coco.categories:
         cat_id_to_cat[cat["id"]] = {
             "name": cat["name"],
             "keypoints": cat["keypoints"],
@@ -174,79 +178,6 @@ def coco_keypoint_detection_to_sa_vector(coco_path, output_dir):
             "supercategory": cat["supercategory"],
         }
 
-    image_id_to_annotations = {}
-    annotations_processed = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(coco_json["annotations"]), annotations_processed, [], finish_event),
-        daemon=True,
+    save_sa_jsons(
+        coco, partial(_keypoint_detection_instances, cat_id_to_cat), output_dir
     )
-    logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-    for annot in coco_json["annotations"]:
-        if annot["num_keypoints"] > 0:
-            sa_points = [
-                item
-                for index, item in enumerate(annot["keypoints"])
-                if (index + 1) % 3 != 0
-            ]
-
-            sa_points = [
-                (sa_points[i], sa_points[i + 1]) for i in range(0, len(sa_points), 2)
-            ]
-            if annot["category_id"] in cat_id_to_cat.keys():
-                keypoint_names = cat_id_to_cat[annot["category_id"]]["keypoints"]
-
-                bad_points = []
-                id_mapping = {}
-                index = 1
-                points = []
-                for point_index, point in enumerate(sa_points):
-                    if sa_points[point_index] == (0, 0):
-                        bad_points.append(point_index + 1)
-                        continue
-                    id_mapping[point_index + 1] = index
-                    points.append({"id": index, "x": point[0], "y": point[1]})
-                    index += 1
-
-                connections = []
-                for connection in cat_id_to_cat[annot["category_id"]]["skeleton"]:
-
-                    from_point = connection[0]
-                    to_point = connection[1]
-
-                    if from_point in bad_points or to_point in bad_points:
-                        continue
-
-                    connections.append(
-                        {
-                            "id": index + 1,
-                            "from": id_mapping[from_point],
-                            "to": id_mapping[to_point],
-                        }
-                    )
-
-                pointLabels = {}
-                for kp_index, kp_name in enumerate(keypoint_names):
-                    if kp_index + 1 in bad_points:
-                        continue
-                    pointLabels[id_mapping[kp_index + 1] - 1] = kp_name
-
-                sa_obj = _create_vector_instance(
-                    "template",
-                    points,
-                    pointLabels,
-                    [],
-                    cat_id_to_cat[annot["category_id"]]["supercategory"],
-                    connections,
-                    template_name=cat_id_to_cat[annot["category_id"]]["name"],
-                )
-                if str(annot["image_id"]) not in image_id_to_annotations:
-                    image_id_to_annotations[str(annot["image_id"])] = [sa_obj]
-                else:
-                    image_id_to_annotations[str(annot["image_id"])].append(sa_obj)
-        annotations_processed.append(annot)
-    finish_event.set()
-    tqdm_thread.join()
-    save_sa_jsons(coco_json, image_id_to_annotations, output_dir)
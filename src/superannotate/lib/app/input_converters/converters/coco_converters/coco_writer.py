@@ -0,0 +1,68 @@
+"""
+Streaming writer of COCO JSON files
+"""
+import json
+import shutil
+import tempfile
+
+STREAMED_ITEMS = ("images", "annotations")
+
+
+def _dumps(value, level: int) -> str:
+    """Returns the JSON text of the value nested at the level of an indent=2 dump."""
+    return json.dumps(value, indent=2).replace("\n", "\n" + "  " * level)
+
+
+class CocoWriter:
+    """
+    Writes a COCO JSON file incrementally. The images and the annotations are
+    spooled to temporary files as they are added, and are joined with the other
+    items of the skeleton, like the categories which are known only at the end,
+    when the writer is closed. The file is written in the same format as
+    write_to_json writes it.
+    """
+
+    def __init__(self, path, skeleton: dict):
+        self.skeleton = skeleton
+        self._path = path
+        self._files = {key: tempfile.TemporaryFile("w+") for key in STREAMED_ITEMS}
+        self._counts = dict.fromkeys(STREAMED_ITEMS, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self._write()
+        finally:
+            for fp in self._files.values():
+                fp.close()
+
+    def _add(self, key: str, item: dict):
+        fp = self._files[key]
+        if self._counts[key]:
+            fp.write(",\n")
+        fp.write("    " + _dumps(item, 2))
+        self._counts[key] += 1
+
+    def add_image(self, image: dict):
+        self._add("images", image)
+
+    def add_annotation(self, annotation: dict):
+        self._add("annotations", annotation)
+
+    def _write(self):
+        with open(self._path, "w") as fw:
+            fw.write("{")
+            for i, (key, value) in enumerate(self.skeleton.items()):
+                fw.write(",\n  " if i else "\n  ")
+                fw.write(f"{json.dumps(key)}: ")
+                if self._counts.get(key):
+                    fw.write("[\n")
+                    self._files[key].seek(0)
+                    shutil.copyfileobj(self._files[key], fw)
+                    fw.write("\n  ]")
+                else:
+                    fw.write(_dumps(value, 1))
+            fw.write("\n}" if self.skeleton else "}")
@@ -3,11 +3,11 @@ VGG to SA conversion method.
 """
 import json
 import logging
-import threading
+from functools import partial
 
 import cv2
 
-from ....common import tqdm_converter
+from ....common import convert_in_pool
 from ....common import write_to_json
 from ..sa_json_helper import _create_sa_json
 from ..sa_json_helper import _create_vector_instance
@@ -16,6 +16,77 @@ from .vgg_helper import _create_attribute_list
 logger = logging.getLogger("sa")
 
 
+def _image_to_sa(instance_types, output_dir, image_regions):
+    filename, regions = image_regions
+    try:
+        H, W, _ = cv2.imread(str(output_dir / filename)).shape
+    except Exception:
+        logger.warning(
+            "Can't open %s image. 'height' and 'width' for SA JSON metadata will set to zero",
+            filename,
+        )
+        H = 0
+        W = 0
+
+    file_name = f"{filename}.json"
+    sa_metadata = {"name": filename, "width": W, "height": H}
+    sa_instances = []
+    for instance, class_name, attributes in regions:
+        if instance["shape_attributes"]["name"] in instance_types:
+            if (
+                instance["shape_attributes"]["name"] == "polygon"
+                or instance["shape_attributes"]["name"] == "polyline"
+            ):
+                points = []
+                for x, y in zip(
+                    instance["shape_attributes"]["all_points_x"],
+                    instance["shape_attributes"]["all_points_y"],
+                ):
+                    points.append(x)
+                    points.append(y)
+                instance_type = instance["shape_attributes"]["name"]
+            elif instance["shape_attributes"]["name"] == "rect":
+                points = (
+                    instance["shape_attributes"]["x"],
+                    instance["shape_attributes"]["y"],
+                    instance["shape_attributes"]["x"]
+                    + instance["shape_attributes"]["width"],
+                    instance["shape_attributes"]["y"]
+                    + instance["shape_attributes"]["height"],
+                )
+                instance_type = "bbox"
+            elif instance["shape_attributes"]["name"] == "ellipse":
+                points = (
+                    instance["shape_attributes"]["cx"],
+                    instance["shape_attributes"]["cy"],
+                    instance["shape_attributes"]["rx"],
+                    instance["shape_attributes"]["ry"],
+                    instance["shape_attributes"]["theta"],
+                )
+                instance_type = "ellipse"
+            elif instance["shape_attributes"]["name"] == "circle":
+                points = (
+                    instance["shape_attributes"]["cx"],
+                    instance["shape_attributes"]["cy"],
+                    instance["shape_attributes"]["r"],
+                    instance["shape_attributes"]["r"],
+                    0,
+                )
+                instance_type = "ellipse"
+            elif instance["shape_attributes"]["name"] == "point":
+                points = (
+                    instance["shape_attributes"]["cx"],
+                    instance["shape_attributes"]["cy"],
+                )
+                instance_type = "point"
+            sa_obj = _create_vector_instance(
+                instance_type, points, {}, attributes, class_name
+            )
+            sa_instances.append(sa_obj)
+    sa_json = _create_sa_json(sa_instances, sa_metadata)
+    write_to_json(output_dir / file_name, sa_json)
+
+
 def vgg_to_sa(json_data, task, output_dir):
     images = json.load(open(json_data))
     if task == "object_detection":
@@ -25,39 +96,12 @@ def vgg_to_sa(json_data, task, output_dir):
     elif task == "vector_annotation":
         instance_types = ["rect", "polygon", "polyline", "point", "ellipse", "circle"]
 
-    images_converted = []
-    images_not_converted = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(
-            len(images.items()),
-            images_converted,
-            images_not_converted,
-            finish_event,
-        ),
-        daemon=True,
-    )
-    logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-
+    # the attributes depend on the regions of the previous images
     class_id_map = {}
+    images_regions = []
     for _, img in images.items():
-        try:
-            H, W, _ = cv2.imread(str(output_dir / img["filename"])).shape
-        except Exception:
-            logger.warning(
-                "Can't open %s image. 'height' and 'width' for SA JSON metadata will set to zero",
-                img["filename"],
-            )
-            H = 0
-            W = 0
-
-        file_name = f"{img['filename']}.json"
-        sa_metadata = {"name": img["filename"], "width": W, "height": H}
-        sa_instances = []
-        instances = img["regions"]
-        for instance in instances:
+        regions = []
+        for instance in img["regions"]:
             if "type" not in instance["region_attributes"].keys():
                 raise KeyError(
                     "'VGG' JSON should contain 'type' key which will \
@@ -73,61 +117,12 @@ def vgg_to_sa(json_data, task, output_dir):
             attributes = _create_attribute_list(
                 instance["region_attributes"], class_name, class_id_map
             )
+            regions.append((instance, class_name, attributes))
+        images_regions.append((img["filename"], regions))
 
-            if instance["shape_attributes"]["name"] in instance_types:
-                if (
-                    instance["shape_attributes"]["name"] == "polygon"
-                    or instance["shape_attributes"]["name"] == "polyline"
-                ):
-                    points = []
-                    for x, y in zip(
-                        instance["shape_attributes"]["all_points_x"],
-                        instance["shape_attributes"]["all_points_y"],
-                    ):
-                        points.append(x)
-                        points.append(y)
-                    instance_type = instance["shape_attributes"]["name"]
-                elif instance["shape_attributes"]["name"] == "rect":
-                    points = (
-                        instance["shape_attributes"]["x"],
-                        instance["shape_attributes"]["y"],
-                        instance["shape_attributes"]["x"]
-                        + instance["shape_attributes"]["width"],
-                        instance["shape_attributes"]["y"]
-                        + instance["shape_attributes"]["height"],
-                    )
-                    instance_type = "bbox"
-                elif instance["shape_attributes"]["name"] == "ellipse":
-                    points = (
-                        instance["shape_attributes"]["cx"],
-                        instance["shape_attributes"]["cy"],
-                        instance["shape_attributes"]["rx"],
-                        instance["shape_attributes"]["ry"],
-                        instance["shape_attributes"]["theta"],
-                    )
-                    instance_type = "ellipse"
-                elif instance["shape_attributes"]["name"] == "circle":
-                    points = (
-                        instance["shape_attributes"]["cx"],
-                        instance["shape_attributes"]["cy"],
-                        instance["shape_attributes"]["r"],
-                        instance["shape_attributes"]["r"],
-                        0,
-                    )
-                    instance_type = "ellipse"
-                elif instance["shape_attributes"]["name"] == "point":
-                    points = (
-                        instance["shape_attributes"]["cx"],
-                        instance["shape_attributes"]["cy"],
-                    )
-                    instance_type = "point"
-                sa_obj = _create_vector_instance(
-                    instance_type, points, {}, attributes, class_name
-                )
-                sa_instances.append(sa_obj)
-        images_converted.append(img["filename"])
-        sa_json = _create_sa_json(sa_instances, sa_metadata)
-        write_to_json(output_dir / file_name, sa_json)
-    finish_event.set()
-    tqdm_thread.join()
+    logger.info("Converting to SuperAnnotate JSON format")
+    for _ in convert_in_pool(
+        partial(_image_to_sa, instance_types, output_dir), images_regions
+    ):
+        pass
     return class_id_map
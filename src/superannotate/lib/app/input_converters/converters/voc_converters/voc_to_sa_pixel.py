@@ -2,14 +2,14 @@
 VOC to SA conversion method
 """
 import logging
-import threading
+from functools import partial
 
 import cv2
 import numpy as np
 
 from ....common import blue_color_generator
 from ....common import hex_to_rgb
-from ....common import tqdm_converter
+from ....common import convert_in_pool
 from ....common import write_to_json
 from ..sa_json_helper import _create_pixel_instance
 from ..sa_json_helper import _create_sa_json
@@ -85,6 +85,37 @@ def _generate_instances(polygon_instances, voc_instances, bluemask_colors):
     return instances
 
 
+def _instance_segmentation_file_to_sa_pixel(
+    object_masks_dir, annotation_dir, output_dir, filename
+):
+    polygon_instances, sa_mask, bluemask_colors = _generate_polygons(
+        object_masks_dir / filename.name
+    )
+    voc_instances = _get_voc_instances_from_xml(annotation_dir / filename.name)
+
+    maped_instances = _generate_instances(
+        polygon_instances, voc_instances, bluemask_colors
+    )
+
+    sa_instances = []
+    for instance in maped_instances:
+        parts = [{"color": instance["blue_color"]}]
+        sa_obj = _create_pixel_instance(
+            parts, instance["classAttributes"], instance["className"]
+        )
+        sa_instances.append(sa_obj)
+
+    file_name = f"{filename.stem}.json"
+    height, width = _get_image_shape_from_xml(annotation_dir / filename.name)
+    sa_metadata = {"name": filename.stem, "height": height, "width": width}
+    sa_json = _create_sa_json(sa_instances, sa_metadata)
+    write_to_json(output_dir / file_name, sa_json)
+
+    mask_name = "%s.jpg___save.png" % (filename.stem)
+    cv2.imwrite(str(output_dir / mask_name), sa_mask[:, :, ::-1])
+    return [class_ for class_, _ in voc_instances]
+
+
 def voc_instance_segmentation_to_sa_pixel(voc_root, output_dir):
     classes = []
     object_masks_dir = voc_root / "SegmentationObject"
@@ -95,45 +126,16 @@ def voc_instance_segmentation_to_sa_pixel(voc_root, output_dir):
         logger.warning(
             "You need to have both 'Annotations' and 'SegmentationObject' directories to be able to convert."
         )
-    images_converted = []
-    images_not_converted = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(file_list), images_converted, images_not_converted, finish_event),
-        daemon=True,
-    )
-    logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-    for filename in file_list:
-        polygon_instances, sa_mask, bluemask_colors = _generate_polygons(
-            object_masks_dir / filename.name
-        )
-        voc_instances = _get_voc_instances_from_xml(annotation_dir / filename.name)
-        for class_, _ in voc_instances:
-            classes.append(class_)
 
-        maped_instances = _generate_instances(
-            polygon_instances, voc_instances, bluemask_colors
-        )
-
-        sa_instances = []
-        for instance in maped_instances:
-            parts = [{"color": instance["blue_color"]}]
-            sa_obj = _create_pixel_instance(
-                parts, instance["classAttributes"], instance["className"]
-            )
-            sa_instances.append(sa_obj)
-
-        images_converted.append(filename)
-        file_name = f"{filename.stem}.json"
-        height, width = _get_image_shape_from_xml(annotation_dir / filename.name)
-        sa_metadata = {"name": filename.stem, "height": height, "width": width}
-        sa_json = _create_sa_json(sa_instances, sa_metadata)
-        write_to_json(output_dir / file_name, sa_json)
-
-        mask_name = "%s.jpg___save.png" % (filename.stem)
-        cv2.imwrite(str(output_dir / mask_name), sa_mask[:, :, ::-1])
-    finish_event.set()
-    tqdm_thread.join()
+    logger.info("Converting to SuperAnnotate JSON format")
+    for file_classes in convert_in_pool(
+        partial(
+            _instance_segmentation_file_to_sa_pixel,
+            object_masks_dir,
+            annotation_dir,
+            output_dir,
+        ),
+        file_list,
+    ):
+        classes.extend(file_classes)
     return classes
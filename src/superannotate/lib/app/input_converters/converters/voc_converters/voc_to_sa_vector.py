@@ -2,12 +2,12 @@
 VOC to SA conversion method
 """
 import logging
-import threading
+from functools import partial
 
 import cv2
 import numpy as np
 
-from ....common import tqdm_converter
+from ....common import convert_in_pool
 from ....common import write_to_json
 from ..sa_json_helper import _create_sa_json
 from ..sa_json_helper import _create_vector_instance
@@ -79,6 +79,32 @@ def _generate_instances(polygon_instances, voc_instances):
     return instances
 
 
+def _instance_segmentation_file_to_sa_vector(
+    object_masks_dir, annotation_dir, output_dir, filename
+):
+    polygon_instances = _generate_polygons(object_masks_dir / filename.name)
+    voc_instances = _get_voc_instances_from_xml(annotation_dir / filename.name)
+
+    maped_instances = _generate_instances(polygon_instances, voc_instances)
+    sa_instances = []
+    for instance in maped_instances:
+        sa_obj = _create_vector_instance(
+            "polygon",
+            instance["polygon"],
+            {},
+            instance["classAttributes"],
+            instance["className"],
+        )
+        sa_instances.append(sa_obj)
+
+    file_name, height, width = _get_image_metadata(annotation_dir / filename.name)
+    file_path = f"{file_name}.json"
+    sa_metadata = {"name": str(filename), "height": height, "width": width}
+    sa_json = _create_sa_json(sa_instances, sa_metadata)
+    write_to_json(output_dir / file_path, sa_json)
+    return [class_ for class_, _ in voc_instances]
+
+
 def voc_instance_segmentation_to_sa_vector(voc_root, output_dir):
     classes = []
     object_masks_dir = voc_root / "SegmentationObject"
@@ -89,43 +115,39 @@ def voc_instance_segmentation_to_sa_vector(voc_root, output_dir):
             "You need to have both 'Annotations' and 'SegmentationObject' directories to be able to convert."
         )
 
-    images_converted = []
-    images_not_converted = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(file_list), images_converted, images_not_converted, finish_event),
-        daemon=True,
-    )
     logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-    for filename in file_list:
-        polygon_instances = _generate_polygons(object_masks_dir / filename.name)
-        voc_instances = _get_voc_instances_from_xml(annotation_dir / filename.name)
-        for class_, _ in voc_instances:
-            classes.append(class_)
-
-        maped_instances = _generate_instances(polygon_instances, voc_instances)
-        sa_instances = []
-        for instance in maped_instances:
-            sa_obj = _create_vector_instance(
-                "polygon",
-                instance["polygon"],
-                {},
-                instance["classAttributes"],
-                instance["className"],
-            )
-            sa_instances.append(sa_obj)
+    for file_classes in convert_in_pool(
+        partial(
+            _instance_segmentation_file_to_sa_vector,
+            object_masks_dir,
+            annotation_dir,
+            output_dir,
+        ),
+        file_list,
+    ):
+        classes.extend(file_classes)
+    return classes
 
-        images_converted.append(filename)
-        file_name, height, width = _get_image_metadata(annotation_dir / filename.name)
-        file_path = f"{file_name}.json"
-        sa_metadata = {"name": str(filename), "height": height, "width": width}
-        sa_json = _create_sa_json(sa_instances, sa_metadata)
-        write_to_json(output_dir / file_path, sa_json)
 
-    finish_event.set()
-    tqdm_thread.join()
+def _object_detection_file_to_sa_vector(annotation_dir, output_dir, filename):
+    classes = []
+    voc_instances = _get_voc_instances_from_xml(annotation_dir / filename.name)
+    sa_instances = []
+    for class_, bbox in voc_instances:
+        class_name = list(class_.keys())[0]
+        classes.append(class_)
+
+        points = (bbox[0], bbox[1], bbox[2], bbox[3])
+        sa_obj = _create_vector_instance(
+            "bbox", points, {}, class_[class_name], class_name
+        )
+        sa_instances.append(sa_obj)
+
+    file_name, height, width = _get_image_metadata(annotation_dir / filename.name)
+    file_path = f"{file_name}.json"
+    sa_metadata = {"name": str(filename), "height": height, "width": width}
+    sa_json = _create_sa_json(sa_instances, sa_metadata)
+    write_to_json(output_dir / file_path, sa_json)
     return classes
 
 
@@ -136,37 +158,10 @@ def voc_object_detection_to_sa_vector(voc_root, output_dir):
     if not file_list:
         logger.warning("'Annotations' directory is empty")
 
-    images_converted = []
-    images_not_converted = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(file_list), images_converted, images_not_converted, finish_event),
-        daemon=True,
-    )
     logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-
-    for filename in file_list:
-        voc_instances = _get_voc_instances_from_xml(annotation_dir / filename.name)
-        sa_instances = []
-        for class_, bbox in voc_instances:
-            class_name = list(class_.keys())[0]
-            classes.append(class_)
-
-            points = (bbox[0], bbox[1], bbox[2], bbox[3])
-            sa_obj = _create_vector_instance(
-                "bbox", points, {}, class_[class_name], class_name
-            )
-            sa_instances.append(sa_obj)
-
-        images_converted.append(filename)
-        file_name, height, width = _get_image_metadata(annotation_dir / filename.name)
-        file_path = f"{file_name}.json"
-        sa_metadata = {"name": str(filename), "height": height, "width": width}
-        sa_json = _create_sa_json(sa_instances, sa_metadata)
-        write_to_json(output_dir / file_path, sa_json)
-
-    finish_event.set()
-    tqdm_thread.join()
+    for file_classes in convert_in_pool(
+        partial(_object_detection_file_to_sa_vector, annotation_dir, output_dir),
+        file_list,
+    ):
+        classes.extend(file_classes)
     return classes
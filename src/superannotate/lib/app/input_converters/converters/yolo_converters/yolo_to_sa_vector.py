@@ -2,13 +2,13 @@
 YOLO to SA conversion method
 """
 import logging
-import threading
+from functools import partial
 from glob import glob
 from pathlib import Path
 
 import cv2
 
-from ....common import tqdm_converter
+from ....common import convert_in_pool
 from ....common import write_to_json
 from ..sa_json_helper import _create_sa_json
 from ..sa_json_helper import _create_vector_instance
@@ -16,52 +16,26 @@ from ..sa_json_helper import _create_vector_instance
 logger = logging.getLogger("sa")
 
 
-def yolo_object_detection_to_sa_vector(data_path, output_dir):
-    classes = {}
-    id_ = 0
-    classes_file = open(data_path / "classes.txt")
-    for line in classes_file:
-        key = line.rstrip()
-        if key not in classes.keys():
-            classes[id_] = key
-            id_ += 1
-
-    annotations = [
-        annot for annot in data_path.glob("*.txt") if annot.name != "classes.txt"
-    ]
-
-    images_converted = []
-    images_not_converted = []
-    finish_event = threading.Event()
-    tqdm_thread = threading.Thread(
-        target=tqdm_converter,
-        args=(len(annotations), images_converted, images_not_converted, finish_event),
-        daemon=True,
-    )
-    logger.info("Converting to SuperAnnotate JSON format")
-    tqdm_thread.start()
-    for annotation in annotations:
-        file = open(annotation)
-        file_name = "%s.*" % annotation.stem
-        files_list = glob(str(data_path / file_name))
-        if len(files_list) == 1:
-            images_not_converted.append(annotation.name)
-            logger.warning("'%s' image for annotation doesn't exist", annotation)
-            continue
-        if len(files_list) > 2:
-            images_not_converted.append(annotation.name)
-            logger.warning("'%s' multiple file for this annotation", annotation)
-            continue
+def _annotation_file_to_sa(data_path, classes, output_dir, annotation):
+    file_name = "%s.*" % annotation.stem
+    files_list = glob(str(data_path / file_name))
+    if len(files_list) == 1:
+        logger.warning("'%s' image for annotation doesn't exist", annotation)
+        return
+    if len(files_list) > 2:
+        logger.warning("'%s' multiple file for this annotation", annotation)
+        return
 
-        if Path(files_list[0]).suffix == ".txt":
-            file_name = files_list[1]
-        else:
-            file_name = files_list[0]
+    if Path(files_list[0]).suffix == ".txt":
+        file_name = files_list[1]
+    else:
+        file_name = files_list[0]
 
-        img = cv2.imread(file_name)
-        H, W, _ = img.shape
+    img = cv2.imread(file_name)
+    H, W, _ = img.shape
 
-        sa_instances = []
+    sa_instances = []
+    with open(annotation) as file:
         for line in file:
             values = line.split()
             class_id = int(values[0])
@@ -74,12 +48,29 @@ def yolo_object_detection_to_sa_vector(data_path, output_dir):
             sa_obj = _create_vector_instance("bbox", points, {}, [], classes[class_id])
             sa_instances.append(sa_obj.copy())
 
-        images_converted.append(annotation.name)
-        file_name = f"{Path(file_name).name}.json"
-        sa_metadata = {"name": Path(file_name).name, "width": W, "height": H}
-        sa_json = _create_sa_json(sa_instances, sa_metadata)
-        write_to_json(output_dir / file_name, sa_json)
+    file_name = f"{Path(file_name).name}.json"
+    sa_metadata = {"name": Path(file_name).name, "width": W, "height": H}
+    sa_json = _create_sa_json(sa_instances, sa_metadata)
+    write_to_json(output_dir / file_name, sa_json)
+
 
-    finish_event.set()
-    tqdm_thread.join()
+def yolo_object_detection_to_sa_vector(data_path, output_dir):
+    classes = {}
+    id_ = 0
+    classes_file = open(data_path / "classes.txt")
+    for line in classes_file:
+        key = line.rstrip()
+        if key not in classes.keys():
+            classes[id_] = key
+            id_ += 1
+
+    annotations = [
+        annot for annot in data_path.glob("*.txt") if annot.name != "classes.txt"
+    ]
+
+    logger.info("Converting to SuperAnnotate JSON format")
+    for _ in convert_in_pool(
+        partial(_annotation_file_to_sa, data_path, classes, output_dir), annotations
+    ):
+        pass
     return classes
@@ -2,6 +2,8 @@ import itertools
 import json
 import logging
 import shutil
+from collections import defaultdict
+from functools import partial
 from pathlib import Path
 
 import cv2
@@ -10,7 +12,9 @@ from lib.app.exceptions import AppException
 from lib.core import DEPRICATED_DOCUMENT_VIDEO_MESSAGE
 
 from ..common import blue_color_generator
+from ..common import convert_in_pool
 from ..common import hex_to_rgb
+from ..common import rgb2id
 from ..common import write_to_json
 
 logger = logging.getLogger("sa")
@@ -20,71 +24,104 @@ def copy_file(src_path, dst_path):
     shutil.copy(src_path, dst_path)
 
 
-def from_pixel_to_vector(json_paths, output_dir):
-    img_names = []
-
-    for json_path in json_paths:
-        file_name = str(json_path)
-        pixel_postfix = "___pixel.json"
-        postfix = pixel_postfix if file_name.endswith(pixel_postfix) else ".json"
-        mask_name = file_name.replace(postfix, "___save.png")
-        img = cv2.imread(mask_name)
-        H, W, _ = img.shape
-        sa_json = json.load(open(file_name))
-        instances = sa_json["instances"]
-        new_instances = []
-        global_idx = itertools.count()
-        sa_instances = []
+def _get_colors_contours(mask, hex_colors):
+    """
+    Returns the contours of the pixels of every color of the BGR mask by the color
+    ids. The mask is decoded once into the pixel ids and every color is traced
+    only in its bounding box.
+    """
+    if not hex_colors:
+        return {}
+    H, W, _ = mask.shape
+    color_ids = np.unique(rgb2id(np.array([hex_to_rgb(c) for c in hex_colors])))
+    pixel_ids = rgb2id(mask[..., ::-1]).ravel()
+    labels = np.minimum(np.searchsorted(color_ids, pixel_ids), len(color_ids) - 1)
+    pixels = np.flatnonzero(color_ids[labels] == pixel_ids)
+    # the stable sort keeps the pixels of each color in the raster order
+    order = np.argsort(labels[pixels], kind="stable")
+    pixels, labels = pixels[order], labels[pixels][order]
+    starts = np.flatnonzero(np.diff(labels, prepend=-1))
+    ends = np.append(starts[1:], len(pixels))
+    ys, xs = np.divmod(pixels, W)
+
+    colors_contours = {}
+    for start, end in zip(starts, ends):
+        color_ys, color_xs = ys[start:end], xs[start:end]
+        # the margin of one pixel keeps the contours the same as in the whole mask
+        y0, y1 = max(color_ys[0] - 1, 0), min(color_ys[-1] + 2, H)
+        x0, x1 = max(color_xs.min() - 1, 0), min(color_xs.max() + 2, W)
+        bitmask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        bitmask[color_ys - y0, color_xs - x0] = 255
+        colors_contours[int(color_ids[labels[start]])] = cv2.findContours(
+            bitmask,
+            cv2.RETR_CCOMP,
+            cv2.CHAIN_APPROX_SIMPLE,
+            offset=(int(x0), int(y0)),
+        )
+    return colors_contours
+
+
+def _pixel_json_to_vector(output_dir, json_path):
+    file_name = str(json_path)
+    pixel_postfix = "___pixel.json"
+    postfix = pixel_postfix if file_name.endswith(pixel_postfix) else ".json"
+    mask_name = file_name.replace(postfix, "___save.png")
+    img = cv2.imread(mask_name)
+    sa_json = json.load(open(file_name))
+    instances = sa_json["instances"]
+    new_instances = []
+    global_idx = itertools.count()
+    colors_contours = _get_colors_contours(
+        img,
+        [part["color"] for instance in instances for part in instance.get("parts", [])],
+    )
 
-        for instance in instances:
-            if "parts" not in instance.keys():
-                if "type" in instance.keys() and instance["type"] == "meta":
-                    sa_instances.append(instance)
+    for instance in instances:
+        if "parts" not in instance.keys():
+            continue
+        parts = instance["parts"]
+        if len(parts) > 1:
+            group_id = next(global_idx)
+        else:
+            group_id = 0
+
+        for part in parts:
+            color_id = int(rgb2id(np.array(hex_to_rgb(part["color"]))))
+            if color_id not in colors_contours:
                 continue
-            parts = instance["parts"]
-            if len(parts) > 1:
-                group_id = next(global_idx)
-            else:
-                group_id = 0
-            from collections import defaultdict
-
-            for part in parts:
-                color = list(hex_to_rgb(part["color"]))
-                mask = np.zeros((H, W), dtype=np.uint8)
-                mask[np.all((img == color[::-1]), axis=2)] = 255
-
-                #  child contour index hierarchy[0][[i][3]
-                contours, hierarchy = cv2.findContours(
-                    mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
-                )
-                parent_child_map = defaultdict(list)
-                for idx, _hierarchy in enumerate(hierarchy[0]):
-
-                    if len(contours[idx].flatten().tolist()) <= 6:
-                        continue
-                    if _hierarchy[3] < 0:
-                        parent_child_map[idx] = []
-                    else:
-                        parent_child_map[_hierarchy[3]].append(idx)
-
-                for outer, inners in parent_child_map.items():
-                    outer_points = contours[outer].flatten().tolist()
-                    exclude_points = [contours[i].flatten().tolist() for i in inners]
-                    temp = instance.copy()
-                    del temp["parts"]
-                    temp["pointLabels"] = {}
-                    temp["groupId"] = group_id
-                    temp["type"] = "polygon"
-                    temp["points"] = outer_points
-                    temp["exclude"] = exclude_points
-                    new_instances.append(temp)
-
-        sa_json["instances"] = new_instances
-        write_to_json(
-            str(output_dir / Path(file_name).name.replace(postfix, ".json")), sa_json
-        )
-        img_names.append(file_name.replace(postfix, ""))
-    return img_names
+            #  child contour index hierarchy[0][[i][3]
+            contours, hierarchy = colors_contours[color_id]
+            parent_child_map = defaultdict(list)
+            for idx, _hierarchy in enumerate(hierarchy[0]):
+
+                if len(contours[idx].flatten().tolist()) <= 6:
+                    continue
+                if _hierarchy[3] < 0:
+                    parent_child_map[idx] = []
+                else:
+                    parent_child_map[_hierarchy[3]].append(idx)
+
+            for outer, inners in parent_child_map.items():
+                outer_points = contours[outer].flatten().tolist()
+                exclude_points = [contours[i].flatten().tolist() for i in inners]
+                temp = instance.copy()
+                del temp["parts"]
+                temp["pointLabels"] = {}
+                temp["groupId"] = group_id
+                temp["type"] = "polygon"
+                temp["points"] = outer_points
+                temp["exclude"] = exclude_points
+                new_instances.append(temp)
+
+    sa_json["instances"] = new_instances
+    write_to_json(
+        str(output_dir / Path(file_name).name.replace(postfix, ".json")), sa_json
+    )
+    return file_name.replace(postfix, "")
+
+
+def from_pixel_to_vector(json_paths, output_dir):
+    return list(convert_in_pool(partial(_pixel_json_to_vector, output_dir), json_paths))
 
 
 def from_vector_to_pixel(json_paths, output_dir):
@@ -23,7 +23,6 @@ if sys.version_info < (3, 11):
 else:
     from typing import TypedDict, NotRequired, Required  # noqa
 
-import boto3
 from pydantic import conlist
 from pydantic import constr
 from pydantic import parse_obj_as
@@ -58,6 +57,7 @@ from lib.core.enums import ImageQuality
 from lib.core.enums import ProjectType
 from lib.core.enums import ClassTypeEnum
 from lib.core.exceptions import AppException
+from lib.core.s3 import S3_CLIENTS
 from lib.core.types import MLModel
 from lib.core.types import PriorityScoreEntity
 from lib.core.types import Project
@@ -98,6 +98,8 @@ ANNOTATOR_ROLE = Literal["Admin", "Annotator", "QA"]
 
 FOLDER_STATUS = Literal["NotStarted", "InProgress", "Completed", "OnHold"]
 
+FRAMES_OUTPUT = Literal["dict", "columns", "arrow"]
+
 
 class Setting(TypedDict):
     attribute: str
@@ -972,6 +974,7 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
         ] = constants.DEFAULT_FILE_EXCLUDE_PATTERNS,
         recursive_subfolders: Optional[bool] = False,
         image_quality_in_editor: Optional[str] = None,
+        duplicate_check: Literal["name", "hash"] = "name",
     ):
         """Uploads all images with given extensions from folder_path to the project.
         Sets status of all the uploaded images to set_status if it is not None.
@@ -1008,6 +1011,13 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
                 If None then the default value in project settings will be used.
         :type image_quality_in_editor: str
 
+        :param duplicate_check: how to detect already existing images, either "name" or "hash".
+                With "hash" the content hashes of the uploaded local files are stored in a local index
+                and files with already uploaded content are skipped without checking the platform.
+                Files with the same content are reported as existing images and skipped
+                even when their names differ, only the first of them is uploaded.
+        :type duplicate_check: str
+
         :return: uploaded, could-not-upload, existing-images filepaths
         :rtype: tuple (3 members) of list of strs
         """
@@ -1052,6 +1062,7 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
             exclude_file_patterns=exclude_file_patterns,
             recursive_sub_folders=recursive_subfolders,
             image_quality_in_editor=image_quality_in_editor,
+            duplicate_check=duplicate_check,
         )
         images_to_upload, duplicates = use_case.images_to_upload
         if len(duplicates):
@@ -1193,6 +1204,10 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
     ):
         """Uploads image frames from all videos with given extensions from folder_path to the project.
         Sets status of all the uploaded images to set_status if it is not None.
+        The frames are extracted in the current process, to extract the videos in
+        parallel processes set the SA_VIDEO_EXTRACT_WORKERS environment variable to the
+        number of processes. On Windows and macOS the calling script must then be
+        guarded with ``if __name__ == "__main__":``.
 
         :param project: project name or folder path (e.g., "project1/folder1")
         :type project: str
@@ -1496,8 +1511,7 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
         """
         if isinstance(classes_json, str) or isinstance(classes_json, Path):
             if from_s3_bucket:
-                from_session = boto3.Session()
-                from_s3 = from_session.resource("s3")
+                from_s3 = S3_CLIENTS.get_resource()
                 file = io.BytesIO()
                 from_s3_object = from_s3.Object(from_s3_bucket, classes_json)
                 from_s3_object.download_fileobj(file)
@@ -1837,7 +1851,11 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
         annotation_type: Optional[ANNOTATION_TYPE] = "bbox",
     ):
         """Computes consensus score for each instance of given images
-            that are present in at least 2 of the given projects:
+            that are present in at least 2 of the given projects.
+            The images are scored in the current process, to score them in parallel
+            processes set the SA_CONSENSUS_WORKERS environment variable to the number
+            of processes. On Windows and macOS the calling script must then be guarded
+            with ``if __name__ == "__main__":``.
 
         :param project: project name
         :type project: str
@@ -2087,6 +2105,83 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
             folder_names=folder_names,
         ).aggregate_annotations_as_df()
 
+    def aggregate_annotations(
+        self,
+        project_root: Union[NotEmptyStr, Path],
+        project_type: PROJECT_TYPE,
+        folder_names: Optional[List[Union[Path, NotEmptyStr]]] = None,
+        output: Literal["df", "parquet"] = "df",
+        path: Optional[Union[NotEmptyStr, Path]] = None,
+        chunk_rows: int = 100000,
+    ):
+        """Aggregate annotations from project root as pandas DataFrame or Parquet dataset.
+
+        :param project_root: the export path of the project
+        :type project_root: Path-like (str or Path)
+
+        :param project_type: the project type, Vector/Pixel, Video or Document
+        :type project_type: str
+
+        :param folder_names: Aggregate the specified folders from project_root.
+         If None aggregate all folders in the project_root
+        :type folder_names: list of Pathlike (str or Path) objects
+
+        :param output: "df" returns a pandas DataFrame, "parquet" writes the annotations
+         chunk by chunk to a Parquet dataset partitioned by folderName, the items of
+         the project root are in the "root" partition. It requires the pyarrow package.
+        :type output: str
+
+        :param path: an empty or not existing directory to write the Parquet dataset to
+        :type path: Path-like (str or Path)
+
+        :param chunk_rows: the maximum number of rows written at once
+        :type chunk_rows: int
+
+        :return: DataFrame on annotations or the path of the Parquet dataset
+        :rtype: pandas DataFrame or Path
+        """
+        from superannotate.lib.app.analytics.aggregators import DataAggregator
+
+        return DataAggregator(
+            project_type=project_type,  # noqa
+            project_root=project_root,
+            folder_names=folder_names,
+        ).aggregate_annotations(output=output, path=path, chunk_rows=chunk_rows)
+
+    def iter_aggregated_chunks(
+        self,
+        project_root: Union[NotEmptyStr, Path],
+        project_type: PROJECT_TYPE,
+        folder_names: Optional[List[Union[Path, NotEmptyStr]]] = None,
+        chunk_rows: int = 100000,
+    ):
+        """Iterate over the aggregated annotations from project root as pandas
+        DataFrames, so that exports that don't fit in memory can be processed.
+
+        :param project_root: the export path of the project
+        :type project_root: Path-like (str or Path)
+
+        :param project_type: the project type, Vector/Pixel, Video or Document
+        :type project_type: str
+
+        :param folder_names: Aggregate the specified folders from project_root.
+         If None aggregate all folders in the project_root
+        :type folder_names: list of Pathlike (str or Path) objects
+
+        :param chunk_rows: the maximum number of rows of a DataFrame
+        :type chunk_rows: int
+
+        :return: DataFrames with the columns of aggregate_annotations_as_df
+        :rtype: iterator of pandas DataFrames
+        """
+        from superannotate.lib.app.analytics.aggregators import DataAggregator
+
+        return DataAggregator(
+            project_type=project_type,  # noqa
+            project_root=project_root,
+            folder_names=folder_names,
+        ).iter_aggregated_chunks(chunk_rows=chunk_rows)
+
     def delete_annotations(
         self, project: NotEmptyStr, item_names: Optional[List[NotEmptyStr]] = None
     ):
@@ -2213,7 +2308,13 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
         return response.data
 
     def get_annotations_per_frame(
-        self, project: NotEmptyStr, video: NotEmptyStr, fps: int = 1
+        self,
+        project: NotEmptyStr,
+        video: NotEmptyStr,
+        fps: int = 1,
+        start_frame: Optional[int] = None,
+        end_frame: Optional[int] = None,
+        output: FRAMES_OUTPUT = "dict",
     ):
         """Returns per frame annotations for the given video.
 
@@ -2228,12 +2329,33 @@ class SAClient(BaseInterfaceFacade, metaclass=TrackableMeta):
          Will extract 1 frame per second by default.
         :type fps: str
 
-        :return: list of annotation objects
-        :rtype: list of dicts
+        :param start_frame: the first frame to return, frames are numbered from 1.
+         If None, frames are returned from the start of the video.
+        :type start_frame: int
+
+        :param end_frame: the last frame to return (inclusive).
+         If None, frames are returned up to the end of the video.
+        :type end_frame: int
+
+        :param output: "dict" returns a list of frame dicts, "columns" returns a dict of
+         numpy arrays with one row per frame annotation (frame, instanceId, classId,
+         type, keyframe, x1, y1, x2, y2, x, y and the points of polygons and
+         polylines, points[pointsOffsets[i]:pointsOffsets[i + 1]] are the points of
+         row i), "arrow" returns the columns as a pyarrow Table.
+        :type output: str
+
+        :return: list of annotation objects, or columns of the annotations
+        :rtype: list of dicts, dict of numpy arrays or pyarrow.Table
         """
         project_name, folder_name = extract_project_folder(project)
         response = self.controller.get_annotations_per_frame(
-            project_name, folder_name, video_name=video, fps=fps
+            project_name,
+            folder_name,
+            video_name=video,
+            fps=fps,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            output=output,
         )
         if response.errors:
             raise AppException(response.errors)
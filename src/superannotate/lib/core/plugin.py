@@ -1,8 +1,12 @@
 import io
+import itertools
 import logging
 from pathlib import Path
+from queue import Full
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
 from typing import Tuple
 from typing import Union
 
@@ -174,14 +178,13 @@ class VideoPlugin:
     @staticmethod
     def get_frames_count(video_path: str):
         video = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
+        count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        if count > 0:
+            return count
+        # the container doesn't store the frame count, the frames are demuxed
         count = 0
-        flag = True
-        while flag:
-            flag, _ = video.read()
-            if flag:
-                count += 1
-            else:
-                break
+        while video.grab():
+            count += 1
         return count
 
     @staticmethod
@@ -221,36 +224,85 @@ class VideoPlugin:
     def frames_generator(
         video_path: str, start_time, end_time, target_fps: Optional[float], log=True
     ):
+        """
+        Seeks to start_time and decodes only the frames that are yielded,
+        the skipped frames are grabbed without being decoded. The frames are read
+        until the video ends, as the frame count of the container may be wrong.
+        """
         video = cv2.VideoCapture(str(video_path), cv2.CAP_FFMPEG)
         if not video.isOpened():
             raise ImageProcessingException(
                 f"Couldn't open video file {str(video_path)}."
             )
         fps = video.get(cv2.CAP_PROP_FPS)
-        if not target_fps:
-            target_fps = fps
-        if target_fps > fps:
-            target_fps = fps
-        ratio = fps / target_fps
         rotate_code = VideoPlugin.get_video_rotate_code(video_path, log)
-        frame_no = 0
-        frame_no_with_change = 1.0
-        while True:
+        if start_time:
+            video.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+        frame_no = int(video.get(cv2.CAP_PROP_POS_FRAMES))
+        for target_frame_no in VideoPlugin._iter_frame_numbers(
+            fps, start_time, end_time, target_fps
+        ):
+            while frame_no < target_frame_no - 1:
+                if not video.grab():
+                    return
+                frame_no += 1
+            if frame_no > target_frame_no - 1:
+                continue
             success, frame = video.read()
             if not success:
-                break
+                return
             frame_no += 1
+            if rotate_code:
+                frame = cv2.rotate(frame, rotate_code)
+            yield frame
+
+    @staticmethod
+    def _iter_frame_numbers(
+        fps: float,
+        start_time,
+        end_time,
+        target_fps: Optional[float],
+        total: Optional[int] = None,
+    ) -> Iterator[int]:
+        if not fps:
+            return
+        if not target_fps or target_fps > fps:
+            target_fps = fps
+        ratio = fps / target_fps
+        frame_no_with_change = 1.0
+        frame_numbers = range(1, total + 1) if total is not None else itertools.count(1)
+        for frame_no in frame_numbers:
             if round(frame_no_with_change) != frame_no:
                 continue
             frame_no_with_change += ratio
-            frame_time = video.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            frame_time = (frame_no - 1) / fps
             if end_time and frame_time > end_time:
                 break
             if frame_time < start_time:
                 continue
-            if rotate_code:
-                frame = cv2.rotate(frame, rotate_code)
-            yield frame
+            yield frame_no
+
+    @staticmethod
+    def get_frame_numbers(
+        total: int,
+        fps: float,
+        start_time,
+        end_time,
+        target_fps: Optional[float],
+    ) -> List[int]:
+        """
+        Returns the numbers of the frames the frames generator yields computed
+        from the video metadata, without decoding the video.
+        """
+        return list(
+            VideoPlugin._iter_frame_numbers(
+                fps, start_time, end_time, target_fps, total
+            )
+        )
+
+    @staticmethod
+    def get_frame_name(video_path: str, frame_no: int, total: int) -> str:
+        return f"{Path(video_path).stem}_{str(frame_no).zfill(len(str(total)))}.jpg"
 
     @staticmethod
     def get_extractable_frames(
@@ -260,54 +312,76 @@ class VideoPlugin:
         target_fps: float,
     ):
         total = VideoPlugin.get_frames_count(video_path)
-        total_with_fps = sum(
-            1
-            for _ in VideoPlugin.frames_generator(
-                video_path, start_time, end_time, target_fps, log=False
+        total_with_fps = len(
+            VideoPlugin.get_frame_numbers(
+                total,
+                VideoPlugin.get_fps(video_path),
+                start_time,
+                end_time,
+                target_fps,
             )
         )
-        zero_fill_count = len(str(total))
-        video_name = Path(video_path).stem
-        frame_names = []
-        for i in range(1, total_with_fps + 1):
-            frame_name = f"{video_name}_{str(i).zfill(zero_fill_count)}.jpg"
-            frame_names.append(frame_name)
-        return frame_names
+        return [
+            VideoPlugin.get_frame_name(video_path, i, total)
+            for i in range(1, total_with_fps + 1)
+        ]
 
     @staticmethod
-    def extract_frames(
+    def iter_encoded_frames(
         video_path: str,
         start_time,
         end_time,
-        extract_path: str,
-        limit: int,
         target_fps: float,
-        chunk_size: int = 100,
-    ) -> List[str]:
-        total_num_of_frames = VideoPlugin.get_frames_count(video_path)
-        zero_fill_count = len(str(total_num_of_frames))
-        video_name = Path(video_path).stem
-        extracted_frame_no = 1
-        extracted_frames_paths = []
-        for frame in VideoPlugin.frames_generator(
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Decodes the video once and yields the frame names with the frames
+        encoded to JPEG in memory.
+        """
+        total = VideoPlugin.get_frames_count(video_path)
+        frames = VideoPlugin.frames_generator(
             video_path, start_time, end_time, target_fps
-        ):
-            if len(extracted_frames_paths) >= limit:
-                break
-            path = str(
-                Path(extract_path)
-                / (
-                    video_name
-                    + "_"
-                    + str(extracted_frame_no).zfill(zero_fill_count)
-                    + ".jpg"
+        )
+        for frame_no, frame in enumerate(frames, 1):
+            success, buffer = cv2.imencode(".jpg", frame)
+            if not success:
+                raise ImageProcessingException(
+                    f"Couldn't encode frame {frame_no} of {video_path}."
                 )
-            )
-            extracted_frame_no += 1
-            cv2.imwrite(path, frame)
-            extracted_frames_paths.append(path)
-            if len(extracted_frames_paths) % chunk_size == 0:
-                yield extracted_frames_paths
-                extracted_frames_paths.clear()
-        if extracted_frames_paths:
-            yield extracted_frames_paths
+            name = VideoPlugin.get_frame_name(video_path, frame_no, total)
+            yield name, buffer.tobytes()
+
+    @staticmethod
+    def put_encoded_frames(
+        queue,
+        stop_event,
+        index: int,
+        video_path: str,
+        start_time,
+        end_time,
+        target_fps: float,
+        skip_names: Set[str] = frozenset(),
+    ):
+        """
+        Puts (index, name, bytes) of the encoded frames to the queue, runs in the
+        worker processes. (index, None, None) is put once the video is done.
+        """
+
+        def put(item):
+            # the frames are dropped once the consumer sets the stop event
+            while not stop_event.is_set():
+                try:
+                    queue.put(item, timeout=1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        try:
+            for name, frame in VideoPlugin.iter_encoded_frames(
+                video_path, start_time, end_time, target_fps
+            ):
+                if name not in skip_names and not put((index, name, frame)):
+                    break
+        finally:
+            # the consumer drains the queue until every video is done
+            queue.put((index, None, None))
@@ -1,12 +1,13 @@
 from abc import ABC
 from typing import Any
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Union
 
-import boto3
 from lib.core.conditions import Condition
 from lib.core.entities import BaseEntity
+from lib.core.s3 import S3_CLIENTS
 from pydantic import BaseModel
 
 
@@ -37,14 +38,9 @@ class BaseS3Repository(BaseManageableRepository):
         session_token: str,
         bucket: str,
         region: str,
+        refresh_using: Callable = None,
     ):
-        self._session = boto3.Session(
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            aws_session_token=session_token,
-            region_name=region,
+        self._client = S3_CLIENTS.get_client(
+            access_key, secret_key, session_token, region, refresh_using
         )
-
-        self._resource = self._session.resource("s3")
         self._bucket = bucket
-        self.bucket = self._resource.Bucket(bucket)
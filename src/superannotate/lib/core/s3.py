@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+from botocore.session import get_session
+
+# temporary tokens returned by the backend are valid for an hour
+TEMPORARY_CREDENTIALS_LIFETIME = 3600
+MAX_POOL_CONNECTIONS = 32
+# every upload gets its own temporary credentials, the least recently used are dropped
+MAX_CACHED_SESSIONS = 16
+
+CredentialsKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+CredentialsProvider = Callable[[], Tuple[str, str, str]]
+
+
+class _Entry:
+    __slots__ = ("session", "client", "created_at", "refreshable")
+
+    def __init__(self, session: boto3.Session, refreshable: bool):
+        self.session = session
+        self.client = session.client(
+            "s3", config=Config(max_pool_connections=MAX_POOL_CONNECTIONS)
+        )
+        self.created_at = time.monotonic()
+        self.refreshable = refreshable
+
+
+class S3ClientFactory:
+    """
+    Cache of boto3 S3 sessions and clients keyed by credentials and region.
+
+    Creating a boto3 session is expensive, so each credentials/region pair gets
+    one session and one client that are shared between threads (boto3 clients are
+    thread safe). Resources are not thread safe and are cached per thread.
+    Entries created from temporary credentials are dropped once the credentials
+    lifetime is over, when ``refresh_using`` is passed the credentials are
+    refreshed in place instead. At most ``max_sessions`` entries are kept, the
+    least recently used ones are dropped first.
+    """
+
+    def __init__(
+        self,
+        credentials_lifetime: int = TEMPORARY_CREDENTIALS_LIFETIME,
+        max_sessions: int = MAX_CACHED_SESSIONS,
+    ):
+        self._credentials_lifetime = credentials_lifetime
+        self._max_sessions = max_sessions
+        self._entries: Dict[CredentialsKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _expired(self, key: CredentialsKey, entry: _Entry) -> bool:
+        session_token = key[2]
+        if not session_token or entry.refreshable:
+            return False
+        return time.monotonic() - entry.created_at >= self._credentials_lifetime
+
+    def _expiry_time(self) -> str:
+        return (
+            datetime.now(timezone.utc) + timedelta(seconds=self._credentials_lifetime)
+        ).isoformat()
+
+    def _create_refreshable_session(
+        self, key: CredentialsKey, refresh_using: CredentialsProvider
+    ) -> boto3.Session:
+        access_key, secret_key, session_token, region = key
+
+        def refresh():
+            _access_key, _secret_key, _session_token = refresh_using()
+            return {
+                "access_key": _access_key,
+                "secret_key": _secret_key,
+                "token": _session_token,
+                "expiry_time": self._expiry_time(),
+            }
+
+        credentials = RefreshableCredentials.create_from_metadata(
+            metadata={
+                "access_key": access_key,
+                "secret_key": secret_key,
+                "token": session_token,
+                "expiry_time": self._expiry_time(),
+            },
+            refresh_using=refresh,
+            method="sdk-upload-token",
+        )
+        botocore_session = get_session()
+        botocore_session._credentials = credentials  # noqa
+        return boto3.Session(botocore_session=botocore_session, region_name=region)
+
+    def _get_entry(
+        self,
+        access_key: str = None,
+        secret_key: str = None,
+        session_token: str = None,
+        region: str = None,
+        refresh_using: CredentialsProvider = None,
+    ) -> _Entry:
+        key = (access_key, secret_key, session_token, region)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._expired(key, entry):
+                self._entries.move_to_end(key)
+                return entry
+            if refresh_using and session_token:
+                session = self._create_refreshable_session(key, refresh_using)
+            else:
+                session = boto3.Session(
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    aws_session_token=session_token,
+                    region_name=region,
+                )
+            entry = _Entry(session, refreshable=bool(refresh_using and session_token))
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            return entry
+
+    def _evict(self):
+        for key in [k for k, v in self._entries.items() if self._expired(k, v)]:
+            del self._entries[key]
+        while len(self._entries) > self._max_sessions:
+            self._entries.popitem(last=False)
+
+    def get_client(
+        self,
+        access_key: str = None,
+        secret_key: str = None,
+        session_token: str = None,
+        region: str = None,
+        refresh_using: CredentialsProvider = None,
+    ):
+        """
+        Returns a shared S3 client, without credentials the default boto3
+        credentials chain is used.
+        """
+        return self._get_entry(
+            access_key, secret_key, session_token, region, refresh_using
+        ).client
+
+    def get_resource(
+        self,
+        access_key: str = None,
+        secret_key: str = None,
+        session_token: str = None,
+        region: str = None,
+        refresh_using: CredentialsProvider = None,
+    ):
+        """
+        Returns an S3 resource owned by the calling thread.
+        """
+        entry = self._get_entry(
+            access_key, secret_key, session_token, region, refresh_using
+        )
+        key = (access_key, secret_key, session_token, region)
+        resources = getattr(self._local, "resources", None)
+        if resources is None:
+            resources = self._local.resources = {}
+        cached = resources.get(key)
+        if cached is None or cached[0] is not entry:
+            # drop the resources of the evicted entries along with the new one
+            with self._lock:
+                for resource_key in [
+                    k for k, v in resources.items() if self._entries.get(k) is not v[0]
+                ]:
+                    del resources[resource_key]
+            cached = (entry, entry.session.resource("s3"))
+            resources[key] = cached
+        return cached[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._local = threading.local()
+
+
+S3_CLIENTS = S3ClientFactory()
@@ -0,0 +1,171 @@
+import concurrent.futures
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+from typing import Tuple
+
+import lib.core as constances
+from lib.core.entities import ImageEntity
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = 8
+QUERY_CHUNK_SIZE = 500
+
+
+def get_file_hash(path: str) -> str:
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def get_file_hashes(
+    paths: Iterable[str], max_workers: int = HASH_WORKERS
+) -> Dict[str, str]:
+    """
+    Hashes the files in parallel threads, unreadable files are skipped.
+    """
+    path_hash_map = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(get_file_hash, path): path for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                path_hash_map[futures[future]] = future.result()
+            except OSError:
+                continue
+    return path_hash_map
+
+
+class _LocalStore:
+    TABLE_SCHEMA = None
+
+    def __init__(self, path: str = constances.UPLOAD_INDEX_PATH):
+        self._path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(self.TABLE_SCHEMA)
+            self._connection.commit()
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+
+class UploadIndex(_LocalStore):
+    """
+    Local SQLite index of the content hashes of the files uploaded to each folder.
+    """
+
+    TABLE_SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS uploaded_files ("
+        "project_id INTEGER, folder_id INTEGER, hash TEXT, name TEXT, "
+        "PRIMARY KEY (project_id, folder_id, hash))"
+    )
+
+    def get_uploaded(self, project_id: int, folder_id: int, hashes: List[str]) -> Set:
+        uploaded = set()
+        with self._lock:
+            for i in range(0, len(hashes), QUERY_CHUNK_SIZE):
+                chunk = hashes[i : i + QUERY_CHUNK_SIZE]  # noqa: E203
+                rows = self.connection.execute(
+                    "SELECT hash FROM uploaded_files WHERE project_id = ? AND "
+                    f"folder_id = ? AND hash IN ({', '.join('?' * len(chunk))})",
+                    (project_id, folder_id, *chunk),
+                )
+                uploaded.update(row[0] for row in rows)
+        return uploaded
+
+    def add(
+        self,
+        project_id: int,
+        folder_id: int,
+        hash_name_pairs: Iterable[Tuple[str, str]],
+    ):
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO uploaded_files VALUES (?, ?, ?, ?)",
+                [
+                    (project_id, folder_id, file_hash, name)
+                    for file_hash, name in hash_name_pairs
+                ],
+            )
+            self.connection.commit()
+
+
+class UploadJournal(_LocalStore):
+    """
+    Local SQLite journal of the images uploaded to S3 that are not attached yet,
+    so that an interrupted upload can attach them without uploading again. The
+    images are kept by the URI of their source file.
+    """
+
+    TABLE_SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS upload_journal ("
+        "project_id INTEGER, folder_id INTEGER, name TEXT, source_path TEXT, "
+        "s3_path TEXT, width INTEGER, height INTEGER, "
+        "PRIMARY KEY (project_id, folder_id, name))"
+    )
+
+    def add(
+        self, project_id: int, folder_id: int, source_path: str, image: ImageEntity
+    ):
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO upload_journal VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    project_id,
+                    folder_id,
+                    image.name,
+                    str(source_path),
+                    image.path,
+                    image.meta["width"],
+                    image.meta["height"],
+                ),
+            )
+            self.connection.commit()
+
+    def get_pending(
+        self, project_id: int, folder_id: int, source_paths: List[str]
+    ) -> Dict[str, ImageEntity]:
+        pending = {}
+        source_paths = [str(path) for path in source_paths]
+        with self._lock:
+            for i in range(0, len(source_paths), QUERY_CHUNK_SIZE):
+                chunk = source_paths[i : i + QUERY_CHUNK_SIZE]  # noqa: E203
+                rows = self.connection.execute(
+                    "SELECT source_path, name, s3_path, width, height FROM upload_journal "
+                    "WHERE project_id = ? AND folder_id = ? AND "
+                    f"source_path IN ({', '.join('?' * len(chunk))})",
+                    (project_id, folder_id, *chunk),
+                )
+                for source_path, name, s3_path, width, height in rows:
+                    pending[source_path] = ImageEntity(
+                        name=name, path=s3_path, meta=dict(width=width, height=height)
+                    )
+        return pending
+
+    def remove(self, project_id: int, folder_id: int, names: List[str]):
+        with self._lock:
+            self.connection.executemany(
+                "DELETE FROM upload_journal WHERE project_id = ? AND folder_id = ? "
+                "AND name = ?",
+                [(project_id, folder_id, name) for name in names],
+            )
+            self.connection.commit()
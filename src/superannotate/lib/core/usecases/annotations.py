@@ -1,4 +1,6 @@
 import asyncio
+import collections
+import concurrent.futures
 import copy
 import io
 import itertools
@@ -15,7 +17,6 @@ from itertools import islice
 from operator import itemgetter
 from pathlib import Path
 from threading import Thread
-from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import List
@@ -24,7 +25,6 @@ from typing import Set
 from typing import Tuple
 
 import aiofiles
-import boto3
 import jsonschema.validators
 import lib.core as constants
 from jsonschema import Draft7Validator
@@ -38,8 +38,10 @@ from lib.core.entities import ImageEntity
 from lib.core.entities import ProjectEntity
 from lib.core.entities import UserEntity
 from lib.core.exceptions import AppException
+from lib.core.exceptions import AppValidationException
 from lib.core.reporter import Reporter
 from lib.core.response import Response
+from lib.core.s3 import S3_CLIENTS
 from lib.core.service_types import UploadAnnotationAuthData
 from lib.core.serviceproviders import BaseServiceProvider
 from lib.core.serviceproviders import ServiceResponse
@@ -474,6 +476,8 @@ class UploadAnnotationsUseCase(BaseReportableUseCase):
 
 class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
     MAX_WORKERS = 16
+    S3_READ_WORKERS = 16
+    PREFETCH_SIZE = 64
     CHUNK_SIZE = 100
     CHUNK_SIZE_PATHS = 500
     CHUNK_SIZE_MB = 10 * 1024 * 1024
@@ -521,6 +525,7 @@ class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
         self._s3_bucket = None
         self._big_files_queue = None
         self._small_files_queue = None
+        self._s3_executor = None
         self._report = Report([], [], [], [])
 
     @staticmethod
@@ -561,10 +566,8 @@ class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
 
     @staticmethod
     def get_annotation_from_s3(bucket, path: str):
-        session = boto3.Session().resource("s3")
         file = io.BytesIO()
-        s3_object = session.Object(bucket, path)
-        s3_object.download_fileobj(file)
+        S3_CLIENTS.get_client().download_fileobj(bucket, path, file)
         file.seek(0)
         return file
 
@@ -602,15 +605,27 @@ class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
         parts = path.rsplit(replacement, 1)
         return constants.ANNOTATION_MASK_POSTFIX.join(parts)
 
+    async def _read_from_s3(self, path: str) -> io.BytesIO:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._s3_executor,
+            self.get_annotation_from_s3,
+            self._client_s3_bucket,
+            path,
+        )
+
     async def get_annotation(
         self, path: str
     ) -> (Optional[Tuple[io.StringIO]], Optional[io.BytesIO]):
         mask = None
         mask_path = self.get_mask_path(path)
         if self._client_s3_bucket:
-            content = self.get_annotation_from_s3(self._client_s3_bucket, path).read()
             if self._project.type == constants.ProjectType.PIXEL.value:
-                mask = self.get_annotation_from_s3(self._client_s3_bucket, mask_path)
+                file, mask = await asyncio.gather(
+                    self._read_from_s3(path), self._read_from_s3(mask_path)
+                )
+            else:
+                file = await self._read_from_s3(path)
+            content = file.read()
         else:
             async with aiofiles.open(path, encoding="utf-8") as file:
                 content = await file.read()
@@ -692,13 +707,12 @@ class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
         if not self._s3_bucket:
             upload_data = self.annotation_upload_data
             if upload_data:
-                session = boto3.Session(
-                    aws_access_key_id=upload_data.access_key,
-                    aws_secret_access_key=upload_data.secret_key,
-                    aws_session_token=upload_data.session_token,
-                    region_name=upload_data.region,
+                resource = S3_CLIENTS.get_resource(
+                    upload_data.access_key,
+                    upload_data.secret_key,
+                    upload_data.session_token,
+                    upload_data.region,
                 )
-                resource = session.resource("s3")
                 self._s3_bucket = resource.Bucket(upload_data.bucket)
         return self._s3_bucket
 
@@ -713,35 +727,42 @@ class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
             )
 
     async def distribute_queues(self, items_to_upload: List[ItemToUpload]):
-        data: List[List[Any, bool]] = [[i, False] for i in items_to_upload]
-        processed_count = 0
-        while processed_count < len(data):
-            for idx, (item_to_upload, processed) in enumerate(data):
-                if not processed:
-                    try:
-                        (
-                            item_to_upload.annotation_json,
-                            item_to_upload.mask,
-                            item_to_upload.file_size,
-                        ) = await self.get_annotation(item_to_upload.path)
-                        while True:
-                            if item_to_upload.file_size > BIG_FILE_THRESHOLD:
-                                if self._big_files_queue.qsize() > 32:
-                                    await asyncio.sleep(3)
-                                    continue
-                                self._big_files_queue.put_nowait(item_to_upload)
-                                break
-                            else:
-                                self._small_files_queue.put_nowait(item_to_upload)
-                                break
-                    except Exception as e:
-                        logger.debug(e)
-                        self._report.failed_annotations.append(item_to_upload.item.name)
-                        self.reporter.update_progress()
-                        data[idx][1] = True
-                        processed_count += 1
-                    data[idx][1] = True
-                    processed_count += 1
+        # annotations are read ahead of the queues so that reads overlap uploads
+        items = iter(items_to_upload)
+        prefetched = collections.deque()
+
+        def prefetch():
+            item = next(items, None)
+            if item:
+                prefetched.append(
+                    (item, asyncio.ensure_future(self.get_annotation(item.path)))
+                )
+
+        for _ in range(self.PREFETCH_SIZE):
+            prefetch()
+        while prefetched:
+            item_to_upload, annotation_future = prefetched.popleft()
+            prefetch()
+            try:
+                (
+                    item_to_upload.annotation_json,
+                    item_to_upload.mask,
+                    item_to_upload.file_size,
+                ) = await annotation_future
+                while True:
+                    if item_to_upload.file_size > BIG_FILE_THRESHOLD:
+                        if self._big_files_queue.qsize() > 32:
+                            await asyncio.sleep(3)
+                            continue
+                        self._big_files_queue.put_nowait(item_to_upload)
+                        break
+                    else:
+                        self._small_files_queue.put_nowait(item_to_upload)
+                        break
+            except Exception as e:
+                logger.debug(e)
+                self._report.failed_annotations.append(item_to_upload.item.name)
+                self.reporter.update_progress()
         self._big_files_queue.put_nowait(None)
         self._small_files_queue.put_nowait(None)
 
@@ -750,32 +771,39 @@ class UploadAnnotationsFromFolderUseCase(BaseReportableUseCase):
             asyncio.Queue(),
             asyncio.Queue(),
         )
-        await asyncio.gather(
-            self.distribute_queues(items_to_upload),
-            *[
-                upload_big_annotations(
+        if self._client_s3_bucket:
+            self._s3_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.S3_READ_WORKERS
+            )
+        try:
+            await asyncio.gather(
+                self.distribute_queues(items_to_upload),
+                *[
+                    upload_big_annotations(
+                        project=self._project,
+                        folder=self._folder,
+                        queue=self._big_files_queue,
+                        service_provider=self._service_provider,
+                        report=self._report,
+                        reporter=self.reporter,
+                        callback=self._upload_mask,
+                    )
+                    for _ in range(3)
+                ],
+                upload_small_annotations(
                     project=self._project,
                     folder=self._folder,
-                    queue=self._big_files_queue,
+                    queue=self._small_files_queue,
                     service_provider=self._service_provider,
-                    report=self._report,
                     reporter=self.reporter,
+                    report=self._report,
                     callback=self._upload_mask,
-                )
-                for _ in range(3)
-            ],
-        )
-        await asyncio.gather(
-            upload_small_annotations(
-                project=self._project,
-                folder=self._folder,
-                queue=self._small_files_queue,
-                service_provider=self._service_provider,
-                reporter=self.reporter,
-                report=self._report,
-                callback=self._upload_mask,
+                ),
             )
-        )
+        finally:
+            if self._s3_executor:
+                self._s3_executor.shutdown(wait=False)
+                self._s3_executor = None
 
     def execute(self):
         missing_annotations = []
@@ -892,13 +920,12 @@ class UploadAnnotationUseCase(BaseReportableUseCase):
         if not self._s3_bucket:
             upload_data = self.annotation_upload_data
             if upload_data:
-                session = boto3.Session(
-                    aws_access_key_id=upload_data.access_key,
-                    aws_secret_access_key=upload_data.secret_key,
-                    aws_session_token=upload_data.session_token,
-                    region_name=upload_data.region,
+                resource = S3_CLIENTS.get_resource(
+                    upload_data.access_key,
+                    upload_data.secret_key,
+                    upload_data.session_token,
+                    upload_data.region,
                 )
-                resource = session.resource("s3")
                 self._s3_bucket = resource.Bucket(upload_data.bucket)
         return self._s3_bucket
 
@@ -912,8 +939,7 @@ class UploadAnnotationUseCase(BaseReportableUseCase):
     @property
     def from_s3(self):
         if self._client_s3_bucket:
-            from_session = boto3.Session()
-            return from_session.resource("s3")
+            return S3_CLIENTS.get_resource()
 
     def _get_annotation_json(self) -> tuple:
         annotation_json, mask = None, None
@@ -1078,6 +1104,9 @@ class GetVideoAnnotationsPerFrame(BaseReportableUseCase):
         video_name: str,
         fps: int,
         service_provider: BaseServiceProvider,
+        start_frame: int = None,
+        end_frame: int = None,
+        output: str = "dict",
     ):
         super().__init__(reporter)
         self._config = config
@@ -1086,6 +1115,29 @@ class GetVideoAnnotationsPerFrame(BaseReportableUseCase):
         self._video_name = video_name
         self._fps = fps
         self._service_provider = service_provider
+        self._start_frame = start_frame
+        self._end_frame = end_frame
+        self._output = output
+
+    def validate_output(self):
+        if self._output not in ("dict", "columns", "arrow"):
+            raise AppValidationException(
+                "output should be one of dict, columns or arrow."
+            )
+
+    def validate_frame_range(self):
+        if self._start_frame is not None and self._start_frame < 1:
+            raise AppValidationException("start_frame should be greater than 0.")
+        if self._end_frame is not None and self._end_frame < 1:
+            raise AppValidationException("end_frame should be greater than 0.")
+        if (
+            self._start_frame is not None
+            and self._end_frame is not None
+            and self._start_frame > self._end_frame
+        ):
+            raise AppValidationException(
+                "start_frame should be less than or equal to end_frame."
+            )
 
     def validate_project_type(self):
         if self._project.type != constants.ProjectType.VIDEO.value:
@@ -1106,8 +1158,12 @@ class GetVideoAnnotationsPerFrame(BaseReportableUseCase):
             ).execute()
             if response.data:
                 generator = VideoFrameGenerator(response.data[0], fps=self._fps)
+                start_frame, end_frame = generator.get_frame_range(
+                    self._start_frame, self._end_frame
+                )
                 logger.info(
-                    f"Getting annotations for {generator.frames_count} frames from {self._video_name}."
+                    f"Getting annotations for {max(end_frame - start_frame + 1, 0)} "
+                    f"frames from {self._video_name}."
                 )
                 if response.errors:
                     self._response.errors = response.errors
@@ -1117,8 +1173,18 @@ class GetVideoAnnotationsPerFrame(BaseReportableUseCase):
                         f"Video {self._video_name} not found."
                     )
                 annotations = response.data
-                if annotations:
-                    self._response.data = list(generator)
+                if annotations and self._output == "columns":
+                    self._response.data = generator.to_columns(
+                        self._start_frame, self._end_frame
+                    )
+                elif annotations and self._output == "arrow":
+                    self._response.data = generator.to_arrow(
+                        self._start_frame, self._end_frame
+                    )
+                elif annotations:
+                    self._response.data = list(
+                        generator.get_frames(self._start_frame, self._end_frame)
+                    )
                 else:
                     self._response.data = []
             else:
@@ -1,20 +1,25 @@
 import concurrent.futures
 import copy
 import io
+import itertools
 import json
 import logging
+import multiprocessing
 import os.path
 import random
-import tempfile
+import threading
 import time
 import uuid
 from collections import defaultdict
 from collections import namedtuple
 from pathlib import Path
+from queue import Empty
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 
-import boto3
 import cv2
 import lib.core as constances
 import numpy as np
@@ -39,9 +44,13 @@ from lib.core.reporter import Progress
 from lib.core.reporter import Reporter
 from lib.core.repositories import BaseManageableRepository
 from lib.core.response import Response
+from lib.core.s3 import S3_CLIENTS
 from lib.core.serviceproviders import BaseServiceProvider
 from lib.core.types import Attachment
 from lib.core.types import AttachmentMeta
+from lib.core.upload_index import get_file_hashes
+from lib.core.upload_index import UploadIndex
+from lib.core.upload_index import UploadJournal
 from lib.core.usecases.base import BaseInteractiveUseCase
 from lib.core.usecases.base import BaseReportableUseCase
 from lib.core.usecases.base import BaseUseCase
@@ -49,6 +58,8 @@ from PIL import UnidentifiedImageError
 
 logger = logging.getLogger("sa")
 
+ProcessedImage = namedtuple("ProcessedImage", ["uploaded", "path", "entity", "name"])
+
 
 class GetImageUseCase(BaseUseCase):
     def __init__(
@@ -590,8 +601,7 @@ class GetS3ImageUseCase(BaseUseCase):
     def execute(self):
         try:
             image = io.BytesIO()
-            session = boto3.Session()
-            resource = session.resource("s3")
+            resource = S3_CLIENTS.get_resource()
             image_object = resource.Object(self._s3_bucket, self._image_path)
             if image_object.content_length > constances.MAX_IMAGE_SIZE:
                 raise AppValidationException(
@@ -844,6 +854,10 @@ class UploadImageToProject(BaseUseCase):
 class UploadImagesToProject(BaseInteractiveUseCase):
     MAX_WORKERS = 10
     LIST_NAME_CHUNK_SIZE = 500
+    ATTACH_CHUNK_SIZE = 100
+    USE_JOURNAL = True
+    DUPLICATE_CHECK_NAME = "name"
+    DUPLICATE_CHECK_HASH = "hash"
 
     def __init__(
         self,
@@ -858,6 +872,7 @@ class UploadImagesToProject(BaseInteractiveUseCase):
         exclude_file_patterns: List[str] = constances.DEFAULT_FILE_EXCLUDE_PATTERNS,
         recursive_sub_folders: bool = False,
         image_quality_in_editor=None,
+        duplicate_check: str = DUPLICATE_CHECK_NAME,
     ):
         super().__init__()
 
@@ -879,6 +894,39 @@ class UploadImagesToProject(BaseInteractiveUseCase):
             )
         self._exclude_file_patterns = exclude_file_patterns
         self._annotation_status = annotation_status
+        self._duplicate_check = duplicate_check
+        self._name_hash_map = {}
+        self._upload_index = None
+        self._upload_journal = None
+
+    @property
+    def upload_index(self) -> UploadIndex:
+        if not self._upload_index:
+            self._upload_index = UploadIndex()
+        return self._upload_index
+
+    @property
+    def upload_journal(self) -> UploadJournal:
+        if not self._upload_journal:
+            self._upload_journal = UploadJournal()
+        return self._upload_journal
+
+    def _get_journal_source(self, path) -> str:
+        """
+        Returns the journal key of the path, the S3 URL of the files of the bucket
+        and the file URI of the local files, so the same text of an S3 key and of a
+        relative local path don't collide.
+        """
+        if self._from_s3_bucket:
+            return f"s3://{self._from_s3_bucket}/{path}"
+        return Path(path).resolve().as_uri()
+
+    @property
+    def check_hash_duplicates(self) -> bool:
+        return (
+            self._duplicate_check == self.DUPLICATE_CHECK_HASH
+            and not self._from_s3_bucket
+        )
 
     @property
     def extensions(self):
@@ -934,6 +982,19 @@ class UploadImagesToProject(BaseInteractiveUseCase):
                 constances.LIMITED_FUNCTIONS[self._project.type]
             )
 
+    def validate_duplicate_check(self):
+        if self._duplicate_check not in (
+            self.DUPLICATE_CHECK_NAME,
+            self.DUPLICATE_CHECK_HASH,
+        ):
+            raise AppValidationException(
+                "Invalid duplicate check, should be either name or hash."
+            )
+        if self._duplicate_check == self.DUPLICATE_CHECK_HASH and self._from_s3_bucket:
+            raise AppValidationException(
+                "Hash duplicate check is supported only for local files."
+            )
+
     @property
     def auth_data(self):
         if not self._auth_data:
@@ -945,6 +1006,18 @@ class UploadImagesToProject(BaseInteractiveUseCase):
             self._auth_data = response.data
         return self._auth_data
 
+    def _refresh_auth_credentials(self):
+        response = self._service_provider.get_s3_upload_auth_token(
+            project=self._project, folder=self._folder
+        )
+        if not response.ok:
+            raise AppException(response.error)
+        return (
+            response.data["accessKeyId"],
+            response.data["secretAccessKey"],
+            response.data["sessionToken"],
+        )
+
     @property
     def s3_repository(self):
         if not self._s3_repo_instance:
@@ -954,13 +1027,11 @@ class UploadImagesToProject(BaseInteractiveUseCase):
                 self.auth_data["sessionToken"],
                 self.auth_data["bucket"],
                 self.auth_data["region"],
+                refresh_using=self._refresh_auth_credentials,
             )
         return self._s3_repo_instance
 
     def _upload_image(self, image_path: str):
-        ProcessedImage = namedtuple(
-            "ProcessedImage", ["uploaded", "path", "entity", "name"]
-        )
         if self._from_s3_bucket:
             response = GetS3ImageUseCase(
                 s3_bucket=self._from_s3_bucket, image_path=image_path
@@ -1000,7 +1071,7 @@ class UploadImagesToProject(BaseInteractiveUseCase):
             entity = upload_response.data
             return ProcessedImage(
                 uploaded=True,
-                path=entity.path,
+                path=image_path,
                 entity=entity,
                 name=Path(image_path).name,
             )
@@ -1009,22 +1080,43 @@ class UploadImagesToProject(BaseInteractiveUseCase):
                 uploaded=False, path=image_path, entity=None, name=Path(image_path).name
             )
 
+    def filter_uploaded_by_hash(self, paths: List[str]):
+        path_hash_map = get_file_hashes(paths)
+        uploaded_hashes = self.upload_index.get_uploaded(
+            self._project.id, self._folder.id, list(set(path_hash_map.values()))
+        )
+        filtered_paths, duplicated_paths = [], []
+        seen_hashes = set()
+        for path in paths:
+            file_hash = path_hash_map.get(path)
+            if file_hash in uploaded_hashes or file_hash in seen_hashes:
+                duplicated_paths.append(path)
+                continue
+            if file_hash:
+                seen_hashes.add(file_hash)
+                self._name_hash_map.setdefault(Path(path).name, file_hash)
+            filtered_paths.append(path)
+        return filtered_paths, duplicated_paths
+
     def filter_paths(self, paths: List[str]):
         paths = [
             path
             for path in paths
             if not any([extension in path for extension in self.exclude_file_patterns])
         ]
+        hash_duplicated_paths = []
+        if self.check_hash_duplicates:
+            paths, hash_duplicated_paths = self.filter_uploaded_by_hash(paths)
         name_path_map = defaultdict(list)
         for path in paths:
             name_path_map[Path(path).name].append(path)
 
         CHUNK_SIZE = UploadImagesToProject.LIST_NAME_CHUNK_SIZE
         filtered_paths = []
-        duplicated_paths = []
+        duplicated_paths = hash_duplicated_paths
         for file_name in name_path_map:
             if len(name_path_map[file_name]) > 1:
-                duplicated_paths.append(name_path_map[file_name][1:])
+                duplicated_paths.extend(name_path_map[file_name][1:])
             filtered_paths.append(name_path_map[file_name][0])
 
         image_list = []
@@ -1043,12 +1135,19 @@ class UploadImagesToProject(BaseInteractiveUseCase):
 
         image_list = set(image_list)
         images_to_upload = []
+        existing_names = []
 
         for path in filtered_paths:
             if Path(path).name not in image_list:
                 images_to_upload.append(path)
             else:
                 duplicated_paths.append(path)
+                existing_names.append(Path(path).name)
+        if self.USE_JOURNAL and existing_names:
+            # the images were attached after an interrupted run journaled them
+            self.upload_journal.remove(
+                self._project.id, self._folder.id, existing_names
+            )
         return list(set(images_to_upload)), duplicated_paths
 
     @property
@@ -1057,51 +1156,120 @@ class UploadImagesToProject(BaseInteractiveUseCase):
             self._images_to_upload = self.filter_paths(self._paths)
         return self._images_to_upload
 
+    def _attach(self, images: List[ImageEntity]):
+        response = AttachFileUrlsUseCase(
+            project=self._project,
+            folder=self._folder,
+            service_provider=self._service_provider,
+            attachments=images,
+            annotation_status=self._annotation_status,
+            upload_state_code=constances.UploadState.BASIC.value,
+        ).execute()
+        if response.errors:
+            logger.error(response.errors)
+            return [], []
+        attachments, duplications = response.data
+        attached = [image["name"] for image in attachments]
+        if self.USE_JOURNAL:
+            self.upload_journal.remove(
+                self._project.id, self._folder.id, [image.name for image in images]
+            )
+        if self.check_hash_duplicates:
+            self.upload_index.add(
+                self._project.id,
+                self._folder.id,
+                [
+                    (self._name_hash_map[name], name)
+                    for name in attached
+                    if name in self._name_hash_map
+                ],
+            )
+        return attached, duplications
+
+    def _upload(self, items: Iterable, to_attach: List[ImageEntity]):
+        """
+        Uploads the items in the worker threads, the items are consumed lazily.
+        Uploaded images are attached in batches in a separate thread while the
+        uploads go on.
+        """
+        uploaded, failed_images, duplications = [], [], []
+        attach_futures = []
+        items = iter(items)
+        running = set()
+        attach_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        with attach_executor, concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS
+        ) as executor:
+            while True:
+                for item in itertools.islice(
+                    items, self.MAX_WORKERS * 2 - len(running)
+                ):
+                    running.add(executor.submit(self._upload_image, item))
+                if not running:
+                    break
+                done, running = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    processed_image = future.result()
+                    if processed_image.uploaded and processed_image.entity:
+                        if self.USE_JOURNAL:
+                            self.upload_journal.add(
+                                self._project.id,
+                                self._folder.id,
+                                self._get_journal_source(processed_image.path),
+                                processed_image.entity,
+                            )
+                        to_attach.append(processed_image.entity)
+                    else:
+                        failed_images.append(processed_image.path)
+                    while len(to_attach) >= self.ATTACH_CHUNK_SIZE:
+                        attach_futures.append(
+                            attach_executor.submit(
+                                self._attach, to_attach[: self.ATTACH_CHUNK_SIZE]
+                            )
+                        )
+                        to_attach = to_attach[self.ATTACH_CHUNK_SIZE :]  # noqa: E203
+                    yield processed_image
+            if to_attach:
+                attach_futures.append(attach_executor.submit(self._attach, to_attach))
+            for future in attach_futures:
+                attached, attach_duplications = future.result()
+                uploaded.extend(attached)
+                duplications.extend(attach_duplications)
+        return uploaded, failed_images, duplications
+
     def execute(self):
         if self.is_valid():
             images_to_upload, duplications = self.images_to_upload
             images_to_upload = images_to_upload[: self.auth_data["availableImageCount"]]
             if not images_to_upload:
                 return self._response
-
-            uploaded_images = []
-            failed_images = []
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=self.MAX_WORKERS
-            ) as executor:
-                results = [
-                    executor.submit(self._upload_image, image_path)
-                    for image_path in images_to_upload
+            # images uploaded by an interrupted run are attached without uploading
+            pending = {}
+            if self.USE_JOURNAL:
+                sources = {
+                    path: self._get_journal_source(path) for path in images_to_upload
+                }
+                pending = self.upload_journal.get_pending(
+                    self._project.id, self._folder.id, list(sources.values())
+                )
+                images_to_upload = [
+                    path for path in images_to_upload if sources[path] not in pending
                 ]
-                for future in concurrent.futures.as_completed(results):
-                    processed_image = future.result()
-                    if processed_image.uploaded and processed_image.entity:
-                        uploaded_images.append(processed_image)
-                    else:
-                        failed_images.append(processed_image.path)
-                    yield
+            to_attach = list(pending.values())
+            if to_attach:
+                logger.info(
+                    f"Attaching {len(to_attach)} images uploaded by a previous run."
+                )
 
-            uploaded = []
-            for i in range(0, len(uploaded_images), 100):
-                response = AttachFileUrlsUseCase(
-                    project=self._project,
-                    folder=self._folder,
-                    service_provider=self._service_provider,
-                    attachments=[
-                        image.entity
-                        for image in uploaded_images[i : i + 100]  # noqa: E203
-                    ],
-                    annotation_status=self._annotation_status,
-                    upload_state_code=constances.UploadState.BASIC.value,
-                ).execute()
-                if response.errors:
-                    logger.error(response.errors)
-                    continue
-                attachments, attach_duplications = response.data
-                uploaded.extend(attachments)
-                duplications.extend(attach_duplications)
-            uploaded = [image["name"] for image in uploaded]
-            failed_images = [image.split("/")[-1] for image in failed_images]
+            for _ in pending:
+                yield
+            uploaded, failed_images, attach_duplications = yield from self._upload(
+                images_to_upload, to_attach
+            )
+            duplications.extend(attach_duplications)
+            failed_images = [str(image).split("/")[-1] for image in failed_images]
             self._response.data = uploaded, failed_images, duplications
         return self._response
 
@@ -1122,6 +1290,7 @@ class UploadImagesFromFolderToProject(UploadImagesToProject):
         exclude_file_patterns: List[str] = constances.DEFAULT_FILE_EXCLUDE_PATTERNS,
         recursive_sub_folders: bool = False,
         image_quality_in_editor=None,
+        duplicate_check: str = UploadImagesToProject.DUPLICATE_CHECK_NAME,
     ):
         paths = UploadImagesFromFolderToProject.extract_paths(
             folder_path=folder_path,
@@ -1141,6 +1310,7 @@ class UploadImagesFromFolderToProject(UploadImagesToProject):
             exclude_file_patterns=exclude_file_patterns,
             recursive_sub_folders=recursive_sub_folders,
             image_quality_in_editor=image_quality_in_editor,
+            duplicate_check=duplicate_check,
         )
 
     @classmethod
@@ -1162,7 +1332,7 @@ class UploadImagesFromFolderToProject(UploadImagesToProject):
                         paths += list(Path(folder_path).glob(f"*.{extension.upper()}"))
 
         else:
-            s3_client = boto3.client("s3")
+            s3_client = S3_CLIENTS.get_client()
             paginator = s3_client.get_paginator("list_objects_v2")
             response_iterator = paginator.paginate(
                 Bucket=from_s3_bucket, Prefix=folder_path
@@ -1569,33 +1739,91 @@ class DeleteAnnotationClassUseCase(BaseUseCase):
         return self._response
 
 
-class ExtractFramesUseCase(BaseInteractiveUseCase):
+class UploadFramesToProject(UploadImagesToProject):
+    """
+    Uploads in-memory encoded video frames given as (path, bytes) pairs, the
+    frames are named after the last part of the path.
+    """
+
+    USE_JOURNAL = False
+
+    def __init__(
+        self,
+        project: ProjectEntity,
+        folder: FolderEntity,
+        s3_repo,
+        service_provider: BaseServiceProvider,
+        frames: Iterable[Tuple[str, bytes]],
+        annotation_status="NotStarted",
+        image_quality_in_editor=None,
+    ):
+        super().__init__(
+            project=project,
+            folder=folder,
+            s3_repo=s3_repo,
+            service_provider=service_provider,
+            paths=[],
+            annotation_status=annotation_status,
+            image_quality_in_editor=image_quality_in_editor,
+        )
+        self._frames = frames
+
+    def validate_limitations(self):
+        # the frames count is limited during the extraction
+        pass
+
+    def _upload_image(self, frame: Tuple[str, bytes]):
+        path, image_bytes = frame
+        name = path.split("/")[-1]
+        upload_response = UploadImageS3UseCase(
+            project=self._project,
+            image_path=name,
+            image=io.BytesIO(image_bytes),
+            s3_repo=self.s3_repository,
+            upload_path=self.auth_data["filePath"],
+            service_provider=self._service_provider,
+            image_quality_in_editor=self._image_quality_in_editor,
+        ).execute()
+        if not upload_response.errors and upload_response.data:
+            return ProcessedImage(
+                uploaded=True, path=path, entity=upload_response.data, name=name
+            )
+        return ProcessedImage(uploaded=False, path=path, entity=None, name=name)
+
+    def execute(self):
+        if self.is_valid():
+            self._response.data = yield from self._upload(self._frames, [])
+        return self._response
+
+
+class ExtractFramesUseCase(BaseUseCase):
+    """
+    Validates the frames extraction of a video, the response data is the number
+    of frames that can be uploaded to the folder.
+    """
+
     def __init__(
         self,
         service_provider: BaseServiceProvider,
         project: ProjectEntity,
         folder: FolderEntity,
         video_path: str,
-        extract_path: str,
         start_time: float,
         end_time: float = None,
         target_fps: float = None,
         annotation_status_code: int = constances.AnnotationStatus.NOT_STARTED.value,
         image_quality_in_editor: str = None,
-        limit: int = None,
     ):
         super().__init__()
         self._service_provider = service_provider
         self._project = project
         self._folder = folder
         self._video_path = video_path
-        self._extract_path = extract_path
         self._start_time = start_time
         self._end_time = end_time
         self._target_fps = target_fps
         self._annotation_status_code = annotation_status_code
         self._image_quality_in_editor = image_quality_in_editor
-        self._limit = limit
         self._limitation_response = None
 
     def validate_fps(self):
@@ -1660,18 +1888,26 @@ class ExtractFramesUseCase(BaseInteractiveUseCase):
 
     def execute(self):
         if self.is_valid():
-            frames_generator = VideoPlugin.extract_frames(
-                video_path=self._video_path,
-                start_time=self._start_time,
-                end_time=self._end_time,
-                extract_path=self._extract_path,
-                limit=self.limit,
-                target_fps=self._target_fps,
-            )
-            yield from frames_generator
+            self._response.data = self.limit
+        return self._response
+
+
+class _VideoUpload:
+    def __init__(self, path: Path, frames_count: int, skip_names: Set[str]):
+        self.path = path
+        self.frames_count = frames_count
+        self.skip_names = skip_names
+        self.queued = 0
+        self.processed = 0
+        self.failed = 0
+        self.extracted = False
 
 
 class UploadVideosAsImages(BaseReportableUseCase):
+    # the videos are extracted in the current process unless more workers are set
+    MAX_EXTRACT_WORKERS = int(os.environ.get("SA_VIDEO_EXTRACT_WORKERS", 1))
+    FRAMES_QUEUE_SIZE = 64
+
     def __init__(
         self,
         reporter: Reporter,
@@ -1701,6 +1937,7 @@ class UploadVideosAsImages(BaseReportableUseCase):
         self._end_time = end_time
         self._annotation_status = annotation_status
         self._image_quality_in_editor = image_quality_in_editor
+        self._frame_video_map = {}
 
     @property
     def annotation_status(self):
@@ -1747,89 +1984,210 @@ class UploadVideosAsImages(BaseReportableUseCase):
 
         self._paths = list(validated_paths)
 
+    @staticmethod
+    def _iter_queue(queue, futures) -> Iterable[Tuple[int, str, bytes]]:
+        """
+        Yields the items put to the queue by the extracting processes until every
+        video is done.
+        """
+        finished = 0
+        while finished < len(futures):
+            try:
+                item = queue.get(timeout=1)
+            except Empty:
+                if all(future.done() for future in futures):
+                    break
+                continue
+            if item[1] is None:
+                finished += 1
+            yield item
+
+    def _iter_video(self, index: int, video, stop_event):
+        """
+        Yields the same items as the extracting processes for a video extracted in
+        the current process.
+        """
+        try:
+            for name, frame in VideoPlugin.iter_encoded_frames(
+                str(video.path), self._start_time, self._end_time, self._target_fps
+            ):
+                if stop_event.is_set():
+                    break
+                if name not in video.skip_names:
+                    yield index, name, frame
+        except Exception as e:
+            self.reporter.log_warning(
+                f"Couldn't extract frames of {video.path.name}: {e}"
+            )
+        yield index, None, None
+
+    def _iter_frames(self, items, stop_event, videos, limit):
+        """
+        Yields the (path, bytes) pairs of the extracted frames, at most limit
+        frames are yielded. The frame paths are prefixed with the video paths, so
+        frames of videos with the same name are told apart.
+        """
+        count = 0
+        for index, name, frame in items:
+            video = videos[index]
+            if name is None:
+                video.extracted = True
+                self._report_video(video)
+                continue
+            if count >= limit:
+                stop_event.set()
+                continue
+            count += 1
+            video.queued += 1
+            path = f"{video.path.as_posix()}/{name}"
+            self._frame_video_map[path] = video
+            yield path, frame
+
+    def _report_video(self, video):
+        if video.extracted and video.processed == video.queued:
+            self.reporter.log_info(
+                f"Uploaded {video.processed - video.failed} frames of {video.path.name}."
+            )
+
+    def _upload_frames(self, videos: list, frames, limit: int):
+        use_case = UploadFramesToProject(
+            project=self._project,
+            folder=self._folder,
+            service_provider=self._service_provider,
+            s3_repo=self._s3_repo,
+            frames=frames,
+            annotation_status=self.annotation_status,
+            image_quality_in_editor=self._image_quality_in_editor,
+        )
+        if not use_case.is_valid():
+            raise AppException(use_case.response.errors)
+        with Progress(
+            min(sum(video.frames_count for video in videos), limit),
+            f"Uploading frames of {len(videos)} videos",
+        ) as progress:
+            for processed_image in use_case.execute():
+                video = self._frame_video_map.pop(processed_image.path)
+                video.processed += 1
+                if not processed_image.uploaded:
+                    video.failed += 1
+                self._report_video(video)
+                progress.update()
+        uploaded, failed_images, _ = use_case.response.data
+        if failed_images:
+            self.reporter.log_warning(f"Failed {len(failed_images)}.")
+        return uploaded
+
+    def _upload_videos(self, videos: list, limit: int):
+        """
+        Extracts the frames of the videos one after another in the current process,
+        or in a process pool when MAX_EXTRACT_WORKERS, set by the
+        SA_VIDEO_EXTRACT_WORKERS environment variable, is more than one. On
+        platforms that spawn the worker processes (Windows, macOS) the calling
+        script has to be guarded with ``if __name__ == "__main__":``.
+        """
+        max_workers = min(len(videos), self.MAX_EXTRACT_WORKERS)
+        if max_workers <= 1:
+            stop_event = threading.Event()
+            frames = itertools.chain.from_iterable(
+                self._iter_video(index, video, stop_event)
+                for index, video in enumerate(videos)
+            )
+            return self._upload_frames(
+                videos, self._iter_frames(frames, stop_event, videos, limit), limit
+            )
+        with multiprocessing.Manager() as manager, concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            queue = manager.Queue(maxsize=self.FRAMES_QUEUE_SIZE)
+            stop_event = manager.Event()
+            futures = [
+                executor.submit(
+                    VideoPlugin.put_encoded_frames,
+                    queue,
+                    stop_event,
+                    index,
+                    str(video.path),
+                    self._start_time,
+                    self._end_time,
+                    self._target_fps,
+                    video.skip_names,
+                )
+                for index, video in enumerate(videos)
+            ]
+            try:
+                return self._upload_frames(
+                    videos,
+                    self._iter_frames(
+                        self._iter_queue(queue, futures), stop_event, videos, limit
+                    ),
+                    limit,
+                )
+            finally:
+                stop_event.set()
+                # the processes put the end of the videos even after the stop
+                while not all(future.done() for future in futures):
+                    try:
+                        queue.get(timeout=1)
+                    except Empty:
+                        continue
+                for video, future in zip(videos, futures):
+                    if future.exception():
+                        self.reporter.log_warning(
+                            f"Couldn't extract frames of {video.path.name}: {future.exception()}"
+                        )
+
     def execute(self) -> Response:
         if self.is_valid():
-            data = []
+            videos = []
+            limit = None
             for path in self._paths:
-                with tempfile.TemporaryDirectory() as temp_path:
-                    frame_names = VideoPlugin.get_extractable_frames(
-                        path, self._start_time, self._end_time, self._target_fps
-                    )
-                    duplicate_images = self._service_provider.items.list_by_names(
-                        project=self._project, folder=self._folder, names=frame_names
-                    ).data
-
-                    duplicate_images = [image.name for image in duplicate_images]
-                    frames_generator_use_case = ExtractFramesUseCase(
-                        service_provider=self._service_provider,
-                        project=self._project,
-                        folder=self._folder,
-                        video_path=path,
-                        extract_path=temp_path,
-                        start_time=self._start_time,
-                        end_time=self._end_time,
-                        target_fps=self._target_fps,
-                        annotation_status_code=self.annotation_status,
-                        image_quality_in_editor=self._image_quality_in_editor,
-                    )
-                    if not frames_generator_use_case.is_valid():
-                        self._response.errors = (
-                            frames_generator_use_case.response.errors
-                        )
-                        return self._response
-
-                    frames_generator = frames_generator_use_case.execute()
+                frame_names = VideoPlugin.get_extractable_frames(
+                    path, self._start_time, self._end_time, self._target_fps
+                )
+                duplicate_images = self._service_provider.items.list_by_names(
+                    project=self._project, folder=self._folder, names=frame_names
+                ).data
+                duplicate_images = {image.name for image in duplicate_images}
+                extract_response = ExtractFramesUseCase(
+                    service_provider=self._service_provider,
+                    project=self._project,
+                    folder=self._folder,
+                    video_path=path,
+                    start_time=self._start_time,
+                    end_time=self._end_time,
+                    target_fps=self._target_fps,
+                    annotation_status_code=self.annotation_status,
+                    image_quality_in_editor=self._image_quality_in_editor,
+                ).execute()
+                if extract_response.errors:
+                    self._response.errors = extract_response.errors
+                    return self._response
+                limit = extract_response.data
 
-                    total_frames_count = len(frame_names)
-                    self.reporter.log_info(
-                        f"Video frame count is {total_frames_count}."
-                    )
-                    self.reporter.log_info(
-                        f"Extracted {total_frames_count} frames from video. Now uploading to platform.",
+                total_frames_count = len(frame_names)
+                self.reporter.log_info(f"Video frame count is {total_frames_count}.")
+                self.reporter.log_info(
+                    f"Extracted {total_frames_count} frames from video. Now uploading to platform.",
+                )
+                self.reporter.log_info(
+                    f"Uploading {total_frames_count} images to project {str(self.upload_path)}."
+                )
+                if len(duplicate_images):
+                    self.reporter.log_warning(
+                        f"{len(duplicate_images)} already existing images found that won't be uploaded."
                     )
-                    self.reporter.log_info(
-                        f"Uploading {total_frames_count} images to project {str(self.upload_path)}."
+                if duplicate_images == set(frame_names):
+                    continue
+                videos.append(
+                    _VideoUpload(
+                        Path(path),
+                        total_frames_count - len(duplicate_images),
+                        duplicate_images,
                     )
-                    if len(duplicate_images):
-                        self.reporter.log_warning(
-                            f"{len(duplicate_images)} already existing images found that won't be uploaded."
-                        )
-                    if set(duplicate_images) == set(frame_names):
-                        continue
-                    uploaded_paths = []
-                    with Progress(
-                        total_frames_count, f"Uploading {Path(path).name}"
-                    ) as progress:
-                        for _ in frames_generator:
-                            use_case = UploadImagesFromFolderToProject(
-                                project=self._project,
-                                folder=self._folder,
-                                service_provider=self._service_provider,
-                                folder_path=temp_path,
-                                s3_repo=self._s3_repo,
-                                annotation_status=self.annotation_status,
-                                image_quality_in_editor=self._image_quality_in_editor,
-                            )
-
-                            images_to_upload, duplicates = use_case.images_to_upload
-                            if not len(images_to_upload):
-                                continue
-                            if use_case.is_valid():
-                                for _ in use_case.execute():
-                                    progress.update()
-
-                                uploaded, failed_images, _ = use_case.response.data
-                                uploaded_paths.extend(uploaded)
-                                if failed_images:
-                                    self.reporter.log_warning(
-                                        f"Failed {len(failed_images)}."
-                                    )
-                                files = os.listdir(temp_path)
-                                image_paths = [f"{temp_path}/{f}" for f in files]
-                                for image_path in image_paths:
-                                    os.remove(image_path)
-                            else:
-                                raise AppException(use_case.response.errors)
-                data.extend(uploaded_paths)
+                )
+            # several videos are decoded in parallel processes, a single one in
+            # the current process, and the frames are uploaded from memory by a
+            # shared pool of upload workers
+            data = self._upload_videos(videos, limit) if videos else []
             self._response.data = data
         return self._response
@@ -9,13 +9,11 @@ from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import List
 
-import boto3
 import lib.core as constances
-import pandas as pd
 import requests
 from botocore.exceptions import ClientError
 from lib.app.analytics.aggregators import DataAggregator
-from lib.app.analytics.common import consensus
+from lib.app.analytics.common import dataset_consensus
 from lib.core.conditions import Condition
 from lib.core.conditions import CONDITION_EQ as EQ
 from lib.core.entities import FolderEntity
@@ -26,6 +24,7 @@ from lib.core.enums import ProjectType
 from lib.core.exceptions import AppException
 from lib.core.exceptions import AppValidationException
 from lib.core.reporter import Reporter
+from lib.core.s3 import S3_CLIENTS
 from lib.core.serviceproviders import BaseServiceProvider
 from lib.core.usecases.annotations import DownloadAnnotations
 from lib.core.usecases.base import BaseReportableUseCase
@@ -165,11 +164,11 @@ class DownloadExportUseCase(BaseReportableUseCase):
         self._to_s3_bucket = to_s3_bucket
 
     def upload_to_s3_from_folder(self, source: str, folder_path: str):
-        to_s3_bucket = boto3.Session().resource("s3").Bucket(self._to_s3_bucket)
+        s3_client = S3_CLIENTS.get_client()
         files_to_upload = list(Path(source).rglob("*.*"))
 
         def _upload_file_to_s3(_to_s3_bucket, _path, _s3_key) -> None:
-            _to_s3_bucket.upload_file(str(_path), _s3_key)
+            s3_client.upload_file(str(_path), _to_s3_bucket, _s3_key)
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
             results = []
@@ -177,7 +176,9 @@ class DownloadExportUseCase(BaseReportableUseCase):
             for path in files_to_upload:
                 s3_key = f"{folder_path + '/' if folder_path else ''}{str(Path(path).relative_to(Path(source)))}"
                 results.append(
-                    executor.submit(_upload_file_to_s3, to_s3_bucket, path, s3_key)
+                    executor.submit(
+                        _upload_file_to_s3, self._to_s3_bucket, path, s3_key
+                    )
                 )
             self.reporter.stop_spinner()
 
@@ -286,13 +287,12 @@ class DownloadMLModelUseCase(BaseUseCase):
             )
             if not auth_response.ok:
                 raise AppException(auth_response.error)
-            s3_session = boto3.Session(
-                aws_access_key_id=auth_response.data.access_key,
-                aws_secret_access_key=auth_response.data.secret_key,
-                aws_session_token=auth_response.data.session_token,
-                region_name=auth_response.data.region,
-            )
-            bucket = s3_session.resource("s3").Bucket(auth_response.data.bucket)
+            bucket = S3_CLIENTS.get_resource(
+                auth_response.data.access_key,
+                auth_response.data.secret_key,
+                auth_response.data.session_token,
+                auth_response.data.region,
+            ).Bucket(auth_response.data.bucket)
 
             bucket.download_file(
                 self._model.config_path,
@@ -436,15 +436,7 @@ class ConsensusUseCase(BaseUseCase):
             all_projects_df = all_projects_df.apply(aggregate_attributes).reset_index(
                 drop=True
             )
-            unique_images = set(all_projects_df["itemName"])
-        else:
-            unique_images = all_projects_df["itemName"].unique()
-        all_consensus_data = []
-        for image_name in unique_images:
-            image_data = consensus(all_projects_df, image_name, self._instance_type)
-            all_consensus_data.append(pd.DataFrame(image_data))
-
-        consensus_df = pd.concat(all_consensus_data, ignore_index=True)
+        consensus_df = dataset_consensus(all_projects_df, self._instance_type)
         if self._instance_type == "tag":
             consensus_df["score"] /= len(self._folder_names) - 1
 
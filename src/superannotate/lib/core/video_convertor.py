@@ -1,101 +1,472 @@
+import bisect
+import copy
 import itertools
 import math
 from collections import defaultdict
-from typing import Any
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
 
+import numpy as np
 from lib.core.enums import AnnotationTypes
-from pydantic import BaseModel
 
 
-class Annotation(BaseModel):
-    instanceId: int
-    type: str
-    className: Optional[str]
-    classId: Optional[int]
-    x: Optional[Any]
-    y: Optional[Any]
-    points: Any
-    attributes: Optional[List[Any]] = []
-    keyframe: bool = False
+BBOX_KEYS = ("x1", "y1", "x2", "y2")
+POINT_KEYS = ("x", "y")
 
+_round = np.frompyfunc(lambda value: round(value, 2), 1, 1)
 
-class FrameAnnotation(BaseModel):
-    frame: int
-    annotations: List[Annotation] = []
+
+def _round_values(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds the values with the builtin round like the frame dicts, as np.round
+    rounds the scaled binary value and may differ in the last digit.
+    """
+    return _round(values).astype(float)
+
+
+class _Segment:
+    """
+    Frames [start, end] of an instance parameter, either a single keyframe or the
+    frames interpolated between two keyframes. Interpolated values are computed
+    in blocks of frames with one array operation per block.
+    """
+
+    BLOCK_SIZE = 1024
+
+    __slots__ = (
+        "order",
+        "start",
+        "end",
+        "header",
+        "keyframe",
+        "data",
+        "kind",
+        "base",
+        "steps",
+        "attributes",
+        "_block_start",
+        "_block",
+    )
+
+    def __init__(self, order: int, start: int, end: int, header: dict):
+        self.order = order
+        self.start = start
+        self.end = end
+        self.header = header
+        self.keyframe = False
+        self.data = None
+        self.kind = None
+        self.base = None
+        self.steps = None
+        self.attributes = None
+        self._block_start = None
+        self._block = None
+
+    def __lt__(self, other: "_Segment"):
+        return self.order < other.order
+
+    @classmethod
+    def from_keyframe(cls, order: int, frame_no: int, header: dict, data: dict):
+        segment = cls(order, frame_no, frame_no, header)
+        segment.keyframe = True
+        segment.data = data
+        return segment
+
+    @classmethod
+    def from_keyframes(
+        cls,
+        order: int,
+        from_frame_no: int,
+        to_frame_no: int,
+        header: dict,
+        from_frame: dict,
+        to_frame: dict,
+    ):
+        segment = cls(order, from_frame_no + 1, to_frame_no - 1, header)
+        segment.attributes = from_frame.get("attributes")
+        frames_diff = to_frame_no - from_frame_no
+        annotation_type = header["type"]
+        if annotation_type == AnnotationTypes.BBOX:
+            if from_frame.get("points") and to_frame.get("points"):
+                segment.kind = AnnotationTypes.BBOX
+                segment.base = np.array(
+                    [from_frame["points"][key] for key in BBOX_KEYS], dtype=float
+                )
+                segment.steps = np.array(
+                    [
+                        round(
+                            (to_frame["points"][key] - from_frame["points"][key])
+                            / frames_diff,
+                            2,
+                        )
+                        for key in BBOX_KEYS
+                    ]
+                )
+        elif annotation_type == AnnotationTypes.POINT:
+            segment.kind = AnnotationTypes.POINT
+            segment.base = np.array(
+                [from_frame[key] for key in POINT_KEYS], dtype=float
+            )
+            segment.steps = (
+                np.array([to_frame[key] for key in POINT_KEYS], dtype=float)
+                - segment.base
+            ) / frames_diff
+        elif annotation_type != AnnotationTypes.EVENT:
+            from_points = from_frame.get("points")
+            to_points = to_frame.get("points")
+            if annotation_type in (
+                AnnotationTypes.POLYGON,
+                AnnotationTypes.POLYLINE,
+            ) and len(from_points) == len(to_points):
+                segment.kind = AnnotationTypes.POLYGON
+                segment.base = np.array(from_points, dtype=float)
+                segment.steps = (
+                    np.array(to_points, dtype=float) - segment.base
+                ) / frames_diff
+            elif from_points is not None:
+                # the points can't be matched, the shape is kept as is
+                segment.data = {"points": from_points}
+        return segment
+
+    def values(self, frame_no: int) -> list:
+        if self._block is None or not (
+            self._block_start <= frame_no < self._block_start + len(self._block)
+        ):
+            # sequential reads double the block size up to BLOCK_SIZE, so random
+            # and short reads don't compute frames that aren't requested
+            block_size = 1
+            if self._block is not None and frame_no == self._block_start + len(
+                self._block
+            ):
+                block_size = min(len(self._block) * 2, self.BLOCK_SIZE)
+            block_end = min(frame_no + block_size, self.end + 1)
+            # the steps are counted from the frame before the segment
+            steps_count = np.arange(frame_no, block_end) - (self.start - 1)
+            self._block_start = frame_no
+            self._block = (self.base + self.steps * steps_count[:, np.newaxis]).tolist()
+        return self._block[frame_no - self._block_start]
+
+    def coordinates(self, frames: np.ndarray) -> tuple:
+        """
+        Returns the (bbox, point, polygon) coordinate matrices of the frames,
+        the shapes the segment doesn't have are None.
+        """
+        bbox = point = polygon = None
+        if self.keyframe or (self.kind is None and self.data):
+            data = self.data
+            points = data.get("points")
+            if isinstance(points, dict) and all(key in points for key in BBOX_KEYS):
+                bbox = np.array([[points[key] for key in BBOX_KEYS]], dtype=float)
+            elif isinstance(points, list):
+                polygon = np.array([points], dtype=float)
+            if self.keyframe and (
+                data.get("x") is not None or data.get("y") is not None
+            ):
+                point = np.array(
+                    [
+                        [
+                            np.nan if data.get(key) is None else data[key]
+                            for key in POINT_KEYS
+                        ]
+                    ],
+                    dtype=float,
+                )
+            return tuple(
+                None if i is None else np.repeat(i, len(frames), axis=0)
+                for i in (bbox, point, polygon)
+            )
+        if self.kind is None:
+            return bbox, point, polygon
+        values = self.base + self.steps * (frames - (self.start - 1))[:, np.newaxis]
+        if self.kind == AnnotationTypes.BBOX:
+            bbox = _round_values(values)
+        elif self.kind == AnnotationTypes.POINT:
+            point = _round_values(values)
+        else:
+            polygon = values
+        return bbox, point, polygon
+
+    def annotation(self, frame_no: int) -> dict:
+        annotation = dict(self.header)
+        if self.keyframe:
+            for key in ("x", "y", "points", "attributes"):
+                value = self.data.get(key)
+                if value is not None:
+                    annotation[key] = copy.deepcopy(value)
+            annotation["keyframe"] = True
+            return annotation
+        if self.kind == AnnotationTypes.BBOX:
+            values = self.values(frame_no)
+            annotation["points"] = {
+                key: round(value, 2) for key, value in zip(BBOX_KEYS, values)
+            }
+        elif self.kind == AnnotationTypes.POINT:
+            x, y = self.values(frame_no)
+            annotation["x"], annotation["y"] = round(x, 2), round(y, 2)
+        elif self.kind == AnnotationTypes.POLYGON:
+            annotation["points"] = list(self.values(frame_no))
+        elif self.data:
+            annotation["points"] = copy.copy(self.data["points"])
+        if self.attributes is not None:
+            annotation["attributes"] = (
+                copy.deepcopy(self.attributes) if self.attributes else []
+            )
+        annotation["keyframe"] = False
+        return annotation
+
+
+class _IntervalNode:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center: int, intervals: list):
+        self.center = center
+        self.by_start = sorted(intervals, key=lambda i: i.start)
+        self.by_end = sorted(intervals, key=lambda i: i.end, reverse=True)
+        self.left = None
+        self.right = None
+
+
+class IntervalIndex:
+    """
+    Static centered interval tree over objects with closed integer [start, end]
+    ranges. Point and range queries run in O(log n + k).
+    """
+
+    def __init__(self, intervals: Sequence):
+        self._root = self._build(list(intervals))
+        self._by_start = sorted(intervals, key=lambda i: i.start)
+        self._starts = [i.start for i in self._by_start]
+
+    @classmethod
+    def _build(cls, intervals: list) -> Optional[_IntervalNode]:
+        if not intervals:
+            return None
+        points = sorted(
+            itertools.chain.from_iterable((i.start, i.end) for i in intervals)
+        )
+        center = points[len(points) // 2]
+        left, right, overlapping = [], [], []
+        for interval in intervals:
+            if interval.end < center:
+                left.append(interval)
+            elif interval.start > center:
+                right.append(interval)
+            else:
+                overlapping.append(interval)
+        node = _IntervalNode(center, overlapping)
+        node.left = cls._build(left)
+        node.right = cls._build(right)
+        return node
+
+    def at(self, point: int) -> list:
+        """
+        Returns the intervals that contain the point.
+        """
+        found = []
+        node = self._root
+        while node:
+            if point < node.center:
+                for interval in node.by_start:
+                    if interval.start > point:
+                        break
+                    found.append(interval)
+                node = node.left
+            elif point > node.center:
+                for interval in node.by_end:
+                    if interval.end < point:
+                        break
+                    found.append(interval)
+                node = node.right
+            else:
+                found.extend(node.by_start)
+                break
+        return found
+
+    def overlap(self, start: int, end: int) -> list:
+        """
+        Returns the intervals that overlap [start, end].
+        """
+        found = self.at(start)
+        # the rest of the overlapping intervals start inside (start, end]
+        found.extend(
+            self._by_start[
+                bisect.bisect_right(self._starts, start) : bisect.bisect_right(
+                    self._starts, end
+                )
+            ]
+        )
+        return found
 
 
 class VideoFrameGenerator:
+    """
+    Generates per frame annotations of a video, the frames are yielded lazily as
+    plain dicts.
+    """
+
     def __init__(self, annotation_data: dict, fps: int):
-        self.id_generator = iter(itertools.count(0))
         self._annotation_data = annotation_data
         duration = annotation_data["metadata"]["duration"]
         duration = 0 if not duration else duration
         self.duration = duration / (1000 * 1000)
         self.fps = fps
         self.ratio = 1000 * 1000 / fps
-        self._frame_id = 1
         self.frames_count = int(math.ceil(self.duration * fps))
-        self.annotations: dict = {}
-        self._mapping = {}
+        self._segments: List[_Segment] = []
+        self._index = None
         self._process()
 
-    def get_frame(self, frame_no: int):
-        try:
-            return self.annotations[frame_no]
-        except KeyError:
-            self.annotations[frame_no] = FrameAnnotation(frame=frame_no)
-            return self.annotations[frame_no]
-
-    def _interpolate(
-        self,
-        class_name: str,
-        class_id: int,
-        from_frame: int,
-        to_frame: int,
-        data: dict,
-        instance_id: int,
-        steps: dict = None,
-        annotation_type: str = "bbox",
-    ) -> dict:
-        annotations = {}
-        for idx, frame_idx in enumerate(range(from_frame + 1, to_frame), 1):
-            tmp_data = {}
-            if annotation_type == AnnotationTypes.BBOX and data.get("points") and steps:
-                tmp_data["points"] = {
-                    "x1": round(data["points"]["x1"] + steps["x1"] * idx, 2),
-                    "y1": round(data["points"]["y1"] + steps["y1"] * idx, 2),
-                    "x2": round(data["points"]["x2"] + steps["x2"] * idx, 2),
-                    "y2": round(data["points"]["y2"] + steps["y2"] * idx, 2),
-                }
-            elif annotation_type == AnnotationTypes.POINT:
-                tmp_data = {
-                    "x": round(data["x"] + steps["x"] * idx, 2),
-                    "y": round(data["y"] + steps["y"] * idx, 2),
-                }
-            elif (
-                annotation_type != AnnotationTypes.EVENT
-            ):  # AnnotationTypes.POLYGON, AnnotationTypes.POLYLINE
-                tmp_data["points"] = []
-                for i in range(len(data["points"])):
-                    tmp_data["points"].append(data["points"][i] + idx * steps[i])
-
-            annotations[frame_idx] = Annotation(
-                instanceId=instance_id,
-                type=annotation_type,
-                className=class_name,
-                classId=class_id,
-                attributes=data.get("attributes"),
-                keyframe=False,
-                **tmp_data
-            )
-        return annotations
+    @property
+    def index(self) -> IntervalIndex:
+        if not self._index:
+            self._index = IntervalIndex(self._segments)
+        return self._index
+
+    def get_frame(self, frame_no: int) -> dict:
+        return {
+            "frame": frame_no,
+            "annotations": [
+                segment.annotation(frame_no)
+                for segment in sorted(self.index.at(frame_no))
+            ],
+        }
+
+    def get_frame_range(
+        self, start_frame: Optional[int] = None, end_frame: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Returns the first and the last frame of the range within the video, None
+        means from the first or up to the last frame.
+        """
+        start_frame = 1 if start_frame is None else max(start_frame, 1)
+        if end_frame is None:
+            end_frame = self.frames_count
+        return start_frame, min(end_frame, int(self.frames_count))
+
+    def get_frames(
+        self, start_frame: int = None, end_frame: int = None
+    ) -> Iterator[dict]:
+        """
+        Yields the frames from start_frame to end_frame inclusive, frames are
+        numbered from 1.
+        """
+        start_frame, end_frame = self.get_frame_range(start_frame, end_frame)
+        if start_frame > end_frame:
+            return
+        segments = sorted(
+            self.index.overlap(start_frame, end_frame),
+            key=lambda segment: (segment.start, segment.order),
+        )
+        yield from self._sweep(segments, start_frame, end_frame)
 
-    def _add_annotation(self, frame_no: int, annotation: Annotation):
+    def to_columns(
+        self, start_frame: int = None, end_frame: int = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns the annotations of the frames from start_frame to end_frame as
+        columns with one row per frame annotation, ordered as the frames
+        are yielded. Coordinates of the shapes an annotation doesn't have are NaN,
+        polygon and polyline points of row i are
+        points[pointsOffsets[i]:pointsOffsets[i + 1]].
+        """
+        start_frame, end_frame = self.get_frame_range(start_frame, end_frame)
+        segments = []
+        if start_frame <= end_frame:
+            segments = self.index.overlap(start_frame, end_frame)
+        columns = defaultdict(list)
+        types, type_counts = [], []
+        for segment in segments:
+            frames = np.arange(
+                max(segment.start, start_frame), min(segment.end, end_frame) + 1
+            )
+            count = len(frames)
+            class_id = segment.header.get("classId")
+            columns["frame"].append(frames)
+            columns["order"].append(np.full(count, segment.order))
+            columns["instanceId"].append(np.full(count, segment.header["instanceId"]))
+            columns["classId"].append(
+                np.full(count, -1 if class_id is None else class_id)
+            )
+            columns["keyframe"].append(np.full(count, segment.keyframe))
+            types.append(segment.header["type"])
+            type_counts.append(count)
+            bbox, point, polygon = segment.coordinates(frames)
+            for shape, size, name in (
+                (bbox, 4, "bbox"),
+                (point, 2, "point"),
+            ):
+                columns[name].append(
+                    np.full((count, size), np.nan) if shape is None else shape
+                )
+            if polygon is None:
+                columns["pointsCount"].append(np.zeros(count, dtype=np.int64))
+            else:
+                columns["pointsCount"].append(
+                    np.full(count, polygon.shape[1], dtype=np.int64)
+                )
+                columns["points"].append(polygon.ravel())
+        if not segments:
+            return {
+                "frame": np.empty(0, dtype=np.int64),
+                "instanceId": np.empty(0, dtype=np.int64),
+                "classId": np.empty(0, dtype=np.int64),
+                "type": np.empty(0, dtype=str),
+                "keyframe": np.empty(0, dtype=bool),
+                **{key: np.empty(0) for key in BBOX_KEYS + POINT_KEYS},
+                "pointsOffsets": np.zeros(1, dtype=np.int64),
+                "points": np.empty(0),
+            }
+        frames = np.concatenate(columns["frame"])
+        order = np.lexsort((np.concatenate(columns["order"]), frames))
+        bbox = np.concatenate(columns["bbox"])[order]
+        point = np.concatenate(columns["point"])[order]
+        # the ragged points are gathered in the new row order
+        points_count = np.concatenate(columns["pointsCount"])
+        points_starts = np.concatenate([[0], np.cumsum(points_count)[:-1]])[order]
+        points_count = points_count[order]
+        points_offsets = np.concatenate([[0], np.cumsum(points_count)])
+        points = np.concatenate(columns["points"]) if columns["points"] else np.empty(0)
+        points = points[
+            np.arange(points_offsets[-1])
+            - np.repeat(points_offsets[:-1], points_count)
+            + np.repeat(points_starts, points_count)
+        ]
+        return {
+            "frame": frames[order],
+            "instanceId": np.concatenate(columns["instanceId"])[order],
+            "classId": np.concatenate(columns["classId"])[order],
+            "type": np.repeat(np.array(types), type_counts)[order],
+            "keyframe": np.concatenate(columns["keyframe"])[order],
+            **{key: bbox[:, i] for i, key in enumerate(BBOX_KEYS)},
+            **{key: point[:, i] for i, key in enumerate(POINT_KEYS)},
+            "pointsOffsets": points_offsets,
+            "points": points,
+        }
 
-        frame = self.get_frame(frame_no)
-        frame.annotations.append(annotation)
+    def to_arrow(self, start_frame: int = None, end_frame: int = None):
+        """
+        Returns the columns of to_columns as a pyarrow Table, polygon and polyline
+        points are stored in a list column.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(
+                "To export video annotations to Arrow please install pyarrow package."
+            )
+        columns = self.to_columns(start_frame, end_frame)
+        points_offsets = columns.pop("pointsOffsets")
+        points = columns.pop("points")
+        arrays = {key: pa.array(value) for key, value in columns.items()}
+        arrays["type"] = arrays["type"].dictionary_encode()
+        arrays["points"] = pa.ListArray.from_arrays(
+            pa.array(points_offsets, type=pa.int32()), pa.array(points)
+        )
+        return pa.table(arrays)
 
     @staticmethod
     def pairwise(data: list):
@@ -130,133 +501,75 @@ class VideoFrameGenerator:
         finally:
             return frames_mapping
 
-    def _interpolate_frames(
-        self,
-        from_frame,
-        from_frame_no,
-        to_frame,
-        to_frame_no,
-        annotation_type,
-        class_name,
-        class_id,
-        instance_id,
-    ):
-        steps = None
-        frames_diff = to_frame_no - from_frame_no
-        if (
-            annotation_type == AnnotationTypes.BBOX
-            and from_frame.get("points")
-            and to_frame.get("points")
-        ):
-            steps = {}
-            for point in "x1", "x2", "y1", "y2":
-                steps[point] = round(
-                    (to_frame["points"][point] - from_frame["points"][point])
-                    / frames_diff,
-                    2,
-                )
-        elif annotation_type == AnnotationTypes.POINT:
-            steps = {
-                "x": (to_frame["x"] - from_frame["x"]) / frames_diff,
-                "y": (to_frame["y"] - from_frame["y"]) / frames_diff,
-            }
-        elif annotation_type in (AnnotationTypes.POLYGON, AnnotationTypes.POLYLINE):
-            if len(from_frame["points"]) == len(to_frame["points"]):
-                steps = [
-                    (to_point - from_point) / frames_diff
-                    for from_point, to_point in zip(
-                        from_frame["points"], to_frame["points"]
-                    )
-                ]
-            else:
-                steps = [0] * len(from_frame["points"])
-
-        return self._interpolate(
-            class_name=class_name,
-            class_id=class_id,
-            from_frame=from_frame_no,
-            to_frame=to_frame_no,
-            data=from_frame,
-            instance_id=instance_id,
-            steps=steps,
-            annotation_type=annotation_type,
-        )
+    @staticmethod
+    def _get_header(
+        instance_id: int, annotation_type: str, class_name: str, class_id: int
+    ) -> dict:
+        header = {"instanceId": instance_id, "type": annotation_type}
+        if class_name is not None:
+            header["className"] = class_name
+        if class_id is not None:
+            header["classId"] = class_id
+        return header
 
     def _process(self):
-        for instance in self._annotation_data["instances"]:
-            instance_id = next(self.id_generator)
+        order = itertools.count()
+        for instance_id, instance in enumerate(self._annotation_data["instances"]):
             annotation_type = instance["meta"]["type"]
             if annotation_type == "comment":
                 continue
-            class_name = instance["meta"].get("className")
-            class_id = instance["meta"].get("classId", -1)
+            header = self._get_header(
+                instance_id,
+                annotation_type,
+                instance["meta"].get("className"),
+                instance["meta"].get("classId", -1),
+            )
             for parameter in instance.get("parameters", []):
+                parameter_order = next(order)
                 frames_mapping = defaultdict(list)
-                interpolated_frames = {}
                 for timestamp in parameter["timestamps"]:
                     frames_mapping[
                         int(math.ceil(timestamp["timestamp"] / self.ratio))
                     ].append(timestamp)
                 frames_mapping = self.merge_first_frame(frames_mapping)
-
-                for from_frame_no, to_frame_no in self.pairwise(sorted(frames_mapping)):
-                    last_frame_no = to_frame_no
-                    from_frame, to_frame = (
-                        frames_mapping[from_frame_no][-1],
-                        frames_mapping[to_frame_no][0],
-                    )
-                    frames_diff = to_frame_no - from_frame_no
-                    if frames_diff > 1:
-                        interpolated_frames.update(
-                            self._interpolate_frames(
-                                from_frame=from_frame,
-                                from_frame_no=from_frame_no,
-                                to_frame=to_frame,
-                                to_frame_no=to_frame_no,
-                                class_name=class_name,
-                                class_id=class_id,
-                                annotation_type=annotation_type,
-                                instance_id=instance_id,
+                frame_numbers = sorted(frames_mapping)
+                for from_frame_no, to_frame_no in self.pairwise(frame_numbers):
+                    if to_frame_no - from_frame_no > 1:
+                        self._segments.append(
+                            _Segment.from_keyframes(
+                                parameter_order,
+                                from_frame_no,
+                                to_frame_no,
+                                header,
+                                from_frame=frames_mapping[from_frame_no][-1],
+                                to_frame=frames_mapping[to_frame_no][0],
                             )
                         )
-
-                    start_median_frame = self.get_median(frames_mapping[from_frame_no])
-                    end_median_frame = self.get_median(frames_mapping[to_frame_no])
-                    for frame_no, frame in (
-                        (from_frame_no, start_median_frame),
-                        (last_frame_no, end_median_frame),
-                    ):
-                        interpolated_frames[frame_no] = Annotation(
-                            instanceId=instance_id,
-                            type=annotation_type,
-                            className=class_name,
-                            classId=class_id,
-                            x=frame.get("x"),
-                            y=frame.get("y"),
-                            points=frame.get("points"),
-                            attributes=frame.get("attributes"),
-                            keyframe=True,
+                for frame_no in frame_numbers:
+                    self._segments.append(
+                        _Segment.from_keyframe(
+                            parameter_order,
+                            frame_no,
+                            header,
+                            self.get_median(frames_mapping[frame_no]),
                         )
-                if frames_mapping and not interpolated_frames:
-                    key = set(frames_mapping.keys()).pop()
-                    median = self.get_median(frames_mapping[key])
-
-                    interpolated_frames[key] = Annotation(
-                        instanceId=instance_id,
-                        type=annotation_type,
-                        className=class_name,
-                        classId=class_id,
-                        x=median.get("x"),
-                        y=median.get("y"),
-                        points=median.get("points"),
-                        attributes=median["attributes"],
-                        keyframe=True,
                     )
+        self._segments.sort(key=lambda segment: (segment.start, segment.order))
 
-                for frame_no, annotation in interpolated_frames.items():
-                    self._add_annotation(frame_no, annotation)
+    @staticmethod
+    def _sweep(segments: List[_Segment], start_frame: int, end_frame: int):
+        segments = iter(segments)
+        segment = next(segments, None)
+        active: List[_Segment] = []
+        for frame_no in range(start_frame, end_frame + 1):
+            while segment and segment.start <= frame_no:
+                bisect.insort(active, segment)
+                segment = next(segments, None)
+            yield {
+                "frame": frame_no,
+                "annotations": [i.annotation(frame_no) for i in active],
+            }
+            active = [i for i in active if i.end > frame_no]
 
-    def __iter__(self):
-        for frame_no in range(1, int(self.frames_count) + 1):
-            frame = self.get_frame(frame_no)
-            yield {**frame.dict(exclude_unset=True), **frame.dict(exclude_none=True)}
+    def __iter__(self) -> Iterator[dict]:
+        yield from self._sweep(self._segments, 1, int(self.frames_count))
@@ -986,6 +986,7 @@ class Controller(BaseController):
         recursive_sub_folders: Optional[bool] = None,
         image_quality_in_editor: str = None,
         from_s3_bucket=None,
+        duplicate_check: str = "name",
     ):
         project = self.get_project(project_name)
         folder = self.get_folder(project, folder_name)
@@ -1002,6 +1003,7 @@ class Controller(BaseController):
             exclude_file_patterns=exclude_file_patterns,
             recursive_sub_folders=recursive_sub_folders,
             image_quality_in_editor=image_quality_in_editor,
+            duplicate_check=duplicate_check,
         )
 
     def prepare_export(
@@ -1196,7 +1198,14 @@ class Controller(BaseController):
         return use_case.execute()
 
     def get_annotations_per_frame(
-        self, project_name: str, folder_name: str, video_name: str, fps: int
+        self,
+        project_name: str,
+        folder_name: str,
+        video_name: str,
+        fps: int,
+        start_frame: Optional[int] = None,
+        end_frame: Optional[int] = None,
+        output: str = "dict",
     ):
         project = self.get_project(project_name)
         folder = self.get_folder(project, folder_name)
@@ -1209,6 +1218,9 @@ class Controller(BaseController):
             video_name=video_name,
             fps=fps,
             service_provider=self.service_provider,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            output=output,
         )
         return use_case.execute()
 
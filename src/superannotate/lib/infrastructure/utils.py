@@ -1,17 +1,94 @@
+import concurrent.futures
+import logging
+import os
 from itertools import islice
 from pathlib import Path
+from typing import Iterator
+from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import Union
 
 from superannotate.lib.app.exceptions import PathError
 
+logger = logging.getLogger("sa")
+
 
 def divide_to_chunks(it, size):
     it = iter(it)
     return iter(lambda: tuple(islice(it, size)), ())
 
 
+def _scan_dir(
+    path: str, suffixes: Optional[Tuple[str, ...]]
+) -> Tuple[List[str], List[str]]:
+    files, folders = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    folders.append(entry.path)
+                elif (
+                    not suffixes or entry.name.endswith(suffixes)
+                ) and entry.is_file():
+                    files.append(entry.path)
+    except OSError as e:
+        logger.warning(f"Couldn't read the {path} directory: {e}")
+    return files, folders
+
+
+def iter_files(
+    path: Union[str, Path],
+    suffixes: Union[str, Tuple[str, ...]] = None,
+    recursive: bool = False,
+    max_workers: int = None,
+) -> Iterator[str]:
+    """
+    Yields paths of the files in the directory that end with one of the suffixes.
+    The cached os.DirEntry type info is used, so the files are not stat-ed again.
+    With max_workers sub directories are scanned in parallel threads and the
+    order of the results is not deterministic. Symlinked directories are followed,
+    a directory already scanned through another path is skipped, so links can't
+    make the scan loop.
+    """
+    if isinstance(suffixes, str):
+        suffixes = (suffixes,)
+    elif suffixes is not None:
+        suffixes = tuple(suffixes)
+    visited = {os.path.realpath(path)}
+
+    def not_visited(folders: List[str]) -> List[str]:
+        new_folders = []
+        for folder in folders:
+            real_path = os.path.realpath(folder)
+            if real_path not in visited:
+                visited.add(real_path)
+                new_folders.append(folder)
+        return new_folders
+
+    if not max_workers or not recursive:
+        folders = [str(path)]
+        while folders:
+            files, sub_folders = _scan_dir(folders.pop(), suffixes)
+            yield from files
+            if recursive:
+                folders.extend(reversed(not_visited(sub_folders)))
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan_dir, str(path), suffixes)}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                files, sub_folders = future.result()
+                yield from files
+                pending.update(
+                    executor.submit(_scan_dir, folder, suffixes)
+                    for folder in not_visited(sub_folders)
+                )
+
+
 def split_project_path(project_path: str) -> Tuple[str, Optional[str]]:
     path = Path(project_path)
     if len(path.parts) > 3:
@@ -0,0 +1,53 @@
+"""
+Measures aggregate_annotations_as_df on a synthetic export made of copies of the
+sample vector and video projects.
+
+    python -m tests.benchmarks.bench_aggregators [items_count]
+"""
+
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.superannotate.lib.app.analytics.aggregators import DataAggregator
+from tests import DATA_SET_PATH
+
+PROJECTS = (
+    ("Vector", "sample_project_vector", "___objects.json"),
+    ("Video", "video_df_data", ".json"),
+)
+
+
+def create_export(root: Path, project: str, suffix: str, items_count: int):
+    source = DATA_SET_PATH / project
+    shutil.copytree(source / "classes", root / "classes")
+    annotations = sorted(source.glob(f"*{suffix}"))
+    for folder_id in range(4):
+        folder = root / f"folder_{folder_id}"
+        folder.mkdir()
+        for i in range(folder_id, items_count, 4):
+            annotation = annotations[i % len(annotations)]
+            shutil.copy(annotation, folder / f"{i}_{annotation.name}")
+
+
+def measure(project_type: str, project: str, suffix: str, items_count: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        create_export(Path(temp_dir), project, suffix, items_count)
+        start = time.perf_counter()
+        df = DataAggregator(project_type, temp_dir).aggregate_annotations_as_df()
+        duration = time.perf_counter() - start
+    memory = df.memory_usage(deep=True).sum() / 2**20
+    print(
+        f"{project_type} {items_count} items: {len(df)} rows in {duration:.2f}s, "
+        f"{memory:.0f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    logging.getLogger("sa").setLevel(logging.ERROR)
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for args in PROJECTS:
+        measure(*args, items)
@@ -0,0 +1,49 @@
+"""
+Measures the export of a large vector project to COCO instance segmentation
+with one conversion worker and with a worker per core.
+
+    python -m tests.benchmarks.bench_coco_conversion [images_count]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import src.superannotate.lib.app.common as common
+from src.superannotate import export_annotation
+
+SAMPLE_PROJECT = Path("tests/integration/convertors/data_set/sample_project_vector")
+
+
+def make_project(path: Path, count: int):
+    shutil.copytree(SAMPLE_PROJECT / "classes", path / "classes")
+    samples = [json.loads(p.read_text()) for p in SAMPLE_PROJECT.glob("*.jpg.json")]
+    for i in range(count):
+        annotation = samples[i % len(samples)]
+        annotation["metadata"]["name"] = f"image_{i}.jpg"
+        (path / f"image_{i}.jpg.json").write_text(json.dumps(annotation))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project = Path(tmp_dir) / "project"
+        make_project(project, count)
+        for workers in sorted({1, os.cpu_count() or 1}):
+            common.CONVERSION_WORKERS = workers
+            start = time.perf_counter()
+            export_annotation(
+                str(project),
+                str(Path(tmp_dir) / f"output_{workers}"),
+                "COCO",
+                "dataset",
+                "Vector",
+                "instance_segmentation",
+            )
+            print(
+                f"export {count} images with {workers} workers: "
+                f"{time.perf_counter() - start:.2f}s"
+            )
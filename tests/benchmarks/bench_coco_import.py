@@ -0,0 +1,67 @@
+"""
+Measures the time and the peak memory of importing a large COCO object detection
+dataset.
+
+    python -m tests.benchmarks.bench_coco_import [images_count] [annotations_per_image]
+"""
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.superannotate import import_annotation
+
+
+def make_coco_json(path: Path, images_count: int, annotations_per_image: int):
+    with open(path, "w") as fp:
+        fp.write('{"categories": [{"id": 1, "name": "car"}], "images": [')
+        fp.write(
+            ", ".join(
+                json.dumps(
+                    {"id": i, "file_name": f"{i}.jpg", "height": 1080, "width": 1920}
+                )
+                for i in range(images_count)
+            )
+        )
+        fp.write('], "annotations": [')
+        for i in range(images_count * annotations_per_image):
+            if i:
+                fp.write(", ")
+            annotation = {
+                "id": i,
+                "image_id": i % images_count,
+                "category_id": 1,
+                "bbox": [i % 1000, i % 500, 40.5, 30.25],
+                "area": 1215.0,
+                "iscrowd": 0,
+                "segmentation": [[0, 0, 0, 30.25, 40.5, 30.25, 40.5, 0]],
+            }
+            fp.write(json.dumps(annotation))
+        fp.write("]}")
+
+
+if __name__ == "__main__":
+    images_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    annotations_per_image = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        coco_path = Path(tmp_dir) / "input" / "dataset.json"
+        coco_path.parent.mkdir()
+        make_coco_json(coco_path, images_count, annotations_per_image)
+        start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        import_annotation(
+            str(coco_path.parent),
+            str(Path(tmp_dir) / "output"),
+            "COCO",
+            "dataset",
+            "Vector",
+            "object_detection",
+        )
+        memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_memory
+        print(
+            f"import {coco_path.stat().st_size / 1024 ** 2:.0f} MB: "
+            f"{time.perf_counter() - start:.2f}s, "
+            f"peak memory increase {memory / 1024:.0f} MB"
+        )
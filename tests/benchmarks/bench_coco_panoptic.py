@@ -0,0 +1,49 @@
+"""
+Measures the import of COCO panoptic masks with many segments to SA pixel masks.
+
+    python -m tests.benchmarks.bench_coco_panoptic [segments_count] [masks_count]
+"""
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from src.superannotate.lib.app.common import id2rgb
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_to_sa_pixel import (
+    _panoptic_annotation_to_sa_pixel,
+)
+
+
+def make_mask(path: Path, segment_ids, height: int = 1080, width: int = 1920):
+    random = np.random.default_rng(0)
+    # square blocks of random segments
+    blocks = random.choice(segment_ids, (height // 40 + 1, width // 40 + 1))
+    ids = np.kron(blocks, np.ones((40, 40), dtype=blocks.dtype))[:height, :width]
+    cv2.imwrite(str(path), id2rgb(ids)[..., ::-1])
+
+
+if __name__ == "__main__":
+    segments_count = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    masks_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    segment_ids = np.arange(1, segments_count + 1) * 4099
+    segments = [{"id": int(id_), "category_id": 1} for id_ in segment_ids]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_dir = Path(tmp_dir)
+        make_mask(output_dir / "mask.png", segment_ids)
+        elapsed = 0
+        for i in range(masks_count):
+            shutil.copy(output_dir / "mask.png", output_dir / f"{i}.png")
+            start = time.perf_counter()
+            _panoptic_annotation_to_sa_pixel(
+                {1: "class"},
+                output_dir,
+                (
+                    {"file_name": f"{i}.png", "segments_info": segments},
+                    {"width": 1920, "height": 1080},
+                ),
+            )
+            elapsed += time.perf_counter() - start
+        print(f"{masks_count} masks with {segments_count} segments: {elapsed:.2f}s")
@@ -0,0 +1,41 @@
+"""
+Measures COCO compressed RLE encoding and decoding of large noisy masks.
+
+    python -m tests.benchmarks.bench_coco_rle [masks_count]
+"""
+
+import sys
+import time
+
+import numpy as np
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_api import (
+    decode,
+)
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_api import (
+    encode,
+)
+
+
+def get_masks(count: int, height: int = 1080, width: int = 1920):
+    random = np.random.default_rng(0)
+    masks = []
+    for _ in range(count):
+        mask = np.zeros((height, width), dtype=np.uint8)
+        y, x = random.integers(0, height // 2), random.integers(0, width // 2)
+        mask[y : y + height // 2, x : x + width // 2] = 1  # noqa: E203
+        # ragged edges give every column several runs
+        mask[random.random((height, width)) < 0.01] ^= 1
+        masks.append(mask)
+    return masks
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    masks = get_masks(count)
+    start = time.perf_counter()
+    encoded = [encode(mask) for mask in masks]
+    print(f"encode {count} masks: {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    for rle in encoded:
+        decode(rle)
+    print(f"decode {count} masks: {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,65 @@
+"""
+Measures consensus on a crowded synthetic image annotated in three folders.
+
+    python -m tests.benchmarks.bench_consensus [instances_count]
+"""
+
+import math
+import random
+import sys
+import time
+
+import pandas as pd
+from src.superannotate.lib.app.analytics.common import consensus
+
+FOLDERS = ("folder_1", "folder_2", "folder_3")
+
+
+def get_image_df(annot_type: str, instances_count: int, size: int = 2000):
+    random.seed(0)
+    instances = [
+        (
+            random.random() * size,
+            random.random() * size,
+            random.random() * 40 + 5,
+            random.random() * 40 + 5,
+            random.choice(("car", "person", "tree")),
+        )
+        for _ in range(instances_count)
+    ]
+    rows = []
+    for folder in FOLDERS:
+        for x, y, width, height, class_name in instances:
+            x, y = x + random.gauss(0, 2), y + random.gauss(0, 2)
+            if annot_type == "bbox":
+                meta = {"x1": x, "y1": y, "x2": x + width, "y2": y + height}
+            elif annot_type == "point":
+                meta = {"x": x, "y": y}
+            else:
+                meta = []
+                for i in range(8):
+                    angle = 2 * math.pi * i / 8
+                    meta += [x + width * math.cos(angle), y + height * math.sin(angle)]
+            rows.append(
+                {
+                    "itemName": "image.jpg",
+                    "folderName": folder,
+                    "meta": meta,
+                    "className": class_name,
+                    "creatorEmail": f"{folder}@example.com",
+                    "attributes": None,
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for annotation_type in ("bbox", "polygon", "point"):
+        df = get_image_df(annotation_type, count)
+        start = time.perf_counter()
+        consensus(df, "image.jpg", annotation_type)
+        print(
+            f"{annotation_type} {len(df)} instances: "
+            f"{time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,58 @@
+"""
+Measures the conversion of a pixel project with many instance parts to vector.
+
+    python -m tests.benchmarks.bench_pixel_to_vector [images_count] [parts_count]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from src.superannotate import convert_project_type
+from src.superannotate.lib.app.common import blue_color_generator
+from src.superannotate.lib.app.common import hex_to_rgb
+from src.superannotate.lib.app.common import rgb2id
+
+
+def make_project(path: Path, images_count: int, parts_count: int):
+    (path / "classes").mkdir(parents=True)
+    (path / "classes" / "classes.json").write_text("[]")
+    random = np.random.default_rng(0)
+    hex_colors = blue_color_generator(parts_count)
+    mask = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    for hex_color in hex_colors:
+        x, y = random.integers(0, 1920), random.integers(0, 1080)
+        radius = int(random.integers(10, 80))
+        color = tuple(int(value) for value in hex_to_rgb(hex_color)[::-1])
+        cv2.circle(mask, (int(x), int(y)), radius, color, -1)
+    # the circles drawn over entirely have no instances
+    present_ids = set(np.unique(rgb2id(mask[..., ::-1])).tolist())
+    instances = [
+        {"className": "class", "parts": [{"color": hex_color}]}
+        for hex_color in hex_colors
+        if int(rgb2id(np.array(hex_to_rgb(hex_color)))) in present_ids
+    ]
+    for i in range(images_count):
+        cv2.imwrite(str(path / f"{i}.jpg"), mask)
+        cv2.imwrite(str(path / f"{i}.jpg___save.png"), mask)
+        (path / f"{i}.jpg___pixel.json").write_text(
+            json.dumps({"metadata": {"name": f"{i}.jpg"}, "instances": instances})
+        )
+
+
+if __name__ == "__main__":
+    images_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    parts_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        make_project(Path(tmp_dir) / "input", images_count, parts_count)
+        start = time.perf_counter()
+        convert_project_type(
+            str(Path(tmp_dir) / "input"), str(Path(tmp_dir) / "output"), "Vector"
+        )
+        print(
+            f"convert {images_count} images with {parts_count} parts: "
+            f"{time.perf_counter() - start:.2f}s"
+        )
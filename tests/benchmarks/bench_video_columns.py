@@ -0,0 +1,65 @@
+"""
+Compares building per frame video annotations as dicts with the columnar export.
+
+    python -m tests.benchmarks.bench_video_columns
+"""
+
+import json
+import os
+import random
+import time
+
+from src.superannotate.lib.core.video_convertor import VideoFrameGenerator
+from tests import DATA_SET_PATH
+
+FIXTURES = (
+    os.path.join(DATA_SET_PATH, "unit", "video_annotation.json"),
+    os.path.join(DATA_SET_PATH, "unit", "annotation_5_frame.json"),
+)
+
+
+def get_synthetic_annotation(duration: int = 600, instances_count: int = 300):
+    random.seed(0)
+    duration = duration * 10**6
+    instances = []
+    for _ in range(instances_count):
+        annotation_type = random.choice(["bbox", "point", "polygon"])
+        timestamps = []
+        for timestamp in sorted(random.sample(range(0, duration, 10**5), 6)):
+            if annotation_type == "bbox":
+                x, y = random.random() * 100, random.random() * 100
+                data = {"points": {"x1": x, "y1": y, "x2": x + 50, "y2": y + 50}}
+            elif annotation_type == "point":
+                data = {"x": random.random() * 100, "y": random.random() * 100}
+            else:
+                data = {"points": [random.random() * 100 for _ in range(16)]}
+            timestamps.append({"timestamp": timestamp, "attributes": [], **data})
+        instances.append(
+            {
+                "meta": {"type": annotation_type, "classId": 1, "className": "c"},
+                "parameters": [{"timestamps": timestamps}],
+            }
+        )
+    return {"metadata": {"duration": duration}, "instances": instances}
+
+
+def measure(name: str, annotation: dict, fps: int):
+    start = time.perf_counter()
+    generator = VideoFrameGenerator(annotation, fps)
+    rows = sum(len(frame["annotations"]) for frame in generator)
+    dicts_time = time.perf_counter() - start
+    start = time.perf_counter()
+    columns = VideoFrameGenerator(annotation, fps).to_columns()
+    columns_time = time.perf_counter() - start
+    assert rows == len(columns["frame"])
+    print(
+        f"{name} fps={fps}: {rows} rows, dicts {dicts_time:.3f}s, "
+        f"columns {columns_time:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    for path in FIXTURES:
+        with open(path) as file:
+            measure(os.path.basename(path), json.load(file), 30)
+    measure("synthetic 10 min", get_synthetic_annotation(), 30)
@@ -0,0 +1,243 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from src.superannotate.lib.app.analytics.aggregators import ColumnsBuilder
+from src.superannotate.lib.app.analytics.aggregators import DataAggregator
+from tests import DATA_SET_PATH
+
+
+class TestColumnsBuilder(TestCase):
+    def test_to_df(self):
+        builder = ColumnsBuilder(["itemName", "className", "meta"])
+        builder.append({"itemName": "a", "meta": [1, 2]})
+        builder.append({"itemName": "b", "className": "c"})
+        builder.append({})
+        df = builder.to_df()
+        self.assertEqual(list(df.itemName), ["a", "b", None])
+        self.assertEqual(list(df.meta), [[1, 2], None, None])
+        self.assertEqual(list(df.className), [None, "c", None])
+        self.assertTrue(all(dtype == object for dtype in df.dtypes))
+
+    def test_added_columns(self):
+        builder = ColumnsBuilder(["itemName"])
+        builder.append({"itemName": "a"})
+        builder.append({"itemName": "b", "tagId": 0, "tag": None})
+        other = ColumnsBuilder(["itemName"])
+        other.append({"itemName": "c", "instanceId": 1})
+        builder.extend(other)
+        df = builder.to_df()
+        self.assertEqual(list(df.columns), ["itemName", "tagId", "tag", "instanceId"])
+        self.assertEqual(list(df.tagId), [None, 0, None])
+        self.assertEqual(list(df.tag), [None, None, None])
+        self.assertEqual(list(df.instanceId), [None, None, 1])
+
+
+IMAGE_COLUMNS = [
+    "itemName",
+    "itemHeight",
+    "itemWidth",
+    "itemStatus",
+    "itemPinned",
+    "instanceId",
+    "className",
+    "attributeGroupName",
+    "attributeName",
+    "type",
+    "error",
+    "locked",
+    "visible",
+    "trackingId",
+    "probability",
+    "pointLabels",
+    "meta",
+    "classColor",
+    "groupId",
+    "createdAt",
+    "creatorRole",
+    "creationType",
+    "creatorEmail",
+    "updatedAt",
+    "updatorRole",
+    "updatorEmail",
+    "folderName",
+    "itemAnnotator",
+    "itemQA",
+    "commentResolved",
+    "tag",
+]
+
+
+class TestDataAggregator(TestCase):
+    def test_columns(self):
+        for project_type, path, columns in (
+            # has comments and tags
+            ("Vector", "sample_project_vector", [*IMAGE_COLUMNS, "tagId", "rag"]),
+            ("Vector", "sample_vector_annotations_with_NaN", IMAGE_COLUMNS),
+            ("Pixel", "sample_project_pixel", IMAGE_COLUMNS),
+            (
+                "Document",
+                "document_df_data",
+                [
+                    "itemName",
+                    "folderName",
+                    "itemStatus",
+                    "itemURL",
+                    "itemAnnotator",
+                    "itemQA",
+                    "tagId",
+                    "tag",
+                    "instanceId",
+                    "instanceStart",
+                    "instanceEnd",
+                    "type",
+                    "className",
+                    "createdAt",
+                    "createdBy",
+                    "creatorRole",
+                    "updatedAt",
+                    "updatedBy",
+                    "updatorRole",
+                ],
+            ),
+        ):
+            df = DataAggregator(
+                project_type, DATA_SET_PATH / path
+            ).aggregate_annotations_as_df()
+            self.assertEqual(list(df.columns), columns)
+
+    def test_video_data_filling(self):
+        df = DataAggregator(
+            "Video", DATA_SET_PATH / "video_df_data"
+        ).aggregate_annotations_as_df()
+        self.assertEqual(len(df), 66)
+        self.assertEqual({i for i in df.instanceId if i is not None}, {0, 1, 2, 3, 4})
+        self.assertEqual({i for i in df.tagId if i is not None}, {0, 1, 2, 3})
+        self.assertEqual(
+            {i for i in df.timestampId if i is not None}, {0, 1, 2, 3, 4, 5, 6}
+        )
+        self.assertEqual(set(df.folderName), {"folder", None})
+        self.assertEqual(df.className.dtype, object)
+
+    def test_document_data_filling(self):
+        df = DataAggregator(
+            "Document", DATA_SET_PATH / "document_df_data", folder_names=["folder"]
+        ).aggregate_annotations_as_df()
+        self.assertEqual({i for i in df.instanceId if i is not None}, {0, 1})
+        self.assertEqual({i for i in df.tagId if i is not None}, {0, 1})
+        self.assertEqual(set(df.folderName), {"folder"})
+
+    def test_image_data_filling(self):
+        df = DataAggregator(
+            "Vector", DATA_SET_PATH / "sample_project_vector"
+        ).aggregate_annotations_as_df()
+        self.assertEqual(len(df), 81)
+        self.assertEqual(df.probability.dtype, float)
+        self.assertEqual(set(df.tag.dropna()), {"tag1", "tag2", "tag3"})
+        self.assertEqual(set(df.rag.dropna()), {"tag1", "tag2", "tag3"})
+        self.assertEqual(df.className.dtype, object)
+        self.assertIn(None, set(df.className))
+        instances = df[df.instanceId.notna()]
+        self.assertEqual(
+            len(instances[~instances.duplicated(["instanceId", "itemName"])]), 73
+        )
+
+    def test_image_timestamps(self):
+        df = DataAggregator(
+            "Vector", DATA_SET_PATH / "sample_explore_export"
+        ).aggregate_annotations_as_df()
+        self.assertEqual(df.createdAt.dtype, object)
+        timestamps = [value for value in df.createdAt if value is not None]
+        self.assertTrue(timestamps)
+        self.assertTrue(all(isinstance(value, pd.Timestamp) for value in timestamps))
+        self.assertEqual({str(value.tz) for value in timestamps}, {"UTC"})
+
+    def test_parallel_chunks(self):
+        for project_type, path in (
+            ("Vector", "sample_project_vector"),
+            ("Video", "video_df_data"),
+        ):
+            aggregator = DataAggregator(project_type, DATA_SET_PATH / path)
+            with patch.object(DataAggregator, "MAX_WORKERS", 1):
+                expected = aggregator.aggregate_annotations_as_df()
+            with patch.object(DataAggregator, "MAX_WORKERS", 2), patch.object(
+                DataAggregator, "CHUNK_SIZE", 1
+            ):
+                df = aggregator.aggregate_annotations_as_df()
+            pd.testing.assert_frame_equal(df, expected)
+
+    def test_chunks_are_aggregated_in_process_by_default(self):
+        aggregator = DataAggregator("Video", DATA_SET_PATH / "video_df_data")
+        with patch.object(DataAggregator, "CHUNK_SIZE", 1), patch(
+            "src.superannotate.lib.app.analytics.aggregators.concurrent.futures.ProcessPoolExecutor"
+        ) as executor:
+            df = aggregator.aggregate_annotations_as_df()
+        executor.assert_not_called()
+        self.assertEqual(len(df), 66)
+
+    def test_iter_aggregated_chunks(self):
+        aggregator = DataAggregator("Video", DATA_SET_PATH / "video_df_data")
+        expected = aggregator.aggregate_annotations_as_df()
+        with patch.object(DataAggregator, "CHUNK_SIZE", 1):
+            chunks = list(aggregator.iter_aggregated_chunks(chunk_rows=10))
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+        df = pd.concat(chunks)
+        self.assertEqual(list(df.index), list(expected.index))
+        self.assertTrue(df.astype(str).equals(expected.astype(str)))
+
+    def test_image_chunk_columns(self):
+        for project_type, path in (
+            ("Vector", "sample_project_vector"),
+            ("Pixel", "sample_project_pixel"),
+        ):
+            aggregator = DataAggregator(project_type, DATA_SET_PATH / path)
+            expected = aggregator.aggregate_annotations_as_df()
+            chunks = list(aggregator.iter_aggregated_chunks(chunk_rows=10))
+            for chunk in chunks:
+                self.assertTrue(set(chunk.columns) <= set(expected.columns))
+                self.assertTrue(set(IMAGE_COLUMNS) <= set(chunk.columns))
+            df = pd.concat(chunks)
+            self.assertEqual(list(df.columns), list(expected.columns))
+            # concat fills the columns missing in a chunk with NaN
+            df = df.where(df.notna(), None)
+            self.assertTrue(df.astype(str).equals(expected.astype(str)))
+
+    def test_parquet_output(self):
+        pa = pytest.importorskip("pyarrow")
+        dataset = pytest.importorskip("pyarrow.dataset")
+        aggregator = DataAggregator("Video", DATA_SET_PATH / "video_df_data")
+        expected = aggregator.aggregate_annotations_as_df()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "annotations"
+            aggregator.aggregate_annotations(output="parquet", path=path, chunk_rows=10)
+            table = dataset.dataset(
+                path,
+                partitioning=dataset.partitioning(
+                    pa.schema([("folderName", pa.string())]), flavor="hive"
+                ),
+            ).to_table()
+        self.assertEqual(table.num_rows, len(expected))
+        self.assertEqual(
+            sorted(table.column("folderName").to_pylist()),
+            sorted(i or "root" for i in expected.folderName),
+        )
+        self.assertEqual(
+            sorted(i for i in table.column("instanceId").to_pylist() if i is not None),
+            sorted(i for i in expected.instanceId if i is not None),
+        )
+
+    def test_parquet_output_of_project_root(self):
+        pytest.importorskip("pyarrow")
+        aggregator = DataAggregator("Pixel", DATA_SET_PATH / "sample_project_pixel")
+        expected = aggregator.aggregate_annotations_as_df()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "annotations"
+            aggregator.aggregate_annotations(output="parquet", path=path, chunk_rows=10)
+            df = pd.read_parquet(path)
+        self.assertEqual(len(df), len(expected))
+        self.assertEqual(set(df.folderName), {"root"})
+        self.assertEqual(set(df.columns), {*IMAGE_COLUMNS, "tagId", "rag"})
+        self.assertEqual(sorted(df.itemName), sorted(expected.itemName))
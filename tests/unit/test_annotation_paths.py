@@ -0,0 +1,236 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from src.superannotate.lib.app.helpers import get_annotation_paths
+from src.superannotate.lib.app.helpers import S3_LIST_WORKERS
+from src.superannotate.lib.app.helpers import iter_s3_annotation_paths
+from src.superannotate.lib.infrastructure.utils import iter_files
+
+
+class FakePaginator:
+    def __init__(self, keys):
+        self._keys = keys
+        self.prefixes = []
+
+    def paginate(self, Bucket, Prefix, Delimiter):  # noqa
+        self.prefixes.append(Prefix)
+        contents, prefixes = [], set()
+        for key in self._keys:
+            if not key.startswith(Prefix):
+                continue
+            rest = key[len(Prefix) :]  # noqa: E203
+            if Delimiter in rest:
+                prefixes.add(Prefix + rest.split(Delimiter)[0] + Delimiter)
+            else:
+                contents.append({"Key": key})
+        yield {
+            "Contents": contents,
+            "CommonPrefixes": [{"Prefix": i} for i in sorted(prefixes)],
+        }
+
+
+class TestS3AnnotationPaths(TestCase):
+    KEYS = [
+        "annotations/a.jpg.json",
+        "annotations/a.jpg",
+        "annotations/b.jpg___objects.json",
+        "annotations/sub/c.jpg___pixel.json",
+        "annotations/sub/c.jpg___save.png",
+        "annotations/sub/deep/d.mp4.json",
+        "annotations_other/e.jpg.json",
+    ]
+
+    def _get_paths(self, recursive):
+        paginator = FakePaginator(self.KEYS)
+        client = MagicMock()
+        client.get_paginator.return_value = paginator
+        with patch(
+            "src.superannotate.lib.app.helpers.S3_CLIENTS.get_client",
+            return_value=client,
+        ):
+            paths = get_annotation_paths("annotations", "bucket", recursive)
+        return paths, paginator.prefixes
+
+    def test_non_recursive(self):
+        paths, prefixes = self._get_paths(recursive=False)
+        self.assertEqual(
+            sorted(paths),
+            ["annotations/a.jpg.json", "annotations/b.jpg___objects.json"],
+        )
+        self.assertEqual(prefixes, ["annotations/"])
+
+    def test_recursive_lists_each_prefix_once(self):
+        paths, prefixes = self._get_paths(recursive=True)
+        self.assertEqual(
+            sorted(paths),
+            [
+                "annotations/a.jpg.json",
+                "annotations/b.jpg___objects.json",
+                "annotations/sub/c.jpg___pixel.json",
+                "annotations/sub/deep/d.mp4.json",
+            ],
+        )
+        self.assertEqual(
+            sorted(prefixes),
+            ["annotations/", "annotations/sub/", "annotations/sub/deep/"],
+        )
+
+    def test_keys_are_yielded_page_by_page(self):
+        requested_pages = []
+
+        def paginate(**kwargs):
+            for page in range(3):
+                requested_pages.append(page)
+                yield {"Contents": [{"Key": f"annotations/{page}.jpg.json"}]}
+
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.side_effect = paginate
+        with patch(
+            "src.superannotate.lib.app.helpers.S3_CLIENTS.get_client",
+            return_value=client,
+        ):
+            paths = iter_s3_annotation_paths("annotations", "bucket", False)
+            self.assertEqual(next(paths), "annotations/0.jpg.json")
+            self.assertEqual(requested_pages, [0])
+            self.assertEqual(
+                list(paths), ["annotations/1.jpg.json", "annotations/2.jpg.json"]
+            )
+
+    def test_listing_errors_are_raised(self):
+        def paginate(Prefix, **kwargs):  # noqa
+            if Prefix == "annotations/sub/":
+                raise ValueError("listing failed")
+            yield {"CommonPrefixes": [{"Prefix": "annotations/sub/"}]}
+
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.side_effect = paginate
+        with patch(
+            "src.superannotate.lib.app.helpers.S3_CLIENTS.get_client",
+            return_value=client,
+        ), self.assertRaisesRegex(ValueError, "listing failed"):
+            list(iter_s3_annotation_paths("annotations", "bucket", True))
+
+    def test_listing_errors_do_not_wait_for_other_listings(self):
+        release = threading.Event()
+        started, finished = [], []
+        slow_prefixes = [f"annotations/{i}/" for i in range(S3_LIST_WORKERS * 2)]
+
+        def paginate(Prefix, **kwargs):  # noqa
+            if Prefix == "annotations/":
+                yield {
+                    "CommonPrefixes": [
+                        {"Prefix": i} for i in ["annotations/fail/", *slow_prefixes]
+                    ]
+                }
+            elif Prefix == "annotations/fail/":
+                raise ValueError("listing failed")
+            else:
+                started.append(Prefix)
+                release.wait(5)
+                finished.append(Prefix)
+                yield {"Contents": [{"Key": f"{Prefix}a.jpg.json"}]}
+
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.side_effect = paginate
+        try:
+            with patch(
+                "src.superannotate.lib.app.helpers.S3_CLIENTS.get_client",
+                return_value=client,
+            ), self.assertRaisesRegex(ValueError, "listing failed"):
+                list(iter_s3_annotation_paths("annotations", "bucket", True))
+            self.assertEqual(finished, [])
+        finally:
+            release.set()
+        # the queued listings are cancelled
+        self.assertLess(len(started), len(slow_prefixes))
+
+
+class TestLocalAnnotationPaths(TestCase):
+    FILES = [
+        "a.jpg.json",
+        "a.jpg",
+        "sub/b.jpg___objects.json",
+        "sub/deep/c.jpg___pixel.json",
+        "sub/deep/c.jpg___save.png",
+    ]
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        for file in self.FILES:
+            path = os.path.join(self._temp_dir.name, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _relative(self, paths):
+        return sorted(os.path.relpath(i, self._temp_dir.name) for i in paths)
+
+    def test_iter_files(self):
+        self.assertEqual(
+            self._relative(iter_files(self._temp_dir.name, ".png", recursive=True)),
+            [os.path.join("sub", "deep", "c.jpg___save.png")],
+        )
+        self.assertEqual(
+            self._relative(iter_files(self._temp_dir.name)), ["a.jpg", "a.jpg.json"]
+        )
+
+    def test_iter_files_glob_order(self):
+        self.assertEqual(
+            list(iter_files(self._temp_dir.name, ".json", recursive=True)),
+            [str(i) for i in Path(self._temp_dir.name).rglob("*.json")],
+        )
+
+    def test_symlinked_folders_are_followed(self):
+        linked_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(linked_dir.cleanup)
+        open(os.path.join(linked_dir.name, "d.jpg___save.png"), "w").close()
+        try:
+            os.symlink(
+                linked_dir.name,
+                os.path.join(self._temp_dir.name, "linked"),
+                target_is_directory=True,
+            )
+            # a link to a parent folder is scanned once
+            os.symlink(
+                self._temp_dir.name,
+                os.path.join(self._temp_dir.name, "sub", "loop"),
+                target_is_directory=True,
+            )
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks are not supported")
+        expected = [
+            os.path.join("linked", "d.jpg___save.png"),
+            os.path.join("sub", "deep", "c.jpg___save.png"),
+        ]
+        for max_workers in (None, 2):
+            paths = iter_files(
+                self._temp_dir.name, ".png", recursive=True, max_workers=max_workers
+            )
+            self.assertEqual(self._relative(paths), expected)
+
+    def test_unreadable_folders_are_logged(self):
+        path = os.path.join(self._temp_dir.name, "missing")
+        with self.assertLogs("sa", level="WARNING") as logs:
+            self.assertEqual(list(iter_files(path, recursive=True)), [])
+        self.assertIn(path, logs.output[0])
+
+    def test_get_annotation_paths(self):
+        expected = [
+            "a.jpg.json",
+            os.path.join("sub", "b.jpg___objects.json"),
+            os.path.join("sub", "deep", "c.jpg___pixel.json"),
+        ]
+        self.assertEqual(
+            self._relative(get_annotation_paths(self._temp_dir.name, recursive=True)),
+            expected,
+        )
+        self.assertEqual(
+            self._relative(get_annotation_paths(self._temp_dir.name)), expected[:1]
+        )
@@ -0,0 +1,75 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import cv2
+import numpy as np
+from src.superannotate.lib.app.common import blue_color_generator
+from src.superannotate.lib.app.common import hex_to_rgb
+from src.superannotate.lib.app.common import id2rgb
+from src.superannotate.lib.app.common import rgb2id
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_to_sa_pixel import (
+    _panoptic_annotation_to_sa_pixel,
+)
+
+
+def remap_segments(img, segments):
+    img = img.reshape((-1, 3)).copy()
+    hex_colors = blue_color_generator(len(segments))
+    for i, seg in enumerate(segments):
+        img[np.all(img == id2rgb(seg["id"]), axis=1)] = hex_to_rgb(hex_colors[i])
+    return img
+
+
+class TestRgb2Id(TestCase):
+    def test_inverse_of_id2rgb(self):
+        ids = np.random.default_rng(0).integers(0, 1 << 24, (20, 30))
+        self.assertTrue(np.array_equal(rgb2id(id2rgb(ids)), ids))
+
+
+class TestPanopticToSaPixel(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._temp_dir.name)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _convert(self, img, segments):
+        cv2.imwrite(str(self.output_dir / "image.png"), img[..., ::-1])
+        annot = {"file_name": "image.png", "segments_info": segments}
+        _panoptic_annotation_to_sa_pixel(
+            {1: "car", 2: "tree"},
+            self.output_dir,
+            (annot, {"width": img.shape[1], "height": img.shape[0]}),
+        )
+        self.assertFalse((self.output_dir / "image.png").exists())
+        with open(self.output_dir / "image.png.json") as fp:
+            sa_json = json.load(fp)
+        mask = cv2.imread(str(self.output_dir / "image.png___save.png"))
+        return sa_json, mask[..., ::-1]
+
+    def test_remap(self):
+        random = np.random.default_rng(0)
+        ids = random.choice([0, 7, 300, 70000, 123456, 2**24 - 1], (50, 60))
+        img = id2rgb(ids)
+        segments = [
+            {"id": id_, "category_id": i % 2 + 1}
+            for i, id_ in enumerate([300, 123456, 5, 70000, 300, 2**24 - 1])
+        ]
+        sa_json, mask = self._convert(img, segments)
+        self.assertTrue(
+            np.array_equal(mask.reshape((-1, 3)), remap_segments(img, segments))
+        )
+        self.assertEqual(
+            [instance["className"] for instance in sa_json["instances"]],
+            ["car", "tree", "car", "tree", "car", "tree"],
+        )
+        self.assertEqual(sa_json["metadata"]["width"], 60)
+
+    def test_no_segments(self):
+        img = id2rgb(np.arange(12).reshape((3, 4)))
+        sa_json, mask = self._convert(img, [])
+        self.assertTrue(np.array_equal(mask, img))
+        self.assertEqual(sa_json["instances"], [])
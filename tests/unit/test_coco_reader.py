@@ -0,0 +1,114 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+from unittest import TestCase
+
+from src.superannotate.lib.app.input_converters.converters.coco_converters import (
+    coco_reader,
+)
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_reader import (
+    CocoReader,
+)
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_reader import (
+    iter_json_object,
+)
+
+COCO_JSON = {
+    "info": {"description": "test", "year": 2023},
+    "annotations": [
+        {"id": 1, "image_id": 2, "bbox": [1.5, 2, 3, 4e2], "category_id": 1},
+        {"id": 2, "image_id": 1, "segmentation": [[1, 2, 3, 4]], "category_id": 2},
+        {"id": 2, "image_id": 1, "segmentation": [[5, 6, 7, 8]], "category_id": 2},
+        {"id": 3, "image_id": 5, "bbox": [0, 0, 1, 1], "category_id": 1},
+        {"id": 4, "image_id": 2, "bbox": [0, 0, 1, 1], "category_id": 1},
+    ],
+    "images": [
+        {"id": 1, "file_name": "dir/a.jpg", "height": 10, "width": 20},
+        {"id": 2, "file_name": "b.jpg", "height": 30, "width": 40},
+        {"id": 3, "coco_url": "http://host/c.jpg", "height": 5, "width": 6},
+        {"id": 4, "file_name": "a.jpg", "height": 50, "width": 60},
+    ],
+    "categories": [{"id": 1, "name": "car"}, {"id": 2, "name": 'tree é\\"'}],
+    "licenses": [],
+    "version": 12345,
+    "score": 1.25e-3,
+    "scale": -12.5,
+}
+
+
+class TestIterJsonObject(TestCase):
+    def _items(self, text):
+        return [(key, value) for key, value, _ in iter_json_object(io.StringIO(text))]
+
+    def test_items_across_chunks(self):
+        text = json.dumps(COCO_JSON, indent=2)
+        expected = self._items(text)
+        for chunk_size in (1, 2, 3, 7, 64):
+            with mock.patch.object(coco_reader, "READ_CHUNK_SIZE", chunk_size):
+                self.assertEqual(self._items(text), expected)
+        self.assertEqual(
+            [value for key, value in expected if key == "images"],
+            COCO_JSON["images"],
+        )
+        self.assertIn(("version", 12345), expected)
+        self.assertIn(("score", 1.25e-3), expected)
+        self.assertIn(("scale", -12.5), expected)
+        self.assertIn(("info", COCO_JSON["info"]), expected)
+
+    def test_item_text(self):
+        text = json.dumps(COCO_JSON)
+        for key, value, item_text in iter_json_object(io.StringIO(text)):
+            self.assertEqual(json.loads(item_text), value)
+
+    def test_empty(self):
+        self.assertEqual(self._items("{}"), [])
+        self.assertEqual(self._items('{"images": [], "a": {}}'), [("a", {})])
+
+    def test_invalid(self):
+        for text in ('["images"]', '{"images": [{"id": 1}', '{"images": [1 2]}'):
+            with self.assertRaises(json.JSONDecodeError):
+                self._items(text)
+
+
+class TestCocoReader(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.coco_path = os.path.join(self._temp_dir.name, "coco.json")
+        with open(self.coco_path, "w") as fp:
+            json.dump(COCO_JSON, fp)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _assert_index(self, coco):
+        self.assertEqual(coco.categories, COCO_JSON["categories"])
+        images = list(coco.iter_images())
+        self.assertEqual(
+            [(name, img["id"]) for name, img, _ in images],
+            [("b.jpg", 2), ("c.jpg", 3), ("a.jpg", 4)],
+        )
+        self.assertEqual([ann["id"] for ann in images[0][2]], [1, 4])
+        self.assertEqual(images[1][2], [])
+        self.assertEqual(coco.get_images_count(), 3)
+        self.assertEqual(coco.get_annotations_count(), 5)
+        self.assertEqual(coco.get_repeated_annotation_ids(), {2})
+        self.assertEqual(
+            [
+                (annot["id"], image and image["id"])
+                for annot, image in coco.iter_annotations()
+            ],
+            [(1, 2), (2, 1), (2, 1), (3, None), (4, 2)],
+        )
+
+    def test_in_memory_index(self):
+        with CocoReader(self.coco_path) as coco:
+            self._assert_index(coco)
+
+    def test_spilled_index(self):
+        with mock.patch.object(coco_reader, "IN_MEMORY_INDEX_LIMIT", -1):
+            with CocoReader(self.coco_path) as coco:
+                self.assertTrue(os.path.exists(coco._temp_dir.name))
+                self._assert_index(coco)
+        self.assertFalse(os.path.exists(coco._temp_dir.name))
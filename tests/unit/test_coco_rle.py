@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+import numpy as np
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_api import (
+    _frString,
+)
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_api import (
+    _masktoRLE,
+)
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_api import (
+    decode,
+)
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_api import (
+    encode,
+)
+
+try:
+    from pycocotools import mask as coco_mask
+except ImportError:
+    coco_mask = None
+
+
+def get_masks():
+    random = np.random.default_rng(0)
+    masks = [np.zeros((7, 3), dtype=np.uint8), np.ones((3, 7), dtype=np.uint8)]
+    for _ in range(50):
+        height, width = random.integers(1, 80, 2)
+        masks.append(
+            (random.random((height, width)) < random.random()).astype(np.uint8)
+        )
+    large_mask = np.zeros((1200, 1000), dtype=np.uint8)
+    large_mask[100:1100, 50:900] = 1
+    masks.append(large_mask)
+    return masks
+
+
+class TestCocoRLE(TestCase):
+    def test_known_strings(self):
+        mask = np.zeros((6, 5), dtype=np.uint8)
+        mask[1:4, 1:3] = 1
+        mask[5, 4] = 1
+        self.assertEqual(encode(mask), {"counts": "7330:N", "size": [6, 5]})
+        mask = np.ones((4, 4), dtype=np.uint8)
+        mask[2, 2] = 0
+        self.assertEqual(encode(mask)["counts"], "0:1K")
+
+    def test_runs(self):
+        self.assertEqual(_masktoRLE(np.zeros((2, 3)))["counts"].tolist(), [6])
+        self.assertEqual(_masktoRLE(np.ones((2, 3)))["counts"].tolist(), [0, 6])
+        self.assertEqual(_frString("0:1K"), [0, 10, 1, 5])
+
+    def test_round_trip(self):
+        for mask in get_masks():
+            rle = encode(mask)
+            self.assertTrue((decode(rle) == mask).all())
+
+    def test_pycocotools_compatibility(self):
+        if coco_mask is None:
+            self.skipTest("pycocotools is not installed")
+        for mask in get_masks():
+            expected = coco_mask.encode(np.asfortranarray(mask))
+            self.assertEqual(encode(mask)["counts"], expected["counts"].decode())
+            self.assertTrue(
+                (
+                    decode(
+                        {
+                            "counts": expected["counts"].decode(),
+                            "size": list(mask.shape),
+                        }
+                    )
+                    == mask
+                ).all()
+            )
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from src.superannotate.lib.app.common import write_to_json
+from src.superannotate.lib.app.input_converters.converters.coco_converters.coco_writer import (
+    CocoWriter,
+)
+
+
+def get_skeleton():
+    return {
+        "info": {"description": "test", "year": 2023},
+        "licenses": [{"url": "https://superannotate.ai", "id": 1}],
+        "images": [],
+        "annotations": [],
+        "categories": [],
+    }
+
+
+class TestCocoWriter(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._temp_dir.name, "coco.json")
+        self.expected_path = os.path.join(self._temp_dir.name, "expected.json")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _assert_written(self, expected):
+        write_to_json(self.expected_path, expected)
+        with open(self.path) as fp, open(self.expected_path) as expected_fp:
+            self.assertEqual(fp.read(), expected_fp.read())
+
+    def test_write(self):
+        images = [{"id": i, "file_name": f"{i}.jpg", "size": [1, 2]} for i in range(3)]
+        annotations = [
+            {"id": 1, "image_id": 0, "segmentation": [[1.5, 2, 3, 4]], "bbox": []},
+            {"id": 2, "image_id": 2, "segmentation": {"counts": 'ab\n"c'}},
+        ]
+        categories = [{"id": 1, "name": "café", "color": [1, 2, 3]}]
+        with CocoWriter(self.path, get_skeleton()) as writer:
+            for image in images:
+                writer.add_image(image)
+            for annotation in annotations:
+                writer.add_annotation(annotation)
+            writer.skeleton["categories"] = categories
+        expected = get_skeleton()
+        expected.update(images=images, annotations=annotations, categories=categories)
+        self._assert_written(expected)
+        with open(self.path) as fp:
+            self.assertEqual(json.load(fp), expected)
+
+    def test_write_empty(self):
+        with CocoWriter(self.path, get_skeleton()):
+            pass
+        self._assert_written(get_skeleton())
+
+    def test_not_written_on_error(self):
+        with self.assertRaises(ValueError):
+            with CocoWriter(self.path, get_skeleton()) as writer:
+                writer.add_image({"id": 1})
+                raise ValueError
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,99 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+import pytest
+from src.superannotate.lib.app.analytics.comparison import bbox_iou_matrix
+from src.superannotate.lib.app.analytics.comparison import compare_annotations
+from src.superannotate.lib.app.analytics.comparison import greedy_match
+from src.superannotate.lib.app.analytics.comparison import hungarian_match
+from src.superannotate.lib.app.analytics.comparison import point_distance_matrix
+from src.superannotate.lib.app.analytics.comparison import rbbox_iou_matrix
+
+
+def get_bbox(x1, y1, x2, y2, class_name="car", probability=None):
+    return {
+        "type": "bbox",
+        "className": class_name,
+        "probability": probability,
+        "points": {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
+    }
+
+
+class TestMatrices(TestCase):
+    def test_bbox_iou_matrix(self):
+        iou = bbox_iou_matrix(
+            np.array([[0, 0, 10, 10], [10, 10, 0, 0]]),
+            np.array([[5, 0, 15, 10], [20, 20, 30, 30]]),
+        )
+        np.testing.assert_allclose(iou, [[1 / 3, 0], [1 / 3, 0]])
+
+    def test_rbbox_iou_matrix(self):
+        pytest.importorskip("shapely")
+        diamond = [5, 0, 10, 5, 5, 10, 0, 5]
+        iou = rbbox_iou_matrix(
+            np.array([diamond]), np.array([[0, 0, 10, 0, 10, 10, 0, 10], diamond])
+        )
+        np.testing.assert_allclose(iou, [[0.5, 1]])
+
+    def test_point_distance_matrix(self):
+        distances = point_distance_matrix(
+            np.array([[0, 0]]), np.array([[3, 4], [0, 1]])
+        )
+        np.testing.assert_allclose(distances, [[5, 1]])
+
+
+class TestMatching(TestCase):
+    SIMILARITY = np.array([[0.9, 0.8], [0.85, 0.1]])
+
+    def test_greedy_match(self):
+        rows, columns = greedy_match(self.SIMILARITY, self.SIMILARITY >= 0.5)
+        self.assertEqual((list(rows), list(columns)), ([0], [0]))
+        rows, columns = greedy_match(
+            self.SIMILARITY, self.SIMILARITY >= 0.5, order=np.array([1, 0])
+        )
+        self.assertEqual((list(rows), list(columns)), ([1, 0], [0, 1]))
+
+    def test_hungarian_match(self):
+        pytest.importorskip("scipy")
+        rows, columns = hungarian_match(self.SIMILARITY, self.SIMILARITY >= 0.5)
+        self.assertEqual((list(rows), list(columns)), ([0, 1], [1, 0]))
+
+
+class TestCompareAnnotations(TestCase):
+    def test_compare_annotations(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ground_truth_path = Path(temp_dir) / "ground_truth"
+            predictions_path = Path(temp_dir) / "predictions"
+            ground_truth_path.mkdir()
+            predictions_path.mkdir()
+            annotations = {
+                ground_truth_path: [
+                    get_bbox(0, 0, 10, 10),
+                    get_bbox(20, 20, 30, 30),
+                    get_bbox(50, 50, 60, 60, "person"),
+                ],
+                predictions_path: [
+                    get_bbox(0, 0, 10, 11, probability=90),
+                    get_bbox(40, 40, 45, 45, probability=80),
+                    get_bbox(20, 21, 30, 30, probability=70),
+                    get_bbox(0, 0, 10, 10, "tree", probability=60),
+                ],
+            }
+            for path, instances in annotations.items():
+                with open(path / "image.jpg.json", "w") as file:
+                    json.dump(
+                        {"metadata": {"name": "image.jpg"}, "instances": instances},
+                        file,
+                    )
+            df = compare_annotations(ground_truth_path, predictions_path)
+        df = df.set_index("className")
+        self.assertEqual(list(df.index), ["car", "person", "tree"])
+        self.assertEqual(list(df.truePositives), [2, 0, 0])
+        self.assertAlmostEqual(df.loc["car", "precision"], 2 / 3)
+        self.assertEqual(df.loc["car", "recall"], 1)
+        self.assertAlmostEqual(df.loc["car", "averagePrecision"], 0.5 + 0.5 * 2 / 3)
+        self.assertEqual(df.loc["person", "averagePrecision"], 0)
+        self.assertTrue(np.isnan(df.loc["tree", "averagePrecision"]))
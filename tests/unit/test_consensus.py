@@ -0,0 +1,163 @@
+import concurrent.futures
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from src.superannotate.lib.app.analytics.common import calculate_tag_consensus
+from src.superannotate.lib.app.analytics.common import consensus
+from src.superannotate.lib.app.analytics.common import dataset_consensus
+
+
+class TestConsensus(TestCase):
+    @staticmethod
+    def _get_df(rows):
+        return pd.DataFrame(
+            [
+                {
+                    "itemName": "image.jpg",
+                    "folderName": folder,
+                    "meta": meta,
+                    "className": class_name,
+                    "creatorEmail": f"{folder}@example.com",
+                    "attributes": None,
+                }
+                for folder, meta, class_name in rows
+            ]
+        )
+
+    def setUp(self):
+        pytest.importorskip("shapely")
+
+    def test_bbox_consensus(self):
+        df = self._get_df(
+            [
+                ("a", {"x1": 0, "y1": 0, "x2": 10, "y2": 10}, "car"),
+                ("a", {"x1": 100, "y1": 100, "x2": 110, "y2": 110}, "car"),
+                ("b", {"x1": 5, "y1": 0, "x2": 15, "y2": 10}, "car"),
+                ("b", {"x1": 0, "y1": 0, "x2": 10, "y2": 10}, "person"),
+                ("b", {"x1": 100, "y1": 100, "x2": 110, "y2": 110}, "car"),
+            ]
+        )
+        data = pd.DataFrame(consensus(df, "image.jpg", "bbox"))
+        self.assertEqual(list(data.instanceId), [0, 0, 1, 1, 2])
+        self.assertEqual(list(data.folderName), ["a", "b", "a", "b", "b"])
+        self.assertEqual(list(data.className), ["car", "car", "car", "car", "person"])
+        self.assertEqual(list(data.score.round(4)), [0.3333, 0.3333, 1, 1, 0])
+        self.assertEqual(list(data.area), [100, 100, 100, 100, 100])
+
+    def test_bbox_consensus_no_overlap(self):
+        df = self._get_df(
+            [
+                ("a", {"x1": 0, "y1": 0, "x2": 10, "y2": 10}, "car"),
+                ("b", {"x1": 50, "y1": 50, "x2": 60, "y2": 60}, "car"),
+            ]
+        )
+        data = pd.DataFrame(consensus(df, "image.jpg", "bbox"))
+        self.assertEqual(list(data.instanceId), [0, 1])
+        self.assertEqual(list(data.folderName), ["a", "b"])
+        self.assertEqual(list(data.score), [0, 0])
+
+    def test_bbox_consensus_different_classes(self):
+        df = self._get_df(
+            [
+                ("a", {"x1": 0, "y1": 0, "x2": 10, "y2": 10}, "car"),
+                ("b", {"x1": 0, "y1": 0, "x2": 10, "y2": 10}, "person"),
+            ]
+        )
+        data = pd.DataFrame(consensus(df, "image.jpg", "bbox"))
+        self.assertEqual(list(data.className), ["car", "person"])
+        self.assertEqual(list(data.score), [0, 0])
+
+    def test_polygon_consensus_no_overlap(self):
+        df = self._get_df(
+            [
+                ("a", [0, 0, 10, 0, 10, 10, 0, 10], "car"),
+                ("b", [50, 50, 60, 50, 60, 60, 50, 60], "car"),
+            ]
+        )
+        data = pd.DataFrame(consensus(df, "image.jpg", "polygon"))
+        self.assertEqual(list(data.score), [0, 0])
+
+    def test_polygon_consensus(self):
+        df = self._get_df(
+            [
+                ("a", [0, 0, 10, 0, 10, 10, 0, 10], "car"),
+                ("b", [0, 0, 10, 0, 10, 5, 0, 5], "car"),
+                ("b", [0, 0, 1], "car"),
+            ]
+        )
+        data = pd.DataFrame(consensus(df, "image.jpg", "polygon"))
+        self.assertEqual(list(data.folderName), ["a", "b"])
+        self.assertEqual(list(data.score), [0.5, 0.5])
+
+    def test_point_consensus(self):
+        df = self._get_df(
+            [
+                ("a", {"x": 0, "y": 0}, "car"),
+                ("a", {"x": 50, "y": 50}, "car"),
+                ("b", {"x": 49, "y": 49}, "car"),
+            ]
+        )
+        data = pd.DataFrame(consensus(df, "image.jpg", "point"))
+        self.assertEqual(list(data.instanceId), [0, 0, 1])
+        self.assertEqual(list(data.folderName), ["a", "b", "a"])
+        self.assertEqual(list(data.score), [1.0, 1.0, 0])
+
+    def test_dataset_consensus(self):
+        df = pd.concat(
+            [
+                self._get_df(
+                    [
+                        ("a", {"x1": 0, "y1": 0, "x2": 10, "y2": 10 + i}, "car"),
+                        ("b", {"x1": 0, "y1": 0, "x2": 10, "y2": 10}, "car"),
+                    ]
+                ).assign(itemName=f"image_{i}.jpg")
+                for i in range(6)
+            ],
+            ignore_index=True,
+        )
+        expected = pd.concat(
+            [pd.DataFrame(consensus(df, f"image_{i}.jpg", "bbox")) for i in range(6)],
+            ignore_index=True,
+        )
+        for max_workers in (1, 2):
+            pd.testing.assert_frame_equal(
+                dataset_consensus(df, "bbox", max_workers, images_per_task=2),
+                expected,
+            )
+        with patch(
+            "src.superannotate.lib.app.analytics.common.concurrent.futures.ProcessPoolExecutor"
+        ) as executor:
+            pd.testing.assert_frame_equal(
+                dataset_consensus(df, "bbox", images_per_task=2), expected
+            )
+        executor.assert_not_called()
+        with patch(
+            "src.superannotate.lib.app.analytics.common.CONSENSUS_WORKERS", 2
+        ), patch(
+            "src.superannotate.lib.app.analytics.common.concurrent.futures.ProcessPoolExecutor",
+            wraps=concurrent.futures.ProcessPoolExecutor,
+        ) as executor:
+            pd.testing.assert_frame_equal(
+                dataset_consensus(df, "bbox", images_per_task=2), expected
+            )
+        executor.assert_called_once_with(max_workers=2)
+
+
+class TestTagConsensus(TestCase):
+    def test_scores(self):
+        image_df = pd.DataFrame(
+            {
+                "creatorEmail": ["a@example.com"] * 5,
+                "itemName": ["image.jpg"] * 5,
+                "instanceId": range(5),
+                "folderName": ["a", "b", "a", "b", "c"],
+                "className": ["car", "car", "car", "person", None],
+                "attributeGroupName": ["color", "color", "color", None, None],
+                "attributeName": ["red", "red", "blue", None, None],
+            }
+        )
+        data = calculate_tag_consensus(image_df)
+        self.assertEqual(data["score"], [1, 1, 0, 0, 0])
+        self.assertEqual(data["folderName"], ["a", "b", "a", "b", "c"])
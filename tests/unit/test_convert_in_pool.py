@@ -0,0 +1,35 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.superannotate.lib.app.common import convert_in_pool
+
+
+def _square(value):
+    return value * value
+
+
+class TestConvertInPool(TestCase):
+    def test_converts_inline(self):
+        self.assertEqual(
+            list(convert_in_pool(_square, range(10), max_workers=1)),
+            [value * value for value in range(10)],
+        )
+
+    def test_converts_inline_by_default(self):
+        with patch(
+            "src.superannotate.lib.app.common.concurrent.futures.ProcessPoolExecutor"
+        ) as executor:
+            self.assertEqual(
+                list(convert_in_pool(_square, range(10))),
+                [0, 1, 4, 9, 16, 25, 36, 49, 64, 81],
+            )
+        executor.assert_not_called()
+
+    def test_keeps_order_in_pool(self):
+        self.assertEqual(
+            list(convert_in_pool(_square, range(100), max_workers=2, chunk_size=3)),
+            [value * value for value in range(100)],
+        )
+
+    def test_empty_items(self):
+        self.assertEqual(list(convert_in_pool(_square, [], max_workers=2)), [])
@@ -1,7 +1,18 @@
 import json
 import os.path
+import random
+from collections import namedtuple
 from unittest import TestCase
+from unittest.mock import MagicMock
 
+import numpy as np
+
+from src.superannotate.lib.core.enums import ProjectType
+from src.superannotate.lib.core.usecases.annotations import (
+    GetVideoAnnotationsPerFrame,
+)
+from src.superannotate.lib.core.video_convertor import BBOX_KEYS
+from src.superannotate.lib.core.video_convertor import IntervalIndex
 from src.superannotate.lib.core.video_convertor import VideoFrameGenerator
 from tests import DATA_SET_PATH
 
@@ -108,3 +119,151 @@ class TestConvertor(TestCase):
         data = [i for i in generator]
         expected = json.load(open(self.CUSTOM_CASE_5_FRAME_EXPECTED_ANNOTATION_PATH))
         assert expected == data
+
+    def test_get_frame(self):
+        payload = json.load(open(self.ANNOTATION_PATH))
+        generator = VideoFrameGenerator(payload, fps=10)
+        frames = list(generator)
+        for frame in frames[:: max(1, len(frames) // 20)]:
+            assert generator.get_frame(frame["frame"]) == frame
+
+    def test_get_frames_range(self):
+        payload = json.load(open(self.ANNOTATION_PATH))
+        generator = VideoFrameGenerator(payload, fps=10)
+        frames = list(generator)
+        for start_frame, end_frame in ((1, 1), (5, 17), (len(frames) - 3, None)):
+            assert (
+                list(generator.get_frames(start_frame, end_frame))
+                == frames[start_frame - 1 : end_frame]
+            )
+        assert list(generator.get_frames(len(frames) + 1, None)) == []
+        assert generator.get_frame_range(None, 0) == (1, 0)
+        assert list(generator.get_frames(None, 0)) == []
+        assert len(generator.to_columns(None, 0)["frame"]) == 0
+
+    def test_to_columns(self):
+        for path, fps in ((self.ANNOTATION_PATH, 10), (self.ANNOTATION_PATH, 1)):
+            payload = json.load(open(path))
+            generator = VideoFrameGenerator(payload, fps=fps)
+            for start_frame, end_frame in ((None, None), (2, 7)):
+                columns = generator.to_columns(start_frame, end_frame)
+                rows = [
+                    (frame["frame"], annotation)
+                    for frame in generator.get_frames(start_frame, end_frame)
+                    for annotation in frame["annotations"]
+                ]
+                assert len(columns["frame"]) == len(rows)
+                offsets = columns["pointsOffsets"]
+                for i, (frame_no, annotation) in enumerate(rows):
+                    assert columns["frame"][i] == frame_no
+                    assert columns["instanceId"][i] == annotation["instanceId"]
+                    assert columns["classId"][i] == annotation["classId"]
+                    assert columns["type"][i] == annotation["type"]
+                    assert columns["keyframe"][i] == annotation["keyframe"]
+                    points = annotation.get("points")
+                    if isinstance(points, dict):
+                        assert [
+                            columns[key][i] for key in ("x1", "y1", "x2", "y2")
+                        ] == [points[key] for key in ("x1", "y1", "x2", "y2")]
+                    else:
+                        assert np.isnan(columns["x1"][i])
+                    if annotation.get("x") is not None:
+                        assert columns["x"][i] == annotation["x"]
+                        assert columns["y"][i] == annotation["y"]
+                    row_points = columns["points"][offsets[i] : offsets[i + 1]]
+                    if isinstance(points, list):
+                        assert list(row_points) == points
+                    else:
+                        assert len(row_points) == 0
+        assert len(generator.to_columns(len(list(generator)) + 1)["frame"]) == 0
+
+    def test_to_columns_interpolated_values(self):
+        random.seed(0)
+        instances = []
+        for i in range(20):
+            annotation_type = "bbox" if i % 2 else "point"
+            timestamps = []
+            for timestamp in (0, 1700000, 4300000):
+                values = [round(random.uniform(0, 1000), 2) for _ in range(4)]
+                if annotation_type == "bbox":
+                    timestamps.append(
+                        {"timestamp": timestamp, "points": dict(zip(BBOX_KEYS, values))}
+                    )
+                else:
+                    timestamps.append(
+                        {"timestamp": timestamp, "x": values[0], "y": values[1]}
+                    )
+            instances.append(
+                {
+                    "meta": {
+                        "type": annotation_type,
+                        "classId": 1,
+                        "start": 0,
+                        "end": 4300000,
+                    },
+                    "parameters": [
+                        {"start": 0, "end": 4300000, "timestamps": timestamps}
+                    ],
+                }
+            )
+        payload = {"metadata": {"duration": 4300000}, "instances": instances}
+        generator = VideoFrameGenerator(payload, fps=10)
+        columns = generator.to_columns()
+        rows = [
+            annotation
+            for frame in generator.get_frames()
+            for annotation in frame["annotations"]
+        ]
+        assert len(columns["frame"]) == len(rows)
+        for i, annotation in enumerate(rows):
+            if annotation["type"] == "bbox":
+                assert [columns[key][i] for key in BBOX_KEYS] == [
+                    annotation["points"][key] for key in BBOX_KEYS
+                ]
+            else:
+                assert [columns["x"][i], columns["y"][i]] == [
+                    annotation["x"],
+                    annotation["y"],
+                ]
+
+
+class TestIntervalIndex(TestCase):
+    def test_queries(self):
+        Interval = namedtuple("Interval", ["start", "end"])
+        random.seed(0)
+        intervals = []
+        for _ in range(300):
+            start = random.randint(1, 500)
+            intervals.append(Interval(start, start + random.randint(0, 40)))
+        index = IntervalIndex(intervals)
+        for point in range(0, 560, 7):
+            assert sorted(index.at(point)) == sorted(
+                i for i in intervals if i.start <= point <= i.end
+            )
+        for start, end in ((1, 1), (10, 90), (450, 600), (600, 700)):
+            assert sorted(index.overlap(start, end)) == sorted(
+                i for i in intervals if i.start <= end and i.end >= start
+            )
+
+
+class TestGetVideoAnnotationsPerFrame(TestCase):
+    def _get_errors(self, start_frame, end_frame):
+        use_case = GetVideoAnnotationsPerFrame(
+            config=MagicMock(),
+            reporter=MagicMock(),
+            project=MagicMock(type=ProjectType.VIDEO.value),
+            folder=MagicMock(),
+            video_name="video.mp4",
+            fps=1,
+            service_provider=MagicMock(),
+            start_frame=start_frame,
+            end_frame=end_frame,
+        )
+        use_case.is_valid()
+        return use_case._response.errors
+
+    def test_frame_range_validation(self):
+        for start_frame, end_frame in ((None, None), (1, None), (None, 1), (2, 5)):
+            self.assertFalse(self._get_errors(start_frame, end_frame))
+        for start_frame, end_frame in ((0, None), (-1, None), (None, 0), (3, 2)):
+            self.assertTrue(self._get_errors(start_frame, end_frame))
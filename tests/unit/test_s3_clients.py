@@ -0,0 +1,73 @@
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.superannotate.lib.core.s3 import S3ClientFactory
+
+
+class TestS3ClientFactory(TestCase):
+    CREDENTIALS = ("access_key", "secret_key", "session_token", "us-west-2")
+
+    def test_client_is_reused(self):
+        factory = S3ClientFactory()
+        client = factory.get_client(*self.CREDENTIALS)
+        self.assertIs(client, factory.get_client(*self.CREDENTIALS))
+        self.assertIsNot(client, factory.get_client("other", "secret", "token"))
+
+    def test_resources_are_cached_per_thread(self):
+        factory = S3ClientFactory()
+        resource = factory.get_resource(*self.CREDENTIALS)
+        self.assertIs(resource, factory.get_resource(*self.CREDENTIALS))
+        resources = []
+        thread = threading.Thread(
+            target=lambda: resources.append(factory.get_resource(*self.CREDENTIALS))
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(resource, resources[0])
+
+    def test_temporary_credentials_expire(self):
+        factory = S3ClientFactory(credentials_lifetime=10)
+        with patch("src.superannotate.lib.core.s3.time.monotonic", return_value=0):
+            client = factory.get_client(*self.CREDENTIALS)
+            static_client = factory.get_client()
+        with patch("src.superannotate.lib.core.s3.time.monotonic", return_value=11):
+            self.assertIsNot(client, factory.get_client(*self.CREDENTIALS))
+            self.assertIs(static_client, factory.get_client())
+
+    def test_refreshable_credentials(self):
+        factory = S3ClientFactory(credentials_lifetime=700)
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            return "new_access_key", "new_secret_key", "new_session_token"
+
+        client = factory.get_client(*self.CREDENTIALS, refresh_using=refresh)
+        self.assertIs(
+            client, factory.get_client(*self.CREDENTIALS, refresh_using=refresh)
+        )
+        credentials = client._request_signer._credentials.get_frozen_credentials()
+        self.assertEqual(credentials.access_key, "new_access_key")
+        self.assertTrue(calls)
+
+    def test_least_recently_used_are_evicted(self):
+        factory = S3ClientFactory(max_sessions=2)
+
+        def refresh():
+            return "access_key", "secret_key", "session_token"
+
+        first = factory.get_client("first", "secret", "token", refresh_using=refresh)
+        factory.get_resource("first", "secret", "token", refresh_using=refresh)
+        second = factory.get_client("second", "secret", "token")
+        self.assertIs(
+            first,
+            factory.get_client("first", "secret", "token", refresh_using=refresh),
+        )
+        factory.get_client("third", "secret", "token")
+        self.assertEqual(len(factory._entries), 2)
+        self.assertIsNot(second, factory.get_client("second", "secret", "token"))
+        factory.get_resource("third", "secret", "token")
+        self.assertEqual(
+            set(factory._local.resources), {("third", "secret", "token", None)}
+        )
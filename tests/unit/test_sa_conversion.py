@@ -0,0 +1,103 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import cv2
+import numpy as np
+from src.superannotate.lib.app.common import blue_color_generator
+from src.superannotate.lib.app.common import hex_to_rgb
+from src.superannotate.lib.app.input_converters.sa_conversion import (
+    _get_colors_contours,
+)
+from src.superannotate.lib.app.input_converters.sa_conversion import (
+    from_pixel_to_vector,
+)
+
+
+def make_mask(hex_colors, height=120, width=150):
+    random = np.random.default_rng(0)
+    mask = np.zeros((height, width, 3), dtype=np.uint8)
+    for i, hex_color in enumerate(hex_colors):
+        color = tuple(int(value) for value in hex_to_rgb(hex_color)[::-1])
+        x, y = random.integers(-10, width), random.integers(-10, height)
+        if i % 3 == 0:
+            cv2.rectangle(mask, (x, y), (x + 40, y + 30), color, -1)
+            cv2.rectangle(mask, (x + 5, y + 5), (x + 15, y + 15), (0, 0, 0), -1)
+        elif i % 3 == 1:
+            cv2.circle(mask, (x, y), int(random.integers(3, 25)), color, -1)
+        else:
+            mask[random.random((height, width)) < 0.01] = color
+    return mask
+
+
+class TestPixelToVector(TestCase):
+    def test_colors_contours(self):
+        hex_colors = blue_color_generator(30)
+        mask = make_mask(hex_colors)
+        colors_contours = _get_colors_contours(mask, hex_colors + ["#ff0000"])
+        for hex_color in hex_colors:
+            color = list(hex_to_rgb(hex_color))
+            bitmask = np.zeros(mask.shape[:2], dtype=np.uint8)
+            bitmask[np.all(mask == color[::-1], axis=2)] = 255
+            contours, hierarchy = cv2.findContours(
+                bitmask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
+            )
+            color_id = color[0] | color[1] << 8 | color[2] << 16
+            if hierarchy is None:
+                self.assertNotIn(color_id, colors_contours)
+                continue
+            expected_contours, expected_hierarchy = colors_contours[color_id]
+            self.assertTrue(np.array_equal(hierarchy, expected_hierarchy))
+            self.assertEqual(len(contours), len(expected_contours))
+            for contour, expected_contour in zip(contours, expected_contours):
+                self.assertTrue(np.array_equal(contour, expected_contour))
+        self.assertNotIn(0xFF, colors_contours)
+        self.assertEqual(_get_colors_contours(mask, []), {})
+
+    def test_from_pixel_to_vector(self):
+        hex_colors = blue_color_generator(4)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_dir, output_dir = Path(tmp_dir) / "input", Path(tmp_dir) / "output"
+            input_dir.mkdir()
+            output_dir.mkdir()
+            mask = np.zeros((50, 60, 3), dtype=np.uint8)
+            for i, hex_color in enumerate(hex_colors[:3]):
+                cv2.rectangle(
+                    mask,
+                    (i * 20, 10),
+                    (i * 20 + 15, 40),
+                    tuple(int(v) for v in hex_to_rgb(hex_color)[::-1]),
+                    -1,
+                )
+            cv2.imwrite(str(input_dir / "image.jpg___save.png"), mask)
+            instances = [
+                {"type": "meta", "name": "imageAttributes"},
+                {"className": "a", "parts": [{"color": hex_colors[0]}]},
+                # the last color is not in the mask
+                {"className": "b", "parts": [{"color": c} for c in hex_colors[1:]]},
+            ]
+            with open(input_dir / "image.jpg___pixel.json", "w") as fp:
+                json.dump(
+                    {"metadata": {"name": "image.jpg"}, "instances": instances}, fp
+                )
+
+            self.assertEqual(
+                from_pixel_to_vector(
+                    [input_dir / "image.jpg___pixel.json"], output_dir
+                ),
+                [str(input_dir / "image.jpg")],
+            )
+            with open(output_dir / "image.jpg.json") as fp:
+                sa_json = json.load(fp)
+        self.assertEqual(
+            [
+                (instance["className"], instance["groupId"], instance["points"])
+                for instance in sa_json["instances"]
+            ],
+            [
+                ("a", 0, [0, 10, 0, 40, 15, 40, 15, 10]),
+                ("b", 0, [20, 10, 20, 40, 35, 40, 35, 10]),
+                ("b", 0, [40, 10, 40, 40, 55, 40, 55, 10]),
+            ],
+        )
@@ -0,0 +1,105 @@
+import asyncio
+import concurrent.futures
+import io
+import json
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from src.superannotate.lib.core.entities import BaseItemEntity
+from src.superannotate.lib.core.usecases.annotations import ItemToUpload
+from src.superannotate.lib.core.usecases.annotations import (
+    UploadAnnotationsFromFolderUseCase,
+)
+
+
+class TestDistributeQueues(TestCase):
+    PATHS = [f"annotations/{i}.json" for i in range(20)]
+
+    def setUp(self):
+        self.use_case = UploadAnnotationsFromFolderUseCase(
+            reporter=MagicMock(),
+            project=MagicMock(id=1, type=1),
+            folder=MagicMock(id=2),
+            user=MagicMock(),
+            annotation_paths=list(self.PATHS),
+            service_provider=MagicMock(),
+        )
+        self.items = [
+            ItemToUpload(item=BaseItemEntity(name=path), path=path)
+            for path in self.PATHS
+        ]
+
+    def _distribute(self):
+        async def distribute():
+            self.use_case._big_files_queue = asyncio.Queue()
+            self.use_case._small_files_queue = asyncio.Queue()
+            await self.use_case.distribute_queues(self.items)
+            queued = []
+            while True:
+                item = self.use_case._small_files_queue.get_nowait()
+                if item is None:
+                    return queued
+                queued.append(item.path)
+
+        return asyncio.run(distribute())
+
+    def test_prefetch_keeps_order(self):
+        running, max_running = 0, 0
+
+        async def get_annotation(path):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            # the later reads finish first
+            await asyncio.sleep(0.001 * (len(self.PATHS) - self.PATHS.index(path)))
+            running -= 1
+            return {"path": path}, None, 1
+
+        with patch.object(
+            UploadAnnotationsFromFolderUseCase, "PREFETCH_SIZE", 4
+        ), patch.object(self.use_case, "get_annotation", side_effect=get_annotation):
+            queued = self._distribute()
+        self.assertEqual(queued, self.PATHS)
+        # the awaited read and the reads prefetched ahead of it
+        self.assertEqual(max_running, 5)
+
+    def test_prefetch_errors_fail_only_their_items(self):
+        async def get_annotation(path):
+            if path == self.PATHS[1]:
+                raise ValueError("invalid annotation")
+            return {"path": path}, None, 1
+
+        with patch.object(
+            UploadAnnotationsFromFolderUseCase, "PREFETCH_SIZE", 4
+        ), patch.object(self.use_case, "get_annotation", side_effect=get_annotation):
+            queued = self._distribute()
+        self.assertEqual(queued, self.PATHS[:1] + self.PATHS[2:])
+        self.assertEqual(self.use_case._report.failed_annotations, [self.PATHS[1]])
+
+    def test_s3_reads_run_in_executor(self):
+        thread_names = set()
+
+        def get_annotation_from_s3(bucket, path):
+            thread_names.add(threading.current_thread().name)
+            if path == self.PATHS[3]:
+                raise ConnectionError("read failed")
+            return io.BytesIO(json.dumps({"path": path}).encode())
+
+        self.use_case._client_s3_bucket = "bucket"
+        self.use_case._s3_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="s3_read"
+        )
+        with self.use_case._s3_executor, patch.object(
+            UploadAnnotationsFromFolderUseCase,
+            "get_annotation_from_s3",
+            side_effect=get_annotation_from_s3,
+        ), patch.object(
+            self.use_case, "prepare_annotation", side_effect=lambda data, size: data
+        ):
+            queued = self._distribute()
+        self.assertEqual(queued, self.PATHS[:3] + self.PATHS[4:])
+        self.assertEqual(self.use_case._report.failed_annotations, [self.PATHS[3]])
+        self.assertTrue(thread_names)
+        self.assertTrue(all(name.startswith("s3_read") for name in thread_names))
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import threading
+from collections import namedtuple
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from src.superannotate.lib.core.entities import ImageEntity
+from src.superannotate.lib.core.upload_index import UploadJournal
+from src.superannotate.lib.core.usecases import UploadImagesToProject
+
+ProcessedImage = namedtuple("ProcessedImage", ["uploaded", "path", "entity", "name"])
+
+
+class TestUploadImagesToProject(TestCase):
+    PATHS = [f"images/{i}.jpg" for i in range(250)]
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.journal = UploadJournal(os.path.join(self._temp_dir.name, "index.db"))
+        self.use_case = UploadImagesToProject(
+            project=MagicMock(id=1),
+            folder=MagicMock(id=2),
+            s3_repo=None,
+            service_provider=MagicMock(),
+            paths=self.PATHS,
+        )
+        self.use_case._upload_journal = self.journal
+        self.use_case._validated = True
+        self.use_case._auth_data = {"availableImageCount": 500000}
+        self.use_case._images_to_upload = self.PATHS, []
+        self.attached_batches = []
+
+    def tearDown(self):
+        self.journal.close()
+        self._temp_dir.cleanup()
+
+    @staticmethod
+    def _upload_image(path):
+        name = os.path.basename(path)
+        return ProcessedImage(
+            True,
+            path,
+            ImageEntity(name=name, path=f"s3/{name}", meta={"width": 1, "height": 1}),
+            name,
+        )
+
+    def _attach(self, images):
+        self.attached_batches.append([i.name for i in images])
+        return [i.name for i in images], []
+
+    def test_resume_from_journal(self):
+        image = ImageEntity(
+            name="0.jpg", path="s3/0.jpg", meta={"width": 1, "height": 1}
+        )
+        self.journal.add(1, 2, self.use_case._get_journal_source(self.PATHS[0]), image)
+        with patch.object(
+            self.use_case, "_upload_image", side_effect=self._upload_image
+        ) as upload, patch.object(self.use_case, "_attach", side_effect=self._attach):
+            progress = list(self.use_case.execute())
+        self.assertEqual(len(progress), len(self.PATHS))
+        self.assertEqual(upload.call_count, len(self.PATHS) - 1)
+        self.assertNotIn(self.PATHS[0], [i.args[0] for i in upload.call_args_list])
+        self.assertEqual([len(i) for i in self.attached_batches], [100, 100, 50])
+        uploaded, failed, _ = self.use_case.response.data
+        self.assertEqual(len(uploaded), len(self.PATHS))
+        self.assertEqual(failed, [])
+
+    def test_journal_is_not_used_when_disabled(self):
+        self.use_case._upload_journal = MagicMock()
+        with patch.object(self.use_case, "USE_JOURNAL", False), patch.object(
+            self.use_case, "_upload_image", side_effect=self._upload_image
+        ), patch.object(self.use_case, "_attach", side_effect=self._attach):
+            list(self.use_case.execute())
+        self.assertEqual(self.use_case._upload_journal.mock_calls, [])
+
+    def test_journal_sources_of_local_and_s3_paths(self):
+        image = ImageEntity(
+            name="0.jpg", path="s3/0.jpg", meta={"width": 1, "height": 1}
+        )
+        local_source = self.use_case._get_journal_source(self.PATHS[0])
+        self.assertEqual(local_source, Path(self.PATHS[0]).resolve().as_uri())
+        self.journal.add(1, 2, local_source, image)
+        # the S3 key with the same text as the local path is uploaded again
+        self.use_case._from_s3_bucket = "bucket"
+        self.assertEqual(
+            self.use_case._get_journal_source(self.PATHS[0]), "s3://bucket/images/0.jpg"
+        )
+        with patch.object(
+            self.use_case, "_upload_image", side_effect=self._upload_image
+        ) as upload, patch.object(self.use_case, "_attach", side_effect=self._attach):
+            list(self.use_case.execute())
+        self.assertEqual(upload.call_count, len(self.PATHS))
+
+    def test_filter_paths_name_duplicates(self):
+        self.use_case._service_provider.items.list_by_names.return_value = MagicMock(
+            ok=True, data=[]
+        )
+        to_upload, duplicates = self.use_case.filter_paths(
+            ["a/x.jpg", "b/x.jpg", "c/x.jpg", "a/y.jpg"]
+        )
+        self.assertEqual(sorted(to_upload), ["a/x.jpg", "a/y.jpg"])
+        self.assertEqual(duplicates, ["b/x.jpg", "c/x.jpg"])
+
+    def test_attached_journal_rows_are_removed(self):
+        image = ImageEntity(
+            name="x.jpg", path="s3/x.jpg", meta={"width": 1, "height": 1}
+        )
+        self.journal.add(1, 2, "a/x.jpg", image)
+        self.use_case._service_provider.items.list_by_names.return_value = MagicMock(
+            ok=True, data=[image]
+        )
+        to_upload, duplicates = self.use_case.filter_paths(["a/x.jpg", "a/y.jpg"])
+        self.assertEqual(to_upload, ["a/y.jpg"])
+        self.assertEqual(duplicates, ["a/x.jpg"])
+        self.assertEqual(self.journal.get_pending(1, 2, ["a/x.jpg"]), {})
+
+    def test_attach_runs_concurrently_with_uploads(self):
+        last_upload_started = threading.Event()
+        attached_during_uploads = []
+
+        def upload_image(path):
+            if path == self.PATHS[-1]:
+                last_upload_started.set()
+            return self._upload_image(path)
+
+        def attach(images):
+            if not self.attached_batches:
+                # the uploads go on while the first batch is being attached
+                attached_during_uploads.append(last_upload_started.wait(timeout=10))
+            return self._attach(images)
+
+        with patch.object(
+            self.use_case, "_upload_image", side_effect=upload_image
+        ), patch.object(self.use_case, "_attach", side_effect=attach):
+            list(self.use_case.execute())
+        self.assertEqual(attached_during_uploads, [True])
+        self.assertEqual([len(i) for i in self.attached_batches], [100, 100, 50])
+
+    def test_failed_attach_is_raised(self):
+        def attach(images):
+            if self.attached_batches:
+                raise RuntimeError("attach failed")
+            return self._attach(images)
+
+        with patch.object(
+            self.use_case, "_upload_image", side_effect=self._upload_image
+        ), patch.object(
+            self.use_case, "_attach", side_effect=attach
+        ), self.assertRaisesRegex(
+            RuntimeError, "attach failed"
+        ):
+            list(self.use_case.execute())
+
+    def test_attach_errors_are_logged(self):
+        responses = iter(
+            [
+                MagicMock(errors="attach failed"),
+                MagicMock(errors=None, data=([{"name": "100.jpg"}], [])),
+                MagicMock(errors=None, data=([{"name": "200.jpg"}], [])),
+            ]
+        )
+        with patch.object(
+            self.use_case, "_upload_image", side_effect=self._upload_image
+        ), patch(
+            f"{UploadImagesToProject.__module__}.AttachFileUrlsUseCase"
+        ) as attach_use_case, self.assertLogs(
+            "sa", "ERROR"
+        ) as logs:
+            attach_use_case.return_value.execute.side_effect = lambda: next(responses)
+            list(self.use_case.execute())
+        self.assertIn("attach failed", logs.output[0])
+        uploaded, _, _ = self.use_case.response.data
+        self.assertEqual(uploaded, ["100.jpg", "200.jpg"])
@@ -0,0 +1,50 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from src.superannotate.lib.core.upload_index import get_file_hashes
+from src.superannotate.lib.core.upload_index import UploadIndex
+from src.superannotate.lib.core.usecases import UploadImagesToProject
+
+
+class TestUploadIndex(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name, content in (("a.jpg", b"a"), ("b.jpg", b"b"), ("c.jpg", b"a")):
+            path = os.path.join(self._temp_dir.name, name)
+            with open(path, "wb") as file:
+                file.write(content)
+            self.paths.append(path)
+        self.index = UploadIndex(os.path.join(self._temp_dir.name, "index.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self._temp_dir.cleanup()
+
+    def test_file_hashes(self):
+        hashes = get_file_hashes(self.paths + ["missing.jpg"])
+        self.assertEqual(set(hashes), set(self.paths))
+        self.assertEqual(hashes[self.paths[0]], hashes[self.paths[2]])
+        self.assertNotEqual(hashes[self.paths[0]], hashes[self.paths[1]])
+
+    def test_index(self):
+        self.index.add(1, 2, [("hash", "a.jpg")])
+        self.assertEqual(self.index.get_uploaded(1, 2, ["hash", "other"]), {"hash"})
+        self.assertEqual(self.index.get_uploaded(1, 3, ["hash"]), set())
+
+    def test_filter_uploaded_by_hash(self):
+        use_case = UploadImagesToProject(
+            project=MagicMock(id=1),
+            folder=MagicMock(id=2),
+            s3_repo=None,
+            service_provider=MagicMock(),
+            paths=self.paths,
+            duplicate_check="hash",
+        )
+        use_case._upload_index = self.index
+        self.index.add(1, 2, [(get_file_hashes(self.paths[1:2])[self.paths[1]], "b")])
+        to_upload, duplicates = use_case.filter_uploaded_by_hash(self.paths)
+        self.assertEqual(to_upload, self.paths[:1])
+        self.assertEqual(duplicates, self.paths[1:])
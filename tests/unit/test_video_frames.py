@@ -0,0 +1,235 @@
+import itertools
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from src.superannotate.lib.core.entities import ImageEntity
+from src.superannotate.lib.core.plugin import VideoPlugin
+from src.superannotate.lib.core.reporter import Reporter
+from src.superannotate.lib.core.usecases.images import UploadFramesToProject
+from src.superannotate.lib.core.usecases.images import UploadVideosAsImages
+from tests import DATA_SET_PATH
+
+
+class TestVideoFrames(TestCase):
+    VIDEO_PATH = os.path.join(
+        DATA_SET_PATH, "sample_videos", "Pexels Videos 1182652.mp4"
+    )
+
+    def test_frames_count(self):
+        self.assertEqual(VideoPlugin.get_frames_count(self.VIDEO_PATH), 272)
+
+    def test_extractable_frames_match_decoded_frames(self):
+        for start_time, end_time, target_fps in (
+            (0.0, None, None),
+            (2.0, None, 2),
+            (1.5, 6, 7),
+        ):
+            decoded_count = sum(
+                1
+                for _ in VideoPlugin.frames_generator(
+                    self.VIDEO_PATH, start_time, end_time, target_fps, log=False
+                )
+            )
+            frame_names = VideoPlugin.get_extractable_frames(
+                self.VIDEO_PATH, start_time, end_time, target_fps
+            )
+            self.assertEqual(len(frame_names), decoded_count)
+
+    def test_seek_matches_sequential_decoding(self):
+        frame_numbers = VideoPlugin.get_frame_numbers(
+            VideoPlugin.get_frames_count(self.VIDEO_PATH),
+            VideoPlugin.get_fps(self.VIDEO_PATH),
+            3.5,
+            7,
+            5,
+        )
+        video = cv2.VideoCapture(self.VIDEO_PATH, cv2.CAP_FFMPEG)
+        expected = []
+        for frame_no in range(1, frame_numbers[-1] + 1):
+            _, frame = video.read()
+            if frame_no in frame_numbers:
+                expected.append(frame)
+        frames = list(
+            VideoPlugin.frames_generator(self.VIDEO_PATH, 3.5, 7, 5, log=False)
+        )
+        self.assertEqual(len(frames), len(expected))
+        for frame, expected_frame in zip(frames, expected):
+            self.assertTrue(np.array_equal(frame, expected_frame))
+
+    def test_frames_beyond_frame_count(self):
+        with patch.object(VideoPlugin, "get_frames_count", return_value=100):
+            frames_count = sum(
+                1
+                for _ in VideoPlugin.frames_generator(
+                    self.VIDEO_PATH, 0.0, None, None, log=False
+                )
+            )
+        self.assertEqual(frames_count, 272)
+
+    def test_encoded_frames(self):
+        frames = list(
+            itertools.islice(
+                VideoPlugin.iter_encoded_frames(self.VIDEO_PATH, 0.0, 2, 1), 2
+            )
+        )
+        self.assertEqual(
+            [name for name, _ in frames],
+            ["Pexels Videos 1182652_001.jpg", "Pexels Videos 1182652_002.jpg"],
+        )
+        image = cv2.imdecode(np.frombuffer(frames[0][1], np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(image.ndim, 3)
+
+
+class TestUploadFramesToProject(TestCase):
+    def test_upload_frames(self):
+        frames = ((f"video_{i}.jpg", b"frame") for i in range(150))
+        use_case = UploadFramesToProject(
+            project=MagicMock(id=1),
+            folder=MagicMock(id=2),
+            s3_repo=None,
+            service_provider=MagicMock(),
+            frames=frames,
+        )
+        use_case._validated = True
+        use_case._auth_data = {"filePath": "path/"}
+        use_case._s3_repo_instance = MagicMock()
+        attached_batches = []
+
+        def attach(images):
+            attached_batches.append(len(images))
+            return [i.name for i in images], []
+
+        def upload(**kwargs):
+            self.assertEqual(kwargs["image"].read(), b"frame")
+            return MagicMock(
+                errors=None,
+                data=ImageEntity(name=kwargs["image_path"], path="s3", meta={}),
+            )
+
+        with patch(
+            "src.superannotate.lib.core.usecases.images.UploadImageS3UseCase"
+        ) as upload_use_case, patch.object(use_case, "_attach", side_effect=attach):
+            upload_use_case.side_effect = lambda **kwargs: MagicMock(
+                execute=lambda: upload(**kwargs)
+            )
+            progress = list(use_case.execute())
+        uploaded, failed, _ = use_case.response.data
+        self.assertEqual(len(progress), 150)
+        self.assertEqual(len(uploaded), 150)
+        self.assertEqual(failed, [])
+        self.assertEqual(attached_batches, [100, 50])
+
+
+class TestUploadVideosAsImages(TestCase):
+    VIDEOS_PATH = os.path.join(DATA_SET_PATH, "sample_videos")
+
+    def _upload(self, paths, remaining_image_count=1000):
+        service_provider = MagicMock()
+        service_provider.items.list_by_names.return_value = MagicMock(data=[])
+        limits = service_provider.get_limitations.return_value
+        limits.data.folder_limit.remaining_image_count = remaining_image_count
+        limits.data.project_limit.remaining_image_count = 1000
+        limits.data.user_limit = None
+        use_case = UploadVideosAsImages(
+            reporter=Reporter(),
+            service_provider=service_provider,
+            project=MagicMock(id=1, type=1),
+            folder=MagicMock(id=2),
+            s3_repo=MagicMock(),
+            paths=paths,
+            target_fps=2,
+            annotation_status="NotStarted",
+        )
+
+        def upload(**kwargs):
+            return MagicMock(
+                errors=None,
+                data=ImageEntity(name=kwargs["image_path"], path="s3", meta={}),
+            )
+
+        with patch(
+            "src.superannotate.lib.core.usecases.images.UploadImageS3UseCase"
+        ) as upload_use_case, patch.object(
+            UploadFramesToProject,
+            "_attach",
+            side_effect=lambda images: ([i.name for i in images], []),
+        ):
+            upload_use_case.side_effect = lambda **kwargs: MagicMock(
+                execute=lambda: upload(**kwargs)
+            )
+            return use_case.execute().data
+
+    PATHS = [
+        os.path.join(VIDEOS_PATH, "Pexels Videos 1182652.mp4"),
+        os.path.join(VIDEOS_PATH, "production ID_3677121.mp4"),
+    ]
+
+    def test_upload_videos(self):
+        with patch(
+            "src.superannotate.lib.core.usecases.images.multiprocessing.Manager"
+        ) as manager:
+            uploaded = self._upload(self.PATHS)
+        manager.assert_not_called()
+        self.assertEqual(len(uploaded), 30)
+        self.assertEqual(
+            len({name for name in uploaded if name.startswith("Pexels")}), 19
+        )
+
+    def test_upload_videos_in_processes(self):
+        with patch.object(UploadVideosAsImages, "MAX_EXTRACT_WORKERS", 2):
+            uploaded = self._upload(self.PATHS)
+        self.assertEqual(len(uploaded), 30)
+        self.assertEqual(
+            len({name for name in uploaded if name.startswith("Pexels")}), 19
+        )
+
+    def test_upload_videos_with_limit(self):
+        uploaded = self._upload(self.PATHS, remaining_image_count=21)
+        self.assertEqual(len(uploaded), 21)
+        # the frames of each video are uploaded from its first frame on
+        for prefix in ("Pexels Videos 1182652", "production ID_3677121"):
+            numbers = sorted(
+                int(name[len(prefix) + 1 : -4])  # noqa: E203
+                for name in uploaded
+                if name.startswith(prefix)
+            )
+            self.assertEqual(numbers, list(range(1, len(numbers) + 1)))
+
+    def test_upload_videos_with_same_name(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for folder in ("first", "second"):
+                os.mkdir(os.path.join(temp_dir, folder))
+                paths.append(os.path.join(temp_dir, folder, "video.mp4"))
+                shutil.copy(
+                    os.path.join(self.VIDEOS_PATH, "production ID_3677121.mp4"),
+                    paths[-1],
+                )
+            for max_workers in (1, 2):
+                with patch.object(
+                    UploadVideosAsImages, "MAX_EXTRACT_WORKERS", max_workers
+                ):
+                    self.assertEqual(len(self._upload(paths)), 22)
+
+    def test_upload_single_video_with_limit(self):
+        with patch(
+            "src.superannotate.lib.core.usecases.images.multiprocessing.Manager"
+        ) as manager, patch(
+            "src.superannotate.lib.core.usecases.images.Progress"
+        ) as progress:
+            uploaded = self._upload(
+                [os.path.join(self.VIDEOS_PATH, "Pexels Videos 1182652.mp4")],
+                remaining_image_count=5,
+            )
+        manager.assert_not_called()
+        self.assertEqual(progress.call_args[0][0], 5)
+        self.assertEqual(
+            sorted(uploaded),
+            [f"Pexels Videos 1182652_00{i}.jpg" for i in range(1, 6)],
+        )